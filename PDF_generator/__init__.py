@@ -0,0 +1,8 @@
+"""Számla PDF generátorok a DOX kinyerési tesztekhez.
+
+Sablonok: ``simple_invoice``, ``modern_invoice``, ``general_invoice``.
+Mindegyikben ``render_*_invoice(data, out=None)`` memóriába renderel (bytes / stream /
+memoryview), a ``create_*_invoice(filename, data)`` pedig az ``OUTPUT_DIR``-be ír; mindkettő
+kaphat hívásonkénti beállítást (``config=config.RenderConfig(...)``), és szálakból is hívható.
+Tömeges generálás: ``batch``, szintetikus bemenő adatok: ``synthetic``.
+"""
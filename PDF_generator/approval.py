@@ -0,0 +1,449 @@
+"""Jóváhagyási mátrix: döntési tábla kiértékelése számla kötegeken.
+
+A szabályok CSV-ből vagy JSON-ból töltődnek. Minden szabály feltételek
+(bemenő oszlop -> feltétel) és kimenetek (pl. jóváhagyó, szint) sora:
+
+CSV: az első sor a fejléc; a ``rule`` oszlop a szabály azonosítója (opcionális),
+az ``out:`` előtagú oszlopok a kimenetek, a többi bemenő mező::
+
+    rule,total,terms,out:approver
+    R1,< 1000,,csoportvezető
+    R2,[1000..10000),Net 30,osztályvezető
+    R3,>= 10000,,pénzügyi igazgató
+
+JSON::
+
+    {"hit_policy": "first", "rules": [
+        {"id": "R1", "when": {"total": "< 1000"}, "then": {"approver": "csoportvezető"}}, ...]}
+
+Feltételek (DMN-szerű): üres vagy ``-``: bármi; ``< 5``, ``<= 5``, ``> 5``,
+``>= 5``, ``= 5``, ``!= 5``; tartomány ``[1000..5000)`` (a zárójel a nyitott
+vég); szövegek: ``Net 30`` vagy ``"Net 30", "Net 15"`` (bármelyik); ``not(...)``
+tagadás. Egy oszlop numerikus, ha minden feltétele szám alapú, különben
+szöveges (pontos egyezés). CSV-ben a több értékes cellát idézőjelek közé kell
+tenni, a benne lévő idézőjeleket kettőzve (lásd ``approval_matrix.csv``). A ``total`` bemenet a sablonok végösszeg mezőjére
+mutat (``total_gross`` / ``total_amount`` / ``grand_total``).
+
+Találati szabály (hit policy): ``first`` (az első illeszkedő szabály) vagy
+``collect`` (az összes illeszkedő, sorrendben).
+
+Fordítás: oszloponként a feltételek határértékeiből intervallumok (numerikus)
+vagy szótár kódok (szöveges) lesznek, és minden intervallumhoz / kódhoz egy
+bitmaszk tartozik azokról a szabályokról, amelyek feltétele ott teljesül. Egy
+köteg kiértékelése oszloponként egy ``searchsorted`` / kód tömb, egy
+táblakeresés és egy bitenkénti ÉS, a szabályok számától szinte függetlenül.
+
+Használat::
+
+    table = load_table("approval_matrix.csv")
+    decisions = table.evaluate(table.columns(invoices))
+    decisions.output("approver")     # első illeszkedés szerint
+    print(table.explain(invoices[0]))
+"""
+import csv
+from dataclasses import dataclass, replace
+import json
+import math
+import operator
+import os
+import re
+
+import numpy as np
+
+from .money import MISSING, parse_money, parse_money_array
+
+HIT_POLICIES = ("first", "collect")
+ANY = ("", "-")
+
+# Bemenő mező -> a sablonok kulcsai (a mező maga, majd az első meglévő értéke számít)
+ALIASES = {
+    "total": ("total_gross", "total_amount", "grand_total"),
+    "number": ("inv_number", "invoice_no", "invoice_id"),
+}
+
+DEFAULT_RULES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "approval_matrix.csv")
+
+_COMPARISON = re.compile(r"(<=|>=|!=|==|=|<|>)\s*(.+)")
+_RANGE = re.compile(r"([\[(\]]?)\s*(.+?)\s*\.\.\s*(.+?)\s*([\])\[]?)")
+_NOT = re.compile(r"not\s*\((.*)\)", re.IGNORECASE | re.DOTALL)
+_QUOTED = re.compile(r'"((?:[^"\\]|\\.)*)"')
+
+_OPERATORS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+              "=": operator.eq, "==": operator.eq, "!=": operator.ne}
+
+
+class RuleError(ValueError):
+    """Hibás szabály fájl vagy feltétel."""
+
+
+def parse_amount(value):
+    """Összeg szövegből (``$ 1,234.50`` és ``1 234,50 Ft`` -> 1234.5, lásd ``money.parse_money``); ha nem szám, NaN."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    cents = parse_money(str(value))
+    return math.nan if cents is None else cents / 100
+
+
+def _number(text):
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+# --- feltételek ---
+
+@dataclass(frozen=True)
+class Condition:
+    """Egy cella feltétele. ``kind``: any / compare / range / values, ``negate``: not(...)."""
+    text: str
+    kind: str
+    op: str = ""
+    low: float = -math.inf
+    high: float = math.inf
+    closed: tuple = (True, True)
+    values: tuple = ()
+    negate: bool = False
+
+    @property
+    def numeric(self):
+        return self.kind in ("compare", "range") or (self.kind == "values" and all(
+            isinstance(v, float) for v in self.values))
+
+    def test(self, value):
+        """Egy érték vizsgálata (numerikus feltételnél ``value`` float, NaN: hiányzó)."""
+        if self.kind == "any":
+            return True
+        if self.kind == "compare":
+            result = not math.isnan(value) and _OPERATORS[self.op](value, self.low)
+        elif self.kind == "range":
+            result = not math.isnan(value) and (
+                (self.low < value or (self.closed[0] and self.low == value))
+                and (value < self.high or (self.closed[1] and value == self.high)))
+        else:
+            result = value in self.values
+        return result != self.negate
+
+    def bounds(self):
+        """A feltétel határértékei (a numerikus oszlop intervallumaihoz)."""
+        if self.kind == "compare":
+            return (self.low,)
+        if self.kind == "range":
+            return (self.low, self.high)
+        if self.kind == "values" and self.numeric:
+            return self.values
+        return ()
+
+
+def parse_condition(cell):
+    """Egy cella szövegéből (vagy JSON értékből) ``Condition``."""
+    if isinstance(cell, bool) or cell is None:
+        raise RuleError(f"Érvénytelen feltétel: {cell!r}")
+    if isinstance(cell, (int, float)):
+        return Condition(str(cell), "values", values=(float(cell),))
+    if isinstance(cell, list):
+        return Condition(json.dumps(cell, ensure_ascii=False), "values",
+                         values=tuple(float(v) if isinstance(v, (int, float)) else str(v) for v in cell))
+    text = str(cell).strip()
+    if text in ANY:
+        return Condition(text, "any")
+    negated = _NOT.fullmatch(text)
+    if negated:
+        inner = parse_condition(negated.group(1))
+        if inner.kind == "any":
+            raise RuleError(f"Üres tagadás: {text!r}")
+        return Condition(text, inner.kind, inner.op, inner.low, inner.high, inner.closed, inner.values,
+                         not inner.negate)
+    match = _COMPARISON.fullmatch(text)
+    if match and _number(match.group(2)) is not None:
+        return Condition(text, "compare", op=match.group(1), low=_number(match.group(2)))
+    match = _RANGE.fullmatch(text)
+    if match and _number(match.group(2)) is not None and _number(match.group(3)) is not None:
+        low, high = _number(match.group(2)), _number(match.group(3))
+        if low > high:
+            raise RuleError(f"Üres tartomány: {text!r}")
+        # [a..b] zárt, (a..b) és ]a..b[ nyitott vég
+        return Condition(text, "range", low=low, high=high,
+                         closed=(match.group(1) in ("", "["), match.group(4) in ("", "]")))
+    quoted = _QUOTED.findall(text)
+    if quoted and _QUOTED.sub("", text).replace(",", "").strip() == "":
+        return Condition(text, "values", values=tuple(v.replace('\\"', '"') for v in quoted))
+    number = _number(text)
+    return Condition(text, "values", values=(text,) if number is None else (number,))
+
+
+@dataclass
+class Rule:
+    id: str
+    conditions: dict        # bemenő mező -> Condition
+    outputs: dict
+
+
+# --- oszlopok ---
+
+@dataclass
+class Columns:
+    """Egy köteg bemenő oszlopai: numerikus mezőknél float64 (NaN: hiányzó),
+    szövegeseknél int32 kód a tábla szótárába."""
+    size: int
+    arrays: dict
+
+    def __len__(self):
+        return self.size
+
+
+def _field_value(data, name):
+    for key in (name, *ALIASES.get(name, ())):
+        value = data.get(key)
+        if value is not None:
+            return value
+    return None
+
+
+class DecisionTable:
+    def __init__(self, rules, hit_policy="first", name=""):
+        if hit_policy not in HIT_POLICIES:
+            raise RuleError(f"Ismeretlen hit policy: {hit_policy!r} ({', '.join(HIT_POLICIES)})")
+        if not rules:
+            raise RuleError("Üres döntési tábla")
+        self.name = name
+        self.rules = rules
+        self.hit_policy = hit_policy
+        self.inputs = list(dict.fromkeys(field for rule in rules for field in rule.conditions))
+        self.output_names = list(dict.fromkeys(key for rule in rules for key in rule.outputs))
+        self.numeric = {field: all(rule.conditions[field].numeric for rule in rules if field in rule.conditions)
+                        for field in self.inputs}
+        for rule in rules:
+            for field, condition in rule.conditions.items():
+                if self.numeric[field]:
+                    continue
+                if condition.kind != "values":
+                    raise RuleError(f"{rule.id}: a(z) {field} oszlopban szám és szöveg feltétel keveredik")
+                # Szöveges oszlopban a számnak látszó érték is szövegként egyezik
+                rule.conditions[field] = replace(condition, values=tuple(
+                    f"{v:g}" if isinstance(v, float) else v for v in condition.values))
+        self.words = (len(rules) + 63) // 64
+        self._edges = {}
+        self._bins = {}
+        self._vocab = {}    # szöveges mező -> {érték: kód}
+        self._codes = {}    # szöveges mező -> kód -> szabály bitek (a szótárral együtt nő)
+        for field in self.inputs:
+            if self.numeric[field]:
+                self._compile_numeric(field)
+            else:
+                self._vocab[field] = {}
+                self._codes[field] = np.empty((0, self.words), np.uint64)
+
+    # --- fordítás ---
+
+    def _rule_bits(self, field, value):
+        """Azon szabályok bitmaszkja (``words`` darab uint64), amelyek ``field`` feltétele ``value``-ra teljesül."""
+        bits = np.zeros(self.words, np.uint64)
+        for i, rule in enumerate(self.rules):
+            condition = rule.conditions.get(field)
+            if condition is None or condition.test(value):
+                bits[i // 64] |= np.uint64(1) << np.uint64(i % 64)
+        return bits
+
+    def _compile_numeric(self, field):
+        # A határértékek k darab éle 2k+1 intervallumot ad: páros index az élek közötti nyílt
+        # szakasz, páratlan maga az él; a 2k+2-edik a hiányzó (NaN) érték.
+        edges = sorted({b for rule in self.rules if field in rule.conditions
+                        for b in rule.conditions[field].bounds() if math.isfinite(b)})
+        if not edges:
+            samples = [0.0]
+        else:
+            samples = [edges[0] - 1]
+            for low, high in zip(edges, edges[1:]):
+                samples += [low, (low + high) / 2]
+            samples += [edges[-1], edges[-1] + 1]
+        samples.append(math.nan)
+        self._edges[field] = np.array(edges, np.float64)
+        self._bins[field] = np.array([self._rule_bits(field, v) for v in samples], np.uint64)
+
+    def _encode(self, field, values):
+        vocab = self._vocab[field]
+        codes = np.fromiter((vocab.setdefault("" if v is None else str(v).strip(), len(vocab)) for v in values),
+                            np.int32, count=len(values))
+        table = self._codes[field]
+        if len(vocab) > len(table):
+            new = [self._rule_bits(field, value) for value in list(vocab)[len(table):]]
+            self._codes[field] = np.concatenate([table, np.array(new, np.uint64)])
+        return codes
+
+    def columns(self, invoices):
+        """A bemenő oszlopok egy köteg számla dict-ből."""
+        invoices = invoices if isinstance(invoices, list) else list(invoices)
+        arrays = {}
+        for field in self.inputs:
+            values = [_field_value(data, field) for data in invoices]
+            if self.numeric[field]:
+                # Mint a parse_amount, kötegben: századok -> egység, a nem értelmezhető NaN
+                cents = parse_money_array(values)
+                arrays[field] = np.where(cents == MISSING, math.nan, cents / 100)
+            else:
+                arrays[field] = self._encode(field, values)
+        return Columns(len(invoices), arrays)
+
+    def from_arrays(self, **arrays):
+        """Oszlopok kész tömbökből (numerikus: számok, szöveges: értékek listája / tömbje)."""
+        size = None
+        columns = {}
+        for field in self.inputs:
+            if field not in arrays:
+                raise RuleError(f"Hiányzó oszlop: {field}")
+            values = arrays[field]
+            if self.numeric[field]:
+                columns[field] = np.asarray(values, np.float64)
+            else:
+                columns[field] = self._encode(field, list(values))
+            if size is not None and len(columns[field]) != size:
+                raise RuleError("Az oszlopok hossza eltér")
+            size = len(columns[field])
+        return Columns(size or 0, columns)
+
+    # --- kiértékelés ---
+
+    def evaluate(self, columns):
+        """A köteg kiértékelése; soronként az illeszkedő szabályok bitmaszkja egy ``Decisions``-ben."""
+        hits = None
+        for field in self.inputs:
+            values = columns.arrays[field]
+            if self.numeric[field]:
+                edges = self._edges[field]
+                index = np.searchsorted(edges, values, "left")
+                index += np.searchsorted(edges, values, "right")
+                index[np.isnan(values)] = 2 * len(edges) + 1
+                bits = self._bins[field][index]
+            else:
+                bits = self._codes[field][values]
+            if hits is None:
+                hits = bits
+            else:
+                hits &= bits
+        if hits is None:
+            # Feltétel nélküli tábla: minden szabály minden sorra illeszkedik
+            hits = np.tile(self._rule_bits(None, None), (len(columns), 1))
+        return Decisions(self, hits)
+
+    def decide(self, invoices):
+        """Számlánként a kimenetek: ``first`` esetén dict (vagy None), ``collect`` esetén dict lista."""
+        decisions = self.evaluate(self.columns(invoices))
+        if self.hit_policy == "first":
+            return [None if i < 0 else self.rules[i].outputs for i in decisions.first().tolist()]
+        return [[self.rules[i].outputs for i in decisions.matches(row)] for row in range(len(decisions))]
+
+    def explain(self, data):
+        """Egy számla döntésének szöveges indoklása: szabályonként az első nem teljesülő feltétel."""
+        lines = []
+        matched = []
+        for i, rule in enumerate(self.rules):
+            failed = None
+            checks = []
+            for field, condition in rule.conditions.items():
+                raw = _field_value(data, field)
+                if self.numeric[field]:
+                    value = math.nan if raw is None else parse_amount(raw)
+                else:
+                    value = "" if raw is None else str(raw).strip()
+                checks.append(f"{field}={raw!r} {condition.text}")
+                if not condition.test(value):
+                    failed = f"{field}={raw!r} nem teljesíti: {condition.text}"
+                    break
+            if failed:
+                lines.append(f"  {rule.id}: nem illeszkedik ({failed})")
+                continue
+            matched.append(rule)
+            outputs = ", ".join(f"{k}={v}" for k, v in rule.outputs.items())
+            lines.append(f"  {rule.id}: illeszkedik ({'; '.join(checks) or 'feltétel nélkül'}) -> {outputs}")
+            if self.hit_policy == "first":
+                break
+        if not matched:
+            head = "Nincs illeszkedő szabály"
+        elif self.hit_policy == "first":
+            head = f"Döntés: {matched[0].id}"
+        else:
+            head = f"Döntés: {', '.join(rule.id for rule in matched)}"
+        return "\n".join([head, *lines])
+
+
+class Decisions:
+    """Egy köteg kiértékelése: ``hits[sor, szó]`` a illeszkedő szabályok bitjei."""
+
+    def __init__(self, table, hits):
+        self.table = table
+        self.hits = hits
+
+    def __len__(self):
+        return len(self.hits)
+
+    def first(self):
+        """Soronként az első illeszkedő szabály indexe (-1: nincs)."""
+        hits = self.hits
+        if hits.shape[1] == 1:
+            word, offset = hits[:, 0], 0
+        else:
+            column = np.argmax(hits != 0, axis=1)
+            word, offset = hits[np.arange(len(hits)), column], column * 64
+        lowest = word & (~word + np.uint64(1))
+        # Kettő hatványa float64-ben pontos, így a log2 is
+        result = np.log2(lowest.astype(np.float64), where=lowest != 0, out=np.full(len(word), -1.0))
+        result = result.astype(np.int64)
+        return np.where(lowest != 0, result + offset, -1)
+
+    def matches(self, row):
+        """Egy sor összes illeszkedő szabályának indexe, sorrendben."""
+        result = []
+        for w, word in enumerate(self.hits[row].tolist()):
+            while word:
+                low = word & -word
+                result.append(w * 64 + low.bit_length() - 1)
+                word ^= low
+        return result
+
+    def counts(self):
+        """Szabályonként az illeszkedő sorok száma (``collect`` szerint)."""
+        rules = len(self.table.rules)
+        counts = np.zeros(rules, np.int64)
+        for i in range(rules):
+            counts[i] = np.count_nonzero(self.hits[:, i // 64] & (np.uint64(1) << np.uint64(i % 64)))
+        return counts
+
+    def output(self, name, default=None):
+        """Az első illeszkedő szabály ``name`` kimenete soronként (object tömb)."""
+        values = np.array([rule.outputs.get(name, default) for rule in self.table.rules] + [default], object)
+        return values[self.first()]
+
+
+# --- betöltés ---
+
+def _rules_from_records(records, inputs_of, outputs_of):
+    rules = []
+    for i, record in enumerate(records, 1):
+        rule_id = str(record.get("id") or record.get("rule") or f"R{i}")
+        try:
+            conditions = {field: parse_condition(cell) for field, cell in inputs_of(record).items()}
+        except RuleError as exc:
+            raise RuleError(f"{rule_id}: {exc}") from None
+        conditions = {field: c for field, c in conditions.items() if c.kind != "any"}
+        rules.append(Rule(rule_id, conditions, outputs_of(record)))
+    return rules
+
+
+def load_table(path, hit_policy=None):
+    """Döntési tábla CSV vagy JSON fájlból (a kiterjesztés szerint); ``hit_policy`` felülírja a fájlét."""
+    name = os.path.splitext(os.path.basename(path))[0]
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            spec = json.load(f)
+        rules = _rules_from_records(spec["rules"], lambda r: r.get("when", {}), lambda r: dict(r.get("then", {})))
+        return DecisionTable(rules, hit_policy or spec.get("hit_policy", "first"), name)
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f, skipinitialspace=True)
+        header = [h.strip() for h in reader.fieldnames or ()]
+        reader.fieldnames = header
+        inputs = [h for h in header if h != "rule" and not h.startswith("out:")]
+        outputs = [h for h in header if h.startswith("out:")]
+        rules = _rules_from_records(list(reader), lambda r: {h: r[h] or "" for h in inputs},
+                                    lambda r: {h[4:]: (r[h] or "").strip() for h in outputs})
+    return DecisionTable(rules, hit_policy or "first", name)
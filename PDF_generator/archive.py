@@ -0,0 +1,289 @@
+"""Archív kimenet: a számlák méretkorlátos shardokba (zip vagy tar) kerülnek.
+
+Számlánként egy fájl helyett a batch a kész PDF-eket sorban egy shardba írja;
+ha a shard a következő taggal a lezárás után (a zip központi könyvtárával, a
+tar záró blokkjaival együtt) meghaladná a ``shard_bytes`` méretet, lezárjuk és
+újat nyitunk. Egy ``shard_bytes``-nál nagyobb számla egyedül kerül egy
+shardba (ZIP64 nélkül számolunk: a tagok 2 GiB alattiak). A
+tagok tömörítés nélkül kerülnek be (a PDF streamek már tömörítettek), így
+egy számla a shardban egy összefüggő bájt tartomány: olvasáskor a shardot
+memóriába képezzük (mmap), és a tartományt másolás nélkül adjuk vissza.
+
+Egy shard fájljai::
+
+    shard-000001.zip        (írás közben shard-000001.zip.part)
+    shard-000001.idx.json   {"shard", "format", "first", "last", "bytes",
+                             "members": [[név, job index, offset, méret], ...]}
+
+Lezáráskor a shard adata lemezre kerül (fsync), majd az index atomikusan és
+fsync-elve, ezután a ``.part`` átnevezése, végül a könyvtár fsync-je: kész
+shard csak indexszel együtt látszik. Az írás csak hozzáfűz, a batch
+sorrendben adja az eredményeket, így egy shard egy összefüggő job tartományt
+fed le. Megszakadt batch folytatásakor az indexszel már rendelkező ``.part``
+shard átnevezése befejeződik, a többi ``.part`` törlődik, és a renderelés az
+utolsó kész shard utáni jobtól (``ShardWriter.next_index``) indul újra.
+
+Használat::
+
+    with ShardWriter("archiv") as writer:
+        run_batch(jobs, archive=writer, start=writer.next_index)
+    with Archive("archiv") as archive:
+        pdf = archive.read("simple_0_0000042.pdf")
+"""
+import glob
+import io
+import json
+import mmap
+import os
+import tarfile
+import tempfile
+import zipfile
+
+DEFAULT_SHARD_BYTES = 256 * 2**20
+FORMATS = ("zip", "tar")
+
+# Fix időbélyeg: azonos bemenetből bájtra azonos shard
+_ZIP_DATE = (1980, 1, 1, 0, 0, 0)
+
+
+def _index_path(shard_path):
+    return shard_path.rsplit(".", 1)[0] + ".idx.json"
+
+
+def load_index(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def completed_shards(directory, prefix="shard"):
+    """A kész (indexszel és shard fájllal rendelkező) shardok indexei, sorszám szerint."""
+    paths = sorted(glob.glob(os.path.join(glob.escape(directory), f"{glob.escape(prefix)}-*.idx.json")))
+    shards = [load_index(path) for path in paths]
+    return [shard for shard in shards if os.path.exists(os.path.join(directory, shard["shard"]))]
+
+
+def _fsync_directory(directory):
+    # Az átnevezések tartóssága; Windowson könyvtár nem nyitható meg (ott nincs mit tenni)
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class _ZipShard:
+    # Helyi fejléc, központi könyvtár bejegyzés (a név nélkül) és a záró rekord
+    LOCAL_HEADER = 30
+    CENTRAL_HEADER = 46
+    END_RECORD = 22
+
+    def __init__(self, f):
+        self._zip = zipfile.ZipFile(f, "w", zipfile.ZIP_STORED)
+        self._central = 0
+
+    def _name_bytes(self, name):
+        return len(zipfile.ZipInfo(name)._encodeFilenameFlags()[0])
+
+    def closed_size(self, f, name, size):
+        """A lezárt shard mérete, ha ``size`` bájtos ``name`` tag kerül még bele."""
+        n = self._name_bytes(name)
+        return (f.tell() + self.LOCAL_HEADER + n + size
+                + self._central + self.CENTRAL_HEADER + n + self.END_RECORD)
+
+    def add(self, f, name, pdf):
+        info = zipfile.ZipInfo(name, _ZIP_DATE)
+        info.external_attr = 0o644 << 16
+        self._zip.writestr(info, pdf)
+        self._central += self.CENTRAL_HEADER + self._name_bytes(name)
+        # Tömörítetlen tag, seekelhető fájl: az adat a helyi fejléc után áll, leíró nélkül
+        return f.tell() - len(pdf)
+
+    def close(self):
+        self._zip.close()
+
+
+class _TarShard:
+    def __init__(self, f):
+        self._tar = tarfile.open(fileobj=f, mode="w", format=tarfile.PAX_FORMAT)
+
+    @staticmethod
+    def _info(name, size):
+        info = tarfile.TarInfo(name)
+        info.size = size
+        info.mode = 0o644
+        return info
+
+    def closed_size(self, f, name, size):
+        """A lezárt shard mérete, ha ``size`` bájtos ``name`` tag kerül még bele."""
+        tar = self._tar
+        header = len(self._info(name, size).tobuf(tar.format, tar.encoding, tar.errors))
+        end = tar.offset + header + -(-size // tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE
+        # Két üres záró blokk, majd kiegészítés a rekord méretre
+        return -(-(end + 2 * tarfile.BLOCKSIZE) // tarfile.RECORDSIZE) * tarfile.RECORDSIZE
+
+    def add(self, f, name, pdf):
+        self._tar.addfile(self._info(name, len(pdf)), io.BytesIO(pdf))
+        # Az adat a fejléc után áll, 512 bájtos blokkokra kiegészítve
+        return self._tar.offset - -(-len(pdf) // tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE
+
+    def close(self):
+        self._tar.close()
+
+
+_SHARDS = {"zip": _ZipShard, "tar": _TarShard}
+
+
+class ShardWriter:
+    """Hozzáfűző, méretkorlátos shard író; a könyvtár kész shardjai után folytatja."""
+
+    def __init__(self, directory, shard_bytes=DEFAULT_SHARD_BYTES, format="zip", prefix="shard"):
+        if format not in _SHARDS:
+            raise ValueError(f"Ismeretlen archív formátum: {format!r} (választható: {', '.join(FORMATS)})")
+        self.directory = directory
+        self.shard_bytes = shard_bytes
+        self.format = format
+        self.prefix = prefix
+        os.makedirs(directory, exist_ok=True)
+        # Egy korábbi, megszakadt batch shardja: ha az indexe már kész, csak az átnevezés
+        # maradt el; különben félkész, a jobjai újra renderelődnek
+        for path in glob.glob(os.path.join(glob.escape(directory), f"{glob.escape(prefix)}-*.part")):
+            if os.path.exists(_index_path(path[:-len(".part")])):
+                os.replace(path, path[:-len(".part")])
+            else:
+                os.remove(path)
+        _fsync_directory(directory)
+        done = completed_shards(directory, prefix)
+        self.shards = len(done)
+        self.next_index = max((shard["last"] + 1 for shard in done), default=0)
+        self.written = 0
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _open(self):
+        self.shards += 1
+        self._path = os.path.join(self.directory, f"{self.prefix}-{self.shards:06d}.{self.format}")
+        self._file = open(self._path + ".part", "wb")
+        self._shard = _SHARDS[self.format](self._file)
+        self._members = []
+
+    def write(self, index, name, pdf):
+        """Egy számla hozzáfűzése (``index``: a job sorszáma, nem csökkenhet)."""
+        if index < self.next_index:
+            raise ValueError(f"A(z) #{index} job már archiválva van (következő: #{self.next_index})")
+        if (self._file is not None and self._members
+                and self._shard.closed_size(self._file, name, len(pdf)) > self.shard_bytes):
+            self.close()
+        if self._file is None:
+            self._open()
+        offset = self._shard.add(self._file, name, pdf)
+        self._members.append([name, index, offset, len(pdf)])
+        self.next_index = index + 1
+        self.written += 1
+
+    def close(self):
+        """Az aktuális shard lezárása (adat, index, átnevezés, könyvtár); üres shard nem marad."""
+        if self._file is None:
+            return
+        self._shard.close()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        size = self._file.tell()
+        self._file.close()
+        self._file = None
+        index = {"shard": os.path.basename(self._path), "format": self.format,
+                 "first": self._members[0][1], "last": self._members[-1][1], "bytes": size,
+                 "members": self._members}
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, _index_path(self._path))
+        os.replace(self._path + ".part", self._path)
+        _fsync_directory(self.directory)
+
+
+class ShardReader:
+    """Egy kész shard memóriába képezve; a tagok ``memoryview``-ként, másolás nélkül."""
+
+    def __init__(self, path):
+        self.path = path
+        self.index = load_index(_index_path(path))
+        self.members = {name: (offset, size) for name, _, offset, size in self.index["members"]}
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def view(self, name):
+        """A tag bájtjai; a nézetet a ``close()`` előtt el kell engedni (``release()``)."""
+        offset, size = self.members[name]
+        return memoryview(self._map)[offset:offset + size]
+
+    def read(self, name):
+        offset, size = self.members[name]
+        return self._map[offset:offset + size]
+
+    def close(self):
+        self._map.close()
+
+
+class Archive:
+    """Egy shard könyvtár összes kész shardja, név szerinti kereséssel; a shardokat lustán nyitja meg."""
+
+    def __init__(self, directory, prefix="shard"):
+        self.directory = directory
+        self.shards = completed_shards(directory, prefix)
+        self._where = {}
+        for number, shard in enumerate(self.shards):
+            for member in shard["members"]:
+                self._where[member[0]] = number
+        self._readers = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self._where)
+
+    def __contains__(self, name):
+        return name in self._where
+
+    def names(self):
+        return list(self._where)
+
+    def _reader(self, name):
+        number = self._where[name]
+        reader = self._readers.get(number)
+        if reader is None:
+            path = os.path.join(self.directory, self.shards[number]["shard"])
+            reader = self._readers[number] = ShardReader(path)
+        return reader
+
+    def view(self, name):
+        return self._reader(name).view(name)
+
+    def read(self, name):
+        return self._reader(name).read(name)
+
+    def close(self):
+        for reader in self._readers.values():
+            reader.close()
+        self._readers.clear()
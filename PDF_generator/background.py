@@ -0,0 +1,108 @@
+"""Statikus oldalháttér egyszer renderelt, újrahasznosított Form XObject-ként.
+
+A sablonok adatfüggetlen tartalmát (``LayoutPlan.background``: INVOICE felirat,
+címkék, keretek, lábléc) folyamatonként egyszer rajzoljuk le egy segéd
+dokumentumba; az így kapott (már tömörített) content stream minden számlába
+Form XObject-ként kerül, az oldalakon csak egy ``/I<n> Do`` hivatkozás marad.
+
+A content stream a fontok subset-beli karakterkódjait tartalmazza, ezek a
+dokumentum glif-foglalási sorrendjétől függenek. Ezért ``install_backgrounds``
+a háttér glifjeit a segéd dokumentummal azonos sorrendben foglalja le, még
+mielőtt a számla bármilyen szöveget rajzolna.
+"""
+from collections import namedtuple
+import re
+import zlib
+
+from fpdf.enums import PDFResourceType
+from fpdf.syntax import Name, PDFArray, PDFContentStream
+
+from . import compat  # belső fpdf részeket használ: verzió ellenőrzés
+from .layout import render_background
+from .output import PrecompressedStream
+
+# Egy háttér réteg: nyers és tömörített content stream, a használt fontok indexei
+Background = namedtuple("Background", ["contents", "compressed", "fonts"])
+# A sablon összes rétege és a glif foglalások sorrendje fontonként
+BackgroundSet = namedtuple("BackgroundSet", ["layers", "glyphs", "bbox"])
+
+# Minden réteg alapállapotból indul (a lábléc pl. bármilyen kitöltőszín mellett hívódhat)
+_PROLOGUE = b"0 G\n0 g\n"
+_FONT_REF = re.compile(rb"/F(\d+) ")
+
+
+def compile_backgrounds(pdf_class, *layers):
+    """A háttér rétegek (``LayoutPlan.background``) lerenderelése egy ``pdf_class`` dokumentumba."""
+    scratch = pdf_class()
+    scratch.add_page()
+    contents = scratch.pages[scratch.page].contents
+    compiled = []
+    for ops in layers:
+        _reset_style(scratch)
+        start = len(contents)
+        render_background(scratch, ops)
+        stream = _PROLOGUE + bytes(contents[start:])
+        fonts = tuple(sorted({int(i) for i in _FONT_REF.findall(stream)}))
+        compiled.append(Background(stream, zlib.compress(stream), fonts))
+    glyphs = tuple((key, tuple(font.subset.items())) for key, font in scratch.fonts.items())
+    bbox = (0, 0, scratch.w_pt, scratch.h_pt)
+    return BackgroundSet(tuple(compiled), glyphs, bbox)
+
+
+def _reset_style(pdf):
+    # Az fpdf csak a változást írja ki: a következő set_*() hívás mindenképp kerüljön a streambe
+    pdf.set_draw_color(0)
+    pdf.set_fill_color(0)
+    pdf.set_text_color(0)
+    pdf.font_family = ""
+
+
+def install_backgrounds(pdf, backgrounds):
+    """A rétegek felvétele a dokumentumba, a visszatérés rétegenként az XObject indexe.
+
+    A dokumentum első szövege előtt kell hívni (lásd a modul leírását).
+    """
+    for key, items in backgrounds.glyphs:
+        subset = pdf.fonts[key].subset
+        for glyph, char_id in items:
+            if subset.pick_glyph(glyph) != char_id:
+                raise RuntimeError(f"A(z) {key} font glifjei már foglaltak, a hátteret előbb kell telepíteni")
+    catalog = pdf._resource_catalog
+    indices = []
+    for layer in backgrounds.layers:
+        index = catalog.next_xobject_index
+        catalog.next_xobject_index += 1
+        catalog.form_xobjects.append((index, _form_xobject(pdf, layer, backgrounds.bbox)))
+        indices.append(index)
+    return tuple(indices)
+
+
+def place_background(pdf, index):
+    """A telepített réteg kirajzolása az aktuális oldalra."""
+    pdf._out(f"q /I{index} Do Q")
+    pdf._resource_catalog.add(PDFResourceType.X_OBJECT, index, pdf.page)
+
+
+def _form_xobject(pdf, layer, bbox):
+    if pdf.compress:
+        xobject = PrecompressedStream(contents=layer.compressed)
+        xobject.filter = Name("FlateDecode")
+    else:
+        xobject = PDFContentStream(contents=layer.contents)
+    xobject.type = Name("XObject")
+    xobject.subtype = Name("Form")
+    xobject.b_box = PDFArray(bbox)
+    # Az fpdf a Form XObject-ek Resources szótárát a _blend_group objektumtól kéri el
+    xobject._blend_group = _FontResources(layer.fonts)
+    xobject._registered = False
+    return xobject
+
+
+class _FontResources:
+    def __init__(self, fonts):
+        self.fonts = fonts
+
+    def get_resource_dictionary(self, gfxstate_objs_per_name, pattern_objs_per_name,
+                                shading_objs_per_name, font_objs_per_index, img_objs_per_index):
+        refs = "".join(f"/F{i} {font_objs_per_index[i].id} 0 R" for i in self.fonts)
+        return f"<</Font <<{refs}>>>>" if refs else "<<>>"
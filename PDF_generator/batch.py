@@ -0,0 +1,239 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections import deque
+from contextlib import nullcontext
+from dataclasses import dataclass, field, replace
+import os
+import time
+
+from .config import current_config, using_config
+from .groundtruth import recording
+from .output import get_profile
+from .profiling import profile as profile_invoice
+from .templates import resolve_renderer, resolve_template
+
+
+@dataclass
+class JobResult:
+    index: int
+    template: str
+    filename: str
+    ok: bool
+    seconds: float
+    error: str = ""
+    # Fázisonkénti mérés (profiling rekord), ha a batch profilozással fut
+    profile: dict = None
+    # Render cache használatakor: "memory", "disk" vagy "render"
+    cache: str = ""
+    # A mezők helye és szövege (groundtruth rekord), ha a batch rögzíti
+    truth: dict = None
+    # A PDF bájtjai, ha a batch archívba (shardokba) ír; a szülő folyamat írja ki
+    pdf: bytes = None
+
+
+@dataclass(frozen=True)
+class BatchConfig:
+    # Fázisonkénti mérés (JobResult.profile), tracemalloc-kal is, ha profile_memory
+    profile: bool = False
+    profile_memory: bool = False
+    # A cache.RenderCache paraméterei dict-ként ({} = alapértékek); None: nincs render cache
+    cache: dict = None
+    # A mezők helye és szövege (JobResult.truth, lásd groundtruth)
+    ground_truth: bool = False
+    # A PDF-ek kimeneti profilja ("default", "fast" vagy "small", lásd output)
+    output_profile: str = "default"
+    # A workerek nem írnak fájlt, a JobResult.pdf a PDF bájtjai
+    archive: bool = False
+    # A fájlok mappája (None: a workerben érvényes RenderConfig.output_dir)
+    output_dir: str = None
+    # Előkészített váz és számlák közti takarítás (lásd pool); a worker ennyi chunk után újraindul
+    pooled: bool = False
+    max_chunks_per_worker: int = None
+    # Process pool helyett szálak egy folyamaton belül (lásd config)
+    threads: bool = False
+
+    def __post_init__(self):
+        # A pooled (folyamat szintű GC beállítások), a tracemalloc és a worker újraindítás folyamatonkénti
+        if self.threads and (self.pooled or self.profile_memory or self.max_chunks_per_worker):
+            raise ValueError("a pooled, a profile_memory és a max_chunks_per_worker csak process poollal használható")
+
+
+DEFAULT_CONFIG = BatchConfig()
+
+
+@dataclass
+class BatchReport:
+    results: list = field(default_factory=list)
+    wall_seconds: float = 0.0
+    workers: int = 1
+    chunksize: int = 1
+
+    @property
+    def failed(self):
+        return [r for r in self.results if not r.ok]
+
+    @property
+    def cache_counts(self):
+        """Render cache használatakor a források darabszáma: ``{"memory": ..., "disk": ..., "render": ...}``."""
+        counts = {}
+        for r in self.results:
+            if r.cache:
+                counts[r.cache] = counts.get(r.cache, 0) + 1
+        return counts
+
+    @property
+    def invoices_per_second(self):
+        if self.wall_seconds <= 0:
+            return 0.0
+        return len(self.results) / self.wall_seconds
+
+
+def _normalize_job(index, job):
+    # (template, data) vagy (template, data, filename)
+    if len(job) == 2:
+        template, data = job
+        filename = f"{template}_{index:06d}.pdf"
+    else:
+        template, data, filename = job
+    return index, template, data, filename
+
+
+def _render_chunk(chunk, config=DEFAULT_CONFIG):
+    # A worker folyamatban fut: egy darab (chunk) jobot renderel le egymás után
+    if config.pooled:
+        from . import pool
+
+        pool.prepare()
+    cache = config.cache
+    if cache is not None:
+        from .cache import default_cache
+
+        render_cache = default_cache(**cache)
+    render_config = current_config()
+    render_config = replace(render_config, output_dir=config.output_dir or render_config.output_dir,
+                            output_profile=config.output_profile)
+    results = []
+    for index, template, data, filename in chunk:
+        start = time.perf_counter()
+        measured = (profile_invoice(template, filename, memory=config.profile_memory) if config.profile
+                    else nullcontext())
+        recorded = recording(template, filename) if config.ground_truth else nullcontext()
+        source = ""
+        pdf = None
+        # Jobonként újra: a kivétel ága ne lássa az előző job (vagy egy be nem állított) mérését
+        record = truth = None
+        try:
+            with using_config(render_config), measured as record, recorded as truth:
+                if config.archive:
+                    # Fájl helyett bájtok: a shardba a szülő folyamat fűzi sorban
+                    if cache is None:
+                        pdf = resolve_renderer(template)(data)
+                    else:
+                        pdf, source = render_cache.lookup(template, data)
+                elif cache is None:
+                    resolve_template(template)(filename, data)
+                else:
+                    source = render_cache.create(template, filename, data)
+        except Exception as exc:
+            results.append(JobResult(index, template, filename, False,
+                                     time.perf_counter() - start, f"{type(exc).__name__}: {exc}", record))
+        else:
+            results.append(JobResult(index, template, filename, True, time.perf_counter() - start,
+                                     profile=record, cache=source, truth=None if truth is None else truth.as_dict(),
+                                     pdf=pdf))
+        if config.pooled:
+            pool.after_document()
+    return results
+
+
+def _chunks(jobs, chunksize, start=0):
+    chunk = []
+    for index, job in enumerate(jobs, start):
+        chunk.append(_normalize_job(index, job))
+        if len(chunk) >= chunksize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_batch(jobs, workers=None, chunksize=8, max_pending=None, config=None, start=0):
+    """Jobok folyamatos renderelése process poolban, az eredményeket sorrendben adja vissza.
+
+    A ``jobs`` tetszőleges (akár végtelen) iterátor lehet: egyszerre legfeljebb
+    ``max_pending`` darab chunk van a poolnál, így a memóriahasználat nem nő a
+    jobok számával. A jobok sorszáma ``start``-tól indul (egy megszakadt batch
+    folytatásakor a kihagyott jobok után). A workerek renderelési beállításai a
+    ``config`` (``BatchConfig``, alapból ``DEFAULT_CONFIG``):
+
+    - ``profile=True``: a ``JobResult.profile`` a számla fázisonkénti mérése
+      (lásd ``profiling``), ``profile_memory=True`` esetén ``tracemalloc``-kal,
+    - ``cache`` (a ``cache.RenderCache`` paraméterei dict-ként, ``{}`` =
+      alapértékek): a workerek a render cache-en keresztül generálnak, a
+      ``JobResult.cache`` a találat forrása,
+    - ``ground_truth=True``: a ``JobResult.truth`` a mezők helye és szövege
+      (lásd ``groundtruth``); cache találatnál nincs renderelés, így rekord sem,
+    - ``output_profile``: a PDF-ek kimeneti profilja (``"default"``, ``"fast"``
+      vagy ``"small"``, lásd ``output``),
+    - ``archive=True``: a workerek nem írnak fájlt, a ``JobResult.pdf`` a PDF bájtjai,
+    - ``output_dir``: a fájlok mappája (alapból a ``config.RenderConfig``-é),
+    - ``pooled=True``: a workerek előkészített vázzal és számlák közti
+      takarítással renderelnek (lásd ``pool``); ``max_chunks_per_worker`` után a
+      worker folyamat újraindul, így a memóriája felülről korlátos,
+    - ``threads=True``: a workerek egy folyamaton belüli szálak (lásd
+      ``config``): free-threaded CPython-on ezek is párhuzamosan renderelnek, a
+      fontok és a tervek egy példányban vannak a memóriában. A ``pooled``
+      (folyamat szintű GC beállítások), a ``profile_memory`` (``tracemalloc``) és a
+      ``max_chunks_per_worker`` szálakkal nem használható.
+    """
+    config = config or DEFAULT_CONFIG
+    get_profile(config.output_profile)
+    workers = workers or os.cpu_count() or 1
+    if chunksize < 1:
+        raise ValueError("chunksize legalább 1 kell legyen")
+    max_pending = max_pending or workers * 2
+
+    if config.threads:
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="render")
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=config.max_chunks_per_worker)
+    with executor as pool:
+        pending = deque()
+        for chunk in _chunks(jobs, chunksize, start):
+            pending.append(pool.submit(_render_chunk, chunk, config))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def run_batch(jobs, workers=None, chunksize=8, max_pending=None, config=None, sinks=(), truth_sinks=(),
+              archive=None, start=0):
+    """Lerendereli az összes jobot és összesítő riportot ad vissza (job eredmények + időzítés).
+
+    A ``config`` (``BatchConfig``) a workerek beállításai, mint az ``iter_batch``-nél;
+    a ``profile``, a ``ground_truth`` és az ``archive`` mezőit a nyelők és az
+    archívum megadása állítja be. Ha ``sinks`` nem üres (pl. ``profiling.MemorySink``, ``profiling.JsonlSink``),
+    a számlák fázisonkénti mérése ezekbe kerül, ``truth_sinks`` esetén pedig a
+    számlák ground truth rekordjai (pl. ``profiling.JsonlSink``: egy NDJSON fájl a batch-hez).
+    ``archive`` (``archive.ShardWriter``) megadásakor a PDF-ek számlánkénti fájl
+    helyett sorban a shardokba kerülnek; a ``jobs`` ilyenkor a ``start``-adik
+    jobtól indul (lásd ``ShardWriter.next_index``). Ugyanígy írhat egy
+    ``bundle.BundleWriter`` gyűjtő PDF-be is.
+    """
+    workers = workers or os.cpu_count() or 1
+    began = time.perf_counter()
+    results = []
+    config = replace(config or DEFAULT_CONFIG, profile=bool(sinks), ground_truth=bool(truth_sinks),
+                     archive=archive is not None)
+    for result in iter_batch(jobs, workers, chunksize, max_pending, config, start):
+        if result.profile is not None:
+            for sink in sinks:
+                sink.emit(result.profile)
+        if result.truth is not None:
+            for sink in truth_sinks:
+                sink.emit(result.truth)
+        if result.pdf is not None:
+            archive.write(result.index, result.filename, result.pdf)
+            result.pdf = None
+        results.append(result)
+    return BatchReport(results, time.perf_counter() - began, workers, chunksize)
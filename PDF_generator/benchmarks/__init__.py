@@ -0,0 +1 @@
+"""Teljesítmény mérések (python -m PDF_generator.benchmarks.<név>)."""
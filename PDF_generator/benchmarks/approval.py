@@ -0,0 +1,96 @@
+"""Jóváhagyási döntési tábla: kiértékelés kötegben vs. számlánként.
+
+Az oszlopok (végösszeg, fizetési feltétel, szállítási mód) ``--size`` soros
+véletlen tömbök; mérjük az oszlopok kódolását, a fordított tábla
+kiértékelését (``first`` és ``collect``), valamint a számlánkénti
+``explain``-szerű Python kiértékelést egy mintán. Külön mérjük az oszlopok
+előállítását számla dict-ekből (a szintetikus generátor adataival).
+
+Futtatás: python -m PDF_generator.benchmarks.approval [--size 1000000] [--rules FILE]
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from ..approval import DEFAULT_RULES, _field_value, load_table, parse_amount
+from ..synthetic import SHIP_VIA, TERMS, make_invoice
+
+
+def _best(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def scalar_first(table, data):
+    """Számlánkénti kiértékelés a feltételek ``test`` metódusával (összehasonlítási alap)."""
+    for i, rule in enumerate(table.rules):
+        for field, condition in rule.conditions.items():
+            raw = _field_value(data, field)
+            if table.numeric[field]:
+                value = math.nan if raw is None else parse_amount(raw)
+            else:
+                value = "" if raw is None else str(raw).strip()
+            if not condition.test(value):
+                break
+        else:
+            return i
+    return -1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--rules", default=DEFAULT_RULES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scalar-sample", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    table = load_table(args.rules)
+    kinds = ", ".join(f"{field} ({'szám' if table.numeric[field] else 'szöveg'})" for field in table.inputs)
+    print(f"{table.name}: {len(table.rules)} szabály, bemenetek: {kinds}")
+
+    rng = np.random.default_rng(args.seed)
+    raw = {
+        "total": np.round(rng.lognormal(8.5, 1.5, args.size), 2),
+        "terms": rng.choice(np.array(TERMS, object), args.size),
+        "ship_via": rng.choice(np.array(SHIP_VIA + [None], object), args.size),
+    }
+    raw["total"][rng.random(args.size) < 0.01] = math.nan
+    raw = {field: raw[field] for field in table.inputs}
+
+    encode, columns = _best(lambda: table.from_arrays(**raw), 1)
+    print(f"oszlopok kódolása: {encode:.3f} s ({args.size / encode / 1e6:.2f} M sor/s)")
+    for policy in ("first", "collect"):
+        def run():
+            decisions = table.evaluate(columns)
+            return decisions.first() if policy == "first" else decisions.hits
+        seconds, result = _best(run, args.repeat)
+        print(f"kiértékelés ({policy}): {seconds * 1000:.1f} ms, {args.size / seconds / 1e6:.1f} M számla/s")
+    first = table.evaluate(columns).first()
+    counts = np.bincount(first + 1, minlength=len(table.rules) + 1)
+    print("első illeszkedés: " + ", ".join(f"{rule.id} {counts[i + 1]}" for i, rule in enumerate(table.rules))
+          + f", nincs {counts[0]}")
+
+    n = min(args.scalar_sample, args.size)
+    rows = [{field: (None if isinstance(raw[field][i], float) and math.isnan(raw[field][i]) else raw[field][i])
+             for field in table.inputs} for i in range(n)]
+    seconds, scalar = _best(lambda: [scalar_first(table, row) for row in rows], 1)
+    assert scalar == first[:n].tolist(), "a számlánkénti és a köteg kiértékelés eltér"
+    print(f"számlánként (Python, {n} sor): {n / seconds / 1e6:.3f} M számla/s")
+
+    invoices = [make_invoice(template, args.seed, i) for i in range(min(n, 20_000) // 3)
+                for template in ("simple", "modern", "general")]
+    seconds, _ = _best(lambda: table.columns(invoices), 3)
+    print(f"oszlopok számla dict-ekből ({len(invoices)} számla): "
+          f"{seconds / len(invoices) * 1e6:.2f} µs/számla")
+
+
+if __name__ == "__main__":
+    main()
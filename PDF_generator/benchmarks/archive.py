@@ -0,0 +1,94 @@
+"""Archív kimenet: számlánkénti fájlok vs. méretkorlátos shardok.
+
+``--count`` PDF-et írunk ki egy ideiglenes könyvtárba egyszer számlánként
+külön fájlba, egyszer ``archive.ShardWriter``-rel shardokba. A PDF-ek
+``--distinct`` darab valódi renderelt számla ismétlései (a renderelést nem
+mérjük). Mérjük az írást (fsync nélkül a fájloknál, a shardoknál lezáráskor),
+a listázást / index betöltést és a véletlen sorrendű olvasást (fájl
+megnyitás + olvasás vs. mmap szelet).
+
+Futtatás: python -m PDF_generator.benchmarks.archive [--count 100000] [--format zip]
+"""
+import argparse
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+
+from ..archive import FORMATS, Archive, ShardWriter
+from ..synthetic import make_invoice
+from ..templates import TEMPLATES, resolve_renderer
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--distinct", type=int, default=30)
+    parser.add_argument("--format", choices=FORMATS, default="zip")
+    parser.add_argument("--shard-mb", type=int, default=256)
+    parser.add_argument("--reads", type=int, default=10_000)
+    parser.add_argument("--dir", default=None, help="ideiglenes könyvtár helye (alapból a rendszer tmp)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    warnings.simplefilter("ignore")
+    logging.getLogger("fpdf").setLevel(logging.ERROR)
+    templates = list(TEMPLATES)
+    pdfs = [resolve_renderer(templates[i % 3])(make_invoice(templates[i % 3], args.seed, i))
+            for i in range(args.distinct)]
+    names = [f"{templates[i % 3]}_{args.seed}_{i:07d}.pdf" for i in range(args.count)]
+    total = sum(len(pdfs[i % len(pdfs)]) for i in range(args.count))
+    print(f"{args.count} számla, átlag {total / args.count / 1024:.1f} KiB, összesen {total / 2**20:.0f} MiB")
+
+    root = tempfile.mkdtemp(prefix="archive_bench_", dir=args.dir)
+    try:
+        files, shards = os.path.join(root, "files"), os.path.join(root, "shards")
+        os.makedirs(files)
+        start = time.perf_counter()
+        for i, name in enumerate(names):
+            with open(os.path.join(files, name), "wb") as f:
+                f.write(pdfs[i % len(pdfs)])
+        file_write = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ShardWriter(shards, args.shard_mb * 2**20, args.format) as writer:
+            for i, name in enumerate(names):
+                writer.write(i, name, pdfs[i % len(pdfs)])
+        shard_write = time.perf_counter() - start
+        print(f"írás: fájlok {file_write:.2f} s ({args.count / file_write:.0f}/s), "
+              f"shardok {shard_write:.2f} s ({args.count / shard_write:.0f}/s), {writer.shards} shard")
+
+        start = time.perf_counter()
+        listed = len(os.listdir(files))
+        file_list = time.perf_counter() - start
+        start = time.perf_counter()
+        archive = Archive(shards)
+        shard_list = time.perf_counter() - start
+        assert listed == len(archive) == args.count
+        print(f"listázás: fájlok {file_list * 1000:.0f} ms, shard indexek {shard_list * 1000:.0f} ms")
+
+        sample = random.Random(args.seed).choices(range(args.count), k=args.reads)
+        start = time.perf_counter()
+        for i in sample:
+            with open(os.path.join(files, names[i]), "rb") as f:
+                f.read()
+        file_read = time.perf_counter() - start
+        with archive:
+            start = time.perf_counter()
+            for i in sample:
+                archive.read(names[i])
+            shard_read = time.perf_counter() - start
+            assert all(archive.read(names[i]) == pdfs[i % len(pdfs)] for i in sample[:100])
+        print(f"véletlen olvasás: fájlok {file_read / args.reads * 1e6:.1f} µs, "
+              f"shardok (mmap) {shard_read / args.reads * 1e6:.1f} µs / számla")
+    finally:
+        shutil.rmtree(root)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
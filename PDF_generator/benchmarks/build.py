@@ -0,0 +1,91 @@
+"""Inkrementális build: a változás-ellenőrzés ideje egy nagy fixture korpuszon.
+
+``--count`` szintetikus számla (a három sablon váltakozva) egy korábbi build
+állapotát állítjuk elő renderelés nélkül: ideiglenes könyvtárban egy-egy
+kis fájl és a manifest a lenyomatokkal. Ezután mérjük a ``Plan`` bejárását
+változatlan bemenetre, majd úgy, hogy egy sablon (``--changed``) lenyomatai
+a manifestben régiek (mintha a sablon kódja módosult volna). Az újra
+renderelendő számlák idejét egy mintából becsüljük.
+
+Futtatás: python -m PDF_generator.benchmarks.build [--count 100000] [--changed modern]
+"""
+import argparse
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+from itertools import islice
+
+from ..cache import cache_key
+from ..manifest import Manifest, Plan
+from ..synthetic import iter_jobs
+from ..templates import TEMPLATES, resolve_renderer
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--changed", choices=list(TEMPLATES), default="modern")
+    parser.add_argument("--sample", type=int, default=20, help="ennyi számla renderelésével becsüljük a többit")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    warnings.simplefilter("ignore")
+    logging.getLogger("fpdf").setLevel(logging.ERROR)
+
+    start = time.perf_counter()
+    jobs = list(iter_jobs(list(TEMPLATES), seed=args.seed, count=args.count))
+    print(f"{args.count} számla adata: {time.perf_counter() - start:.1f} s")
+
+    root = tempfile.mkdtemp(prefix="build_bench_")
+    try:
+        path = os.path.join(root, "manifest.jsonl")
+        start = time.perf_counter()
+        with Manifest(path) as manifest:
+            for template, data, filename in jobs:
+                with open(os.path.join(root, filename), "wb") as f:
+                    f.write(b"%PDF-")
+                fingerprint = cache_key(template, data)
+                if template == args.changed:
+                    fingerprint = "regi-" + fingerprint
+                manifest.record(filename, template, fingerprint, 5)
+        print(f"előző build állapota (fájlok + manifest): {time.perf_counter() - start:.1f} s")
+
+        start = time.perf_counter()
+        manifest = Manifest(path)
+        loaded = time.perf_counter() - start
+        start = time.perf_counter()
+        todo = Plan(jobs, manifest, root)
+        entries = iter(todo)
+        sample = list(islice(entries, args.sample))   # a renderelési becsléshez
+        for _ in entries:
+            pass
+        checked = time.perf_counter() - start
+        print(f"manifest betöltés {loaded:.2f} s, ellenőrzés {checked:.2f} s "
+              f"({checked / args.count * 1e6:.1f} µs/számla): {todo.todo} újra, {todo.skipped} változatlan")
+
+        for filename, entry in list(manifest.entries.items()):
+            manifest.entries[filename] = (entry[0], entry[1].removeprefix("regi-"), entry[2])
+        start = time.perf_counter()
+        unchanged = Plan(jobs, manifest, root)
+        for _ in unchanged:
+            pass
+        print(f"változatlan korpusz: ellenőrzés {time.perf_counter() - start:.2f} s, {unchanged.todo} újra")
+
+        render = resolve_renderer(args.changed)
+        start = time.perf_counter()
+        for _, data, _ in sample:
+            render(data)
+        per_invoice = (time.perf_counter() - start) / max(1, len(sample))
+        print(f"a(z) {args.changed} sablon {todo.todo} számlájának renderelése becslés szerint "
+              f"{per_invoice * todo.todo:.0f} s egy magon ({per_invoice * 1000:.1f} ms/számla)")
+    finally:
+        shutil.rmtree(root)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
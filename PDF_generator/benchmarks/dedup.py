@@ -0,0 +1,163 @@
+"""Duplikátum index: beszúrási / keresési késleltetés és felismerési arány.
+
+Az indexbe ``--size`` szintetikus számla kerül (a három sablon váltakozva), majd
+kategóriánként ``--queries`` lekérdezés fut az index egy véletlen eleméből
+készített változattal:
+
+- ``format``: csak formázás (kis/nagybetű, szóközök, összeg írásmód) -> exact,
+- ``resend``: azonos számlaszám, szállító és összeg, más dátum / vevő cím -> key,
+- ``renumbered``: új számlaszám és egy elírás a vevő nevében -> near,
+- ``edited``: elírás, egy tétel leírása módosul, új dátum -> near,
+- ``distinct``: az indexben nem szereplő új számla (téves találat arány).
+
+Futtatás: python -m PDF_generator.benchmarks.dedup [--size 1000000] [--index FILE]
+"""
+import argparse
+from array import array
+import copy
+import os
+import random
+import sys
+import tempfile
+import time
+
+from ..dedup import DEFAULT_THRESHOLD, DuplicateIndex, fingerprint
+from ..profiling import percentile_summary
+from ..synthetic import make_invoice
+from .memory import peak_rss_mib
+
+TEMPLATES = ("simple", "modern", "general")
+NUMBER_KEYS = ("inv_number", "invoice_no", "invoice_id")
+CUSTOMER_KEYS = ("bill_to_text", "issued_to_name", "customer_name")
+DATE_KEYS = ("inv_date", "date")
+
+
+def invoice(seed, i):
+    return make_invoice(TEMPLATES[i % len(TEMPLATES)], seed, i)
+
+
+def _typo(rng, text):
+    words = text.split(" ")
+    candidates = [i for i, w in enumerate(words) if len(w) > 3]
+    if not candidates:
+        return text + "x"
+    i = rng.choice(candidates)
+    w = words[i]
+    j = rng.randrange(len(w) - 1)
+    words[i] = w[:j] + w[j + 1] + w[j] + w[j + 2:]
+    return " ".join(words)
+
+
+def _set_first(data, keys, change):
+    for key in keys:
+        if key in data:
+            data[key] = change(data[key])
+            return
+
+
+def reformat(rng, data):
+    data = copy.deepcopy(data)
+    for key, value in data.items():
+        if isinstance(value, str) and not key.startswith("_"):
+            value = value.replace("$ ", "$") if "$ " in value else value
+            data[key] = f"  {value.upper() if rng.random() < 0.5 else value}  "
+    return data
+
+
+def resend(rng, data):
+    data = copy.deepcopy(data)
+    _set_first(data, DATE_KEYS, lambda _: f"{rng.randint(1, 12)}/{rng.randint(1, 28)}/2031")
+    _set_first(data, ("issued_to_address", "customer_address", "bill_to_text"), lambda v: _typo(rng, v))
+    return data
+
+
+def renumber(rng, data):
+    data = copy.deepcopy(data)
+    _set_first(data, NUMBER_KEYS, lambda v: str(rng.randrange(10 ** 9)))
+    _set_first(data, CUSTOMER_KEYS, lambda v: _typo(rng, v))
+    return data
+
+
+def edit(rng, data):
+    data = renumber(rng, data)
+    _set_first(data, DATE_KEYS, lambda _: f"{rng.randint(1, 12)}/{rng.randint(1, 28)}/2031")
+    if data["items"]:
+        row = rng.choice(data["items"])
+        col = 1 if len(row) == 6 else 0
+        row[col] = _typo(rng, row[col])
+    return data
+
+
+VARIANTS = {"format": reformat, "resend": resend, "renumbered": renumber, "edited": edit}
+
+
+def _us(samples):
+    return "/".join(f"{v * 1e6:.0f}" for v in percentile_summary(samples).values())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100_000, help="számlák az indexben")
+    parser.add_argument("--queries", type=int, default=1000, help="lekérdezés kategóriánként")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--index", help="az index mentése ide (alapból ideiglenes fájl)")
+    args = parser.parse_args(argv)
+
+    rss_start = peak_rss_mib()
+    index = DuplicateIndex()
+    # Tömör minták: 1M beszúrásnál egy float lista is tíz MiB-okkal torzítaná az RSS-t
+    fp_times, insert_times = array("d"), array("d")
+    start = time.perf_counter()
+    for i in range(args.size):
+        data = invoice(args.seed, i)
+        t0 = time.perf_counter()
+        fp = fingerprint(data)
+        t1 = time.perf_counter()
+        index.add(data, i, fp)
+        insert_times.append(time.perf_counter() - t1)
+        fp_times.append(t1 - t0)
+    build = time.perf_counter() - start
+    rss_end = peak_rss_mib()
+    rss = "RSS nem mérhető" if rss_start is None else f"+{rss_end - rss_start:.0f} MiB RSS"
+    print(f"index: {len(index)} számla, {build:.1f} s (adatgenerálással), {rss}")
+    print(f"lenyomat p50/p95/p99 µs: {_us(fp_times)}, beszúrás (index) p50/p95/p99 µs: {_us(insert_times)}")
+
+    rng = random.Random(args.seed)
+    print(f"{'kategória':<11} {'felismerés':>10} {'fajta':>22} {'keresés p50/p95/p99 µs':>24}")
+    for name, variant in [*VARIANTS.items(), ("distinct", None)]:
+        hits, kinds, query_times = 0, {}, []
+        for q in range(args.queries):
+            if variant is None:
+                target, data = None, invoice(args.seed + 1, q)
+            else:
+                target = rng.randrange(args.size)
+                data = variant(rng, invoice(args.seed, target))
+            fp = fingerprint(data)
+            t0 = time.perf_counter()
+            matches = index.query(data, args.threshold, fp=fp)
+            query_times.append(time.perf_counter() - t0)
+            if variant is None:
+                hits += bool(matches)
+                continue
+            match = next((m for m in matches if m.id == target), None)
+            if match is not None:
+                hits += 1
+                kinds[match.kind] = kinds.get(match.kind, 0) + 1
+        label = "téves" if variant is None else "recall"
+        kind_text = ", ".join(f"{k} {v}" for k, v in sorted(kinds.items())) or "-"
+        print(f"{name:<11} {label} {hits / args.queries:>5.1%} {kind_text:>22} {_us(query_times):>24}")
+
+    path = args.index or os.path.join(tempfile.mkdtemp(), "dedup.idx")
+    t0 = time.perf_counter()
+    index.save(path)
+    saved = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    loaded = DuplicateIndex.load(path)
+    print(f"mentés {saved:.2f} s, betöltés {time.perf_counter() - t0:.2f} s, "
+          f"{os.path.getsize(path) / 2**20:.1f} MiB ({path})")
+    assert len(loaded) == len(index)
+
+
+if __name__ == "__main__":
+    main()
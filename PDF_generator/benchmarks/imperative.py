@@ -0,0 +1,473 @@
+"""A sablonok eredeti, imperatív (cellánként rajzoló) változata.
+
+Csak a benchmarkok használják viszonyítási alapként a lefordított
+elrendezési tervekkel (``layout``) szemben; ne módosítsd a sablonokkal együtt.
+"""
+from ..general_invoice import ComplexInvoice
+from ..modern_invoice import ModernInvoice
+from ..simple_invoice import SimpleInvoice
+
+
+class ImperativeModernInvoice(ModernInvoice):
+    def footer(self):
+        # Lábléc: "Thank You For Your Business" + Aláírás
+        self.set_y(-30)
+        self.set_font("Arial", "B", 10)
+        self.cell(0, 5, "Thank You For Your Business", align="C", ln=True)
+        self.ln(2)
+        self.set_font("Arial", "", 10)
+        # Ha a data-ban van aláíró név, azt használjuk, különben alapértelmezett
+        self.cell(0, 5, "Lorna Alvarado", align="C")
+
+
+def build_simple_invoice(data):
+    pdf = SimpleInvoice()
+    pdf.add_page()
+    pdf.set_auto_page_break(auto=True, margin=20)
+
+    # --- 1. FEJLÉC SZEKCIÓ (Két oszlopos elrendezés) ---
+    
+    # Y pozíció mentése a kezdéshez
+    start_y = 20
+    pdf.set_y(start_y)
+
+    # --- BAL OSZLOP (Issued To & Pay To) ---
+    pdf.set_x(10)
+    
+    # ISSUED TO
+    pdf.set_font("Arial", "B", 10)
+    pdf.cell(100, 5, "ISSUED TO:", ln=True)
+    
+    pdf.set_font("Arial", "", 10)
+    pdf.cell(100, 5, str(data.get("issued_to_name", "")), ln=True)
+    pdf.cell(100, 5, str(data.get("issued_to_company", "")), ln=True)
+    pdf.multi_cell(90, 5, str(data.get("issued_to_address", "")))
+    
+    pdf.ln(5) # Kis térköz
+
+    # PAY TO
+    pdf.set_font("Arial", "B", 10)
+    pdf.cell(100, 5, "PAY TO:", ln=True)
+    
+    pdf.set_font("Arial", "", 10)
+    pdf.cell(100, 5, str(data.get("pay_to_bank", "")), ln=True)
+    pdf.cell(100, 5, f"Account Name: {data.get('pay_to_acc_name', '')}", ln=True)
+    pdf.cell(100, 5, f"Account No.: {data.get('pay_to_acc_no', '')}", ln=True)
+
+    # Mentjük, hol végződött a bal oldal
+    left_column_end_y = pdf.get_y()
+
+    # --- JOBB OSZLOP (INVOICE felirat és dátumok) ---
+    # Visszaállunk a tetejére, de jobbra toljuk az X-et
+    pdf.set_xy(120, start_y)
+    
+    # INVOICE cím
+    pdf.set_font("Arial", "B", 24)
+    pdf.cell(70, 10, "INVOICE", align="R", ln=True)
+    
+    # Adatok (Invoice No, Date, Due Date)
+    pdf.set_font("Arial", "B", 10)
+    
+    def right_data_row(label, value):
+        pdf.set_x(120) # Mindig innen kezdjük a sort
+        pdf.set_font("Arial", "B", 10)
+        pdf.cell(35, 6, label, align="L")
+        pdf.set_font("Arial", "", 10)
+        pdf.cell(35, 6, value, align="R", ln=True)
+
+    pdf.ln(5)
+    right_data_row("INVOICE NO:", data.get("invoice_no", ""))
+    right_data_row("DATE:", data.get("date", ""))
+    right_data_row("DUE DATE:", data.get("due_date", ""))
+
+    # --- 2. TÁBLÁZAT ---
+    
+    # A táblázatnak a két oszlop közül a lejjebb lévő alatt kell kezdődnie
+    table_start_y = max(left_column_end_y, pdf.get_y()) + 15
+    pdf.set_y(table_start_y)
+
+    # Oszlopok: Description, Unit Price, Qty, Total
+    cols = [90, 35, 25, 40]
+    headers = ["DESCRIPTION", "UNIT PRICE", "QTY", "TOTAL"]
+
+    # Fejléc
+    pdf.set_font("Arial", "B", 9)
+    pdf.set_fill_color(255, 255, 255) # Fehér háttér (minimalista)
+    
+    for i, h in enumerate(headers):
+        align = "L" if i == 0 else "R"
+        pdf.cell(cols[i], 8, h, border="B", align=align) # Csak alsó vonal
+    pdf.ln(10)
+
+    # Tételek
+    pdf.set_font("Arial", "", 9)
+    items = data.get("items", [])
+
+    for item in items:
+        # item = [Desc, Price, Qty, Total]
+        
+        # Mentés a multi_cell miatt
+        x_start = pdf.get_x()
+        y_start = pdf.get_y()
+
+        # 1. Description (ez lehet többsoros)
+        pdf.multi_cell(cols[0], 6, str(item[0]), align="L")
+        y_end = pdf.get_y()
+
+        # Visszaállunk a sor tetejére
+        pdf.set_xy(x_start + cols[0], y_start)
+
+        # 2. Unit Price
+        pdf.cell(cols[1], 6, str(item[1]), align="R")
+        # 3. Qty
+        pdf.cell(cols[2], 6, str(item[2]), align="R")
+        # 4. Total
+        pdf.cell(cols[3], 6, str(item[3]), align="R")
+
+        # Következő sor pozíciója
+        pdf.set_xy(10, y_end)
+        pdf.ln(2) # Kis sorköz
+
+    # --- 3. ÖSSZESÍTŐ (Totals) ---
+    pdf.ln(5)
+    
+    # Csak a jobb oldalra írunk, igazítva a táblázat széléhez
+    x_totals = 135 
+    
+    def total_line(label, value, bold=False):
+        pdf.set_x(x_totals)
+        pdf.set_font("Arial", "B" if bold else "", 10)
+        pdf.cell(25, 6, label, align="L") # Label
+        pdf.cell(30, 6, value, align="R", ln=True) # Value
+
+    total_line("SUBTOTAL", data.get("subtotal", ""))
+    total_line("Tax", data.get("tax", ""))
+    pdf.ln(2)
+    # Végösszeg vastagon
+    pdf.set_font("Arial", "B", 12)
+    pdf.set_x(x_totals)
+    pdf.cell(25, 8, "TOTAL", align="L")
+    pdf.cell(30, 8, data.get("total_amount", ""), align="R", ln=True)
+
+    # --- 4. ALÁÍRÁS / LÁBLÉC ---
+    # Bal oldalra, alulra
+    pdf.ln(15)
+    pdf.set_x(10)
+    pdf.set_font("Arial", "B", 10)
+    pdf.cell(0, 5, str(data.get("signer_name", "")), ln=True)
+    
+    return pdf
+
+
+def build_modern_invoice(data):
+    pdf = ImperativeModernInvoice()
+    pdf.add_page()
+    pdf.set_auto_page_break(auto=True, margin=35) # Nagyobb margó alul a láblécnek
+
+    # --- 1. FEJLÉC SZEKCIÓ ---
+    
+    # Jobb oldal: INVOICE felirat és ID
+    pdf.set_xy(110, 20)
+    pdf.set_font("Arial", "B", 24)
+    pdf.cell(90, 10, "INVOICE", align="R", ln=True)
+    
+    pdf.set_x(110)
+    pdf.set_font("Arial", "", 10)
+    # Ha nincs ID, akkor placeholder
+    inv_id = data.get("invoice_id", "#000000")
+    pdf.cell(90, 6, f"Invoice ID: {inv_id}", align="R", ln=True)
+
+    # Bal oldal: INVOICE TO adatok
+    # Visszaugrunk a bal oldalra fentre
+    pdf.set_xy(10, 20)
+    pdf.set_font("Arial", "B", 10)
+    pdf.cell(100, 6, "INVOICE TO", ln=True)
+    
+    pdf.set_font("Arial", "", 10)
+    pdf.cell(100, 6, str(data.get("customer_name", "")), ln=True)
+    pdf.cell(100, 6, str(data.get("customer_phone", "")), ln=True)
+    pdf.cell(100, 6, str(data.get("customer_email", "")), ln=True)
+    # Multi_cell a címnek, ha hosszú lenne
+    pdf.multi_cell(90, 6, str(data.get("customer_address", "")))
+
+    pdf.ln(15) # Nagyobb térköz a táblázat előtt
+
+    # --- 2. TERMÉK TÁBLÁZAT (Minimalista stílus) ---
+    
+    # Oszlop szélességek: Product, Price, Qty, Total
+    # A kép alapján a Product széles, a többi keskenyebb
+    cols = [95, 30, 20, 45] 
+    headers = ["PRODUCT", "PRICE", "QTY", "TOTAL"]
+    
+    # Táblázat fejléce (Szürke háttérrel, hogy modern legyen)
+    pdf.set_fill_color(240, 240, 240) # Világosszürke
+    pdf.set_font("Arial", "B", 9)
+    
+    for i, h in enumerate(headers):
+        # Align: Product balra, számok jobbra vagy középre
+        align = "L" if i == 0 else "C" if i == 2 else "R"
+        pdf.cell(cols[i], 10, h, border=0, fill=True, align=align)
+    pdf.ln()
+
+    # Tételek kiírása
+    pdf.set_font("Arial", "", 9)
+    items = data.get("items", [])
+    
+    # Váltakozó sorszínezés vagy csak sima fehér? A kép fehér. Maradjunk a fehérnél.
+    for item in items:
+        # item = [Name, Price, Qty, Total]
+        
+        # Mentjük a pozíciót a multi_cell miatt
+        x_start = pdf.get_x()
+        y_start = pdf.get_y()
+        
+        # 1. PRODUCT (Multi_cell, ha hosszú a név)
+        pdf.multi_cell(cols[0], 8, str(item[0]), align="L")
+        y_end = pdf.get_y()
+        
+        # Visszaállunk a sor tetejére a többi oszlophoz
+        pdf.set_xy(x_start + cols[0], y_start)
+        
+        # 2. PRICE
+        pdf.cell(cols[1], 8, str(item[1]), align="R")
+        # 3. QTY
+        pdf.cell(cols[2], 8, str(item[2]), align="C")
+        # 4. TOTAL
+        pdf.cell(cols[3], 8, str(item[3]), align="R")
+        
+        # Következő sor pozíciója
+        pdf.set_xy(10, y_end)
+        
+        # Opcionális: vékony elválasztó vonal minden sor alá (nagyon halvány)
+        pdf.set_draw_color(230, 230, 230)
+        pdf.line(10, y_end, 200, y_end)
+        pdf.set_draw_color(0, 0, 0) # Vissza feketére
+
+    pdf.ln(5)
+
+    # --- 3. LÁBLÉC INFÓK (Bank + Összesítő) ---
+    
+    y_bottom = pdf.get_y()
+    
+    # BAL OLDAL: PAYMENT METHOD
+    pdf.set_xy(10, y_bottom)
+    pdf.set_font("Arial", "B", 10)
+    pdf.cell(80, 8, "PAYMENT METHOD", ln=True)
+    
+    pdf.set_font("Arial", "", 9)
+    # Kis segédfüggvény a banki adatokhoz (Label: Value)
+    def bank_row(label, value):
+        pdf.set_font("Arial", "B", 9)
+        pdf.cell(20, 6, label, align="L")
+        pdf.set_font("Arial", "", 9)
+        pdf.cell(50, 6, f":  {value}", align="L", ln=True)
+
+    bank_row("Name", data.get("bank_name", ""))
+    bank_row("ID Bank", data.get("bank_id", ""))
+    bank_row("Bank", data.get("bank_institute", ""))
+
+    # JOBB OLDAL: TOTALS (Sub-total, Tax, Total)
+    # Kiszámoljuk, hol kezdődjön (pl. 120-as x koordináta)
+    pdf.set_xy(120, y_bottom)
+    
+    def total_row(label, value, is_final=False):
+        pdf.set_x(120)
+        pdf.set_font("Arial", "B" if is_final else "", 10)
+        # Címke
+        pdf.cell(40, 8, label, align="L")
+        # Érték
+        pdf.cell(40, 8, value, align="R", ln=True)
+
+    total_row("SUB-TOTAL", data.get("subtotal", "$ 0.00"))
+    total_row("TAX (20%)", data.get("tax", "$ 0.00"))
+    
+    # Vastag betűs végösszeg, esetleg kék színnel, vagy marad fekete
+    pdf.set_text_color(0, 0, 0) 
+    total_row("TOTAL", data.get("grand_total", "$ 0.00"), is_final=True)
+
+    return pdf
+
+
+def build_complex_invoice(data):
+    pdf = ComplexInvoice()
+    pdf.add_page()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    
+    # --- 1. FEJLÉC SZEKCIÓ ---
+    
+    # BAL OLDAL: Bill To
+    pdf.set_xy(10, 10)
+    pdf.set_font("Arial", "B", 10)
+    pdf.cell(60, 5, "Bill To", ln=True)
+    pdf.set_font("Arial", "", 9)
+    pdf.multi_cell(60, 4, data.get("bill_to_text", ""))
+    
+    # KÖZÉP: Remit To
+    pdf.set_xy(80, 10)
+    pdf.set_font("Arial", "B", 10)
+    pdf.cell(60, 5, "Remit to", ln=True)
+    pdf.set_xy(80, 15)
+    pdf.set_font("Arial", "", 9)
+    pdf.multi_cell(60, 4, data.get("remit_to_text", ""))
+    
+    # JOBB OLDAL: INVOICE cím és adatok
+    pdf.set_xy(140, 10)
+    pdf.set_font("Arial", "B", 24)
+    pdf.cell(60, 10, "INVOICE", align="R", ln=True)
+    
+    # Invoice Adattábla (Number, Date, PO)
+    pdf.set_xy(140, 25)
+    pdf.set_font("Arial", "B", 9)
+    
+    # Segédfüggvény a kis táblázathoz jobb oldalt
+    def right_header_row(label, value):
+        x = pdf.get_x()
+        y = pdf.get_y()
+        pdf.rect(x, y, 25, 6) # Label box
+        pdf.rect(x+25, y, 35, 6) # Value box
+        pdf.cell(25, 6, label, border=0)
+        pdf.set_font("Arial", "", 9)
+        pdf.cell(35, 6, str(value), border=0, align="C")
+        pdf.set_font("Arial", "B", 9)
+        pdf.ln(6)
+        pdf.set_x(140)
+
+    pdf.set_x(140)
+    right_header_row("Number:", data.get("inv_number", ""))
+    right_header_row("Date:", data.get("inv_date", ""))
+    right_header_row("PO:", data.get("po_number", ""))
+
+    # --- 2. KÖZÉPSŐ INFORMÁCIÓS SÁV ---
+
+    pdf.ln(10) # Kis hézag
+    
+    # Source info
+    pdf.set_x(10)
+    pdf.set_font("Arial", "", 9)
+    pdf.cell(0, 5, f"Source: {data.get('source_ref', '')}", ln=True)
+    
+    # A hosszú vízszintes táblázat
+    # Oszlop szélességek
+    cols = [15, 25, 30, 30, 30, 20, 15, 25]
+    headers = ["Acct.#", "A/R Cust.#", "Acct. ID", "Customer P.O.", "Attn to", "Sales Rep", "Ship Via", "Terms"]
+    values = [
+        data.get("acct_num", ""),
+        data.get("ar_cust", ""),
+        data.get("acct_id", ""),
+        data.get("cust_po", ""),
+        data.get("attn", ""),
+        data.get("sales_rep", ""),
+        data.get("ship_via", ""),
+        data.get("terms", "")
+    ]
+    
+    # Fejléc sor
+    pdf.set_font("Arial", "B", 7)
+    start_y = pdf.get_y() + 2
+    pdf.set_y(start_y)
+    
+    for i, h in enumerate(headers):
+        pdf.cell(cols[i], 5, h, border=1, align="C")
+    pdf.ln()
+    
+    # Adat sor
+    pdf.set_font("Arial", "", 7)
+    for i, v in enumerate(values):
+        # Multi_cell trükk, ha a szöveg túl hosszú lenne a cellába
+        x = pdf.get_x()
+        y = pdf.get_y()
+        pdf.cell(cols[i], 8, str(v), border=1, align="C")
+    pdf.ln(12)
+
+    # --- 3. WORK REQUESTED / PERFORMED ---
+    pdf.set_font("Arial", "B", 9)
+    pdf.cell(0, 5, "Work Requested:", ln=True)
+    pdf.set_font("Arial", "", 9)
+    pdf.multi_cell(0, 5, data.get("work_requested", ""))
+    pdf.ln(2)
+    
+    pdf.set_font("Arial", "B", 9)
+    pdf.cell(0, 5, "Work Performed:", ln=True)
+    pdf.set_font("Arial", "", 9)
+    pdf.multi_cell(0, 5, data.get("work_performed", ""))
+    pdf.ln(5)
+
+    # --- 4. FŐ TÉTEL TÁBLÁZAT (Items) ---
+
+    col_widths = [25, 80, 15, 15, 25, 30]
+    table_headers = ["Part Number", "Description", "Qty.", "UOM", "Ea. Price", "Total"]
+    
+    # Fejléc
+    pdf.set_font("Arial", "B", 9)
+    for i, h in enumerate(table_headers):
+        pdf.cell(col_widths[i], 6, h, border="B", align="L" if i==1 else "C")
+    pdf.ln(8)
+    
+    # Tételek listázása
+    pdf.set_font("Arial", "", 9)
+    items = data.get("items", [])
+    
+    grand_total = 0
+    
+    for item in items:
+
+        line_height = 5
+        
+        # Mentjük a pozíciót
+        x_start = pdf.get_x()
+        y_start = pdf.get_y()
+        
+        # 1. oszlop
+        pdf.cell(col_widths[0], line_height, str(item[0]), align="C")
+        
+        # 2. oszlop (Description) - ez lehet többsoros
+        x_desc = pdf.get_x()
+        pdf.multi_cell(col_widths[1], line_height, str(item[1]), align="L")
+        y_end = pdf.get_y() 
+        
+        # Visszaállunk a sor tetejére a többi oszlophoz
+        pdf.set_xy(x_start + col_widths[0] + col_widths[1], y_start)
+        
+        # 3. Qty
+        pdf.cell(col_widths[2], line_height, str(item[2]), align="C")
+        # 4. UOM
+        pdf.cell(col_widths[3], line_height, str(item[3]), align="C")
+        # 5. Price
+        pdf.cell(col_widths[4], line_height, str(item[4]), align="R")
+        # 6. Total
+        pdf.cell(col_widths[5], line_height, str(item[5]), align="R")
+        
+        # Következő sor pozíciója
+        pdf.set_xy(10, max(y_end, y_start + line_height))
+        pdf.ln(1)
+
+    # Vonal a táblázat alján
+    pdf.line(10, pdf.get_y(), 200, pdf.get_y())
+    pdf.ln(2)
+
+    # --- 5. ÖSSZESÍTŐ (Totals) ---
+
+    y_totals = pdf.get_y()
+    left_margin_totals = 140
+    
+    # Notes (Bal oldal)
+    pdf.set_xy(10, y_totals)
+    pdf.set_font("Arial", "", 8)
+    pdf.multi_cell(110, 4, data.get("notes", ""), border=0)
+    
+    # Számok (Jobb oldal)
+    pdf.set_xy(left_margin_totals, y_totals)
+    
+    def print_total_row(label, value, bold=False):
+        pdf.set_x(left_margin_totals)
+        pdf.set_font("Arial", "B" if bold else "", 9)
+        pdf.cell(35, 6, label, align="R")
+        pdf.cell(25, 6, value, align="R", border="B" if bold else 0)
+        pdf.ln()
+
+    print_total_row("Item Total:", data.get("total_net", "$ 0.00"))
+    print_total_row("Sales Tax:", data.get("tax", "$ 0.00"))
+    pdf.ln(1)
+    print_total_row("Total Amount Due:", data.get("total_gross", "$ 0.00"), bold=True)
+
+    return pdf
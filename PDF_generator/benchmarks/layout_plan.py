@@ -0,0 +1,61 @@
+"""Lefordított elrendezési terv vs. az eredeti imperatív rajzolás, számlánkénti CPU idő.
+
+Két fázist mérünk külön: a dokumentum felépítését (layout, ``build_*``) és a
+teljes renderelést (``build_*`` + ``output()``), sablononként.
+
+Futtatás: python -m PDF_generator.benchmarks.layout_plan [-n DARAB] [--seed SEED]
+"""
+import argparse
+import logging
+import statistics
+import sys
+import time
+import warnings
+
+from .. import general_invoice, modern_invoice, simple_invoice
+from ..synthetic import make_invoice
+from . import imperative
+
+CASES = {
+    "simple": (imperative.build_simple_invoice, simple_invoice.build_simple_invoice),
+    "modern": (imperative.build_modern_invoice, modern_invoice.build_modern_invoice),
+    "general": (imperative.build_complex_invoice, general_invoice.build_complex_invoice),
+}
+
+
+def cpu_ms(build, invoices, serialize):
+    times = []
+    for data in invoices:
+        start = time.process_time()
+        pdf = build(data)
+        if serialize:
+            pdf.output()
+        times.append((time.process_time() - start) * 1000)
+    return statistics.median(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--count", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    # A hiányzó glyph figyelmeztetések és az fpdf deprecation üzenetei nem érdekesek itt
+    warnings.simplefilter("ignore")
+    logging.getLogger("fpdf").setLevel(logging.ERROR)
+
+    print(f"{'sablon':<8} {'fázis':<8} {'imperatív ms':>13} {'terv ms':>9} {'gyorsulás':>10}")
+    for template, (legacy, planned) in CASES.items():
+        invoices = [make_invoice(template, args.seed, i) for i in range(args.count)]
+        # Bemelegítés: fontok, lefordított terv
+        legacy(invoices[0]).output()
+        planned(invoices[0]).output()
+        for phase, serialize in [("layout", False), ("teljes", True)]:
+            old = cpu_ms(legacy, invoices, serialize)
+            new = cpu_ms(planned, invoices, serialize)
+            print(f"{template:<8} {phase:<8} {old:>13.2f} {new:>9.2f} {old / new:>9.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""Folyamatok memóriája a benchmarkokhoz, platformfüggetlenül (MiB; ha nem mérhető, None).
+
+Linuxon a ``/proc``, más Unixon a ``resource`` modul a forrás, Windowson a
+``psutil`` (opcionális: ``pip install psutil``). Ha egyik sem érhető el, a
+mérés ``None``: a benchmarkok ilyenkor ``n/a``-t írnak, és nem állnak le.
+"""
+import os
+import sys
+
+try:
+    import resource
+except ImportError:     # Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def peak_rss_mib():
+    """Az aktuális folyamat csúcs RSS-e."""
+    if resource is not None:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linuxon KiB, macOS-en bájt
+        return (rss if sys.platform == "darwin" else rss * 1024) / 2**20
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / 2**20
+    return None
+
+
+def rss_mib(pid=None):
+    """Egy folyamat aktuális RSS-e (alapból az aktuálisé; ha csak a csúcs mérhető, az)."""
+    pid = pid or os.getpid()
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        pass
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).memory_info().rss / 2**20
+        except psutil.Error:
+            return None
+    return peak_rss_mib() if pid == os.getpid() else None
+
+
+def child_pids(pid=None):
+    """A folyamat közvetlen gyerekei (``/proc`` vagy ``psutil`` nélkül üres lista)."""
+    pid = pid or os.getpid()
+    if psutil is not None:
+        try:
+            return [child.pid for child in psutil.Process(pid).children()]
+        except psutil.Error:
+            return []
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return []
+    children = []
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # A parancs neve zárójelben áll és szóközt is tartalmazhat
+                fields = f.read().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(entry))
+    return children
+
+
+def format_mib(value, width=8):
+    """``value`` MiB egy tizedessel, jobbra igazítva; a nem mért érték ``n/a``."""
+    return f"{'n/a':>{width}}" if value is None else f"{value:>{width}.1f}"
@@ -0,0 +1,86 @@
+"""Pénz modell: számlák összegeinek ellenőrzése kötegben.
+
+``--size`` számla csak a pénz mezőkkel (tételek: egységár, mennyiség,
+sorösszeg; részösszeg, adó, végösszeg), a sablon formátumában, konzisztens
+összegekkel; ezek ``--inject`` aránya elrontva. Mérjük a szövegek
+értelmezését (``MoneyBatch``), az ellenőrzést, és hogy minden elrontott
+számlát megtalál-e, hibás találat nélkül.
+
+Futtatás: python -m PDF_generator.benchmarks.money [--size 1000000] [--template modern]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from ..money import (SCHEMAS, MoneyBatch, apply_rate, check, format_money, inject, line_total, parse_money)
+
+
+def make_invoices(template, size, seed):
+    """Csak pénz mezős számlák; a tételszám 1..12, az egységár 1..1000 dollár."""
+    schema = SCHEMAS[template]
+    rng = np.random.default_rng(seed)
+    counts = rng.integers(1, 13, size)
+    prices = rng.integers(100, 100_000, counts.sum()).tolist()
+    if schema.tax_percent or schema.price_format.decimals == 0:
+        prices = [p - p % 100 for p in prices]
+    qtys = rng.integers(1, 11, counts.sum()).tolist()
+    width = max(schema.price_col, schema.qty_col, schema.line_col) + 1
+    fmt, price_fmt, qty_fmt = schema.amount_format, schema.price_format, schema.qty_format
+    invoices, start = [], 0
+    for count in counts.tolist():
+        items, subtotal = [], 0
+        for price, qty in zip(prices[start:start + count], qtys[start:start + count]):
+            line = line_total(price, qty * 100)
+            subtotal += line
+            row = [""] * width
+            row[schema.price_col] = format_money(price, price_fmt)
+            row[schema.qty_col] = format_money(qty * 100, qty_fmt)
+            row[schema.line_col] = format_money(line, fmt)
+            items.append(row)
+        start += count
+        rate = 1000 if schema.tax_percent else (schema.tax_rate or 0)
+        tax = apply_rate(subtotal, rate)
+        invoices.append({"items": items, schema.subtotal: format_money(subtotal, fmt),
+                         schema.tax: "10%" if schema.tax_percent else format_money(tax, fmt),
+                         schema.total: format_money(subtotal + tax, fmt)})
+    return invoices
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--template", choices=list(SCHEMAS), default="modern")
+    parser.add_argument("--inject", type=float, default=0.01, help="az elrontott számlák aránya")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    invoices = make_invoices(args.template, args.size, args.seed)
+    injected = inject(args.template, invoices, args.inject, args.seed)
+    items = sum(len(data["items"]) for data in invoices)
+    print(f"{args.size} számla ({args.template}), {items} tétel, {len(injected)} elrontva; "
+          f"generálás {time.perf_counter() - start:.1f} s")
+
+    parse_money.cache_clear()
+    start = time.perf_counter()
+    batch = MoneyBatch.from_invoices(args.template, invoices)
+    parsed = time.perf_counter() - start
+    start = time.perf_counter()
+    report = check(args.template, batch)
+    checked = time.perf_counter() - start
+    info = parse_money.cache_info()
+    strings = items * 3 + args.size * (2 if SCHEMAS[args.template].tax_percent else 3)
+    print(f"értelmezés: {parsed:.2f} s ({args.size / parsed / 1e6:.2f} M számla/s, {strings / parsed / 1e6:.1f} M "
+          f"szöveg/s, ebből egyenként: {info.hits + info.misses})")
+    print(f"ellenőrzés (NumPy): {checked * 1000:.0f} ms ({args.size / checked / 1e6:.1f} M számla/s)")
+    print(f"összesen: {parsed + checked:.2f} s")
+
+    expected = {index for index, _ in injected}
+    found = set(report.inconsistent.tolist())
+    print(f"eltérések: {report.counts()}; megtalált {len(expected & found)}/{len(expected)}, "
+          f"téves {len(found - expected)}")
+
+
+if __name__ == "__main__":
+    main()
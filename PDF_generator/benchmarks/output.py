@@ -0,0 +1,75 @@
+"""Kimeneti profilok: PDF méret és renderelési idő számlánként, sablononként.
+
+Minden sablonra ugyanazt a ``-n`` szintetikus számlát rendereljük memóriába
+mindhárom profillal (``default``, ``fast``, ``small``, lásd ``output``), és
+mérjük a számlánkénti átlagos méretet és a CPU idő mediánját (a teljes
+renderelés és külön a szerializálás). A profilok körönként váltakoznak, így a
+gép terhelésének ingadozása mindegyiket egyformán éri.
+
+Futtatás: python -m PDF_generator.benchmarks.output [-n DARAB] [--seed SEED]
+"""
+import argparse
+import logging
+import statistics
+import sys
+import time
+import warnings
+
+from ..output import PROFILES, output_profile, write_pdf
+from ..synthetic import make_invoice
+from ..templates import TEMPLATES, template_module
+
+BUILDERS = {
+    "simple": "build_simple_invoice",
+    "modern": "build_modern_invoice",
+    "general": "build_complex_invoice",
+}
+
+
+def render_ms(build, data):
+    """``(teljes ms, szerializálás ms, bájtok)`` egy számlára, CPU időben."""
+    start = time.process_time()
+    pdf = build(data)
+    built = time.process_time()
+    size = len(write_pdf(pdf))
+    end = time.process_time()
+    return (end - start) * 1000, (end - built) * 1000, size
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--count", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    warnings.simplefilter("ignore")
+    logging.getLogger("fpdf").setLevel(logging.ERROR)
+
+    print(f"{'sablon':<8} {'profil':<8} {'bájt/számla':>12} {'méret':>7} {'ms/számla':>10} {'ebből kiírás':>13} "
+          f"{'idő':>7}")
+    for template in TEMPLATES:
+        build = getattr(template_module(template), BUILDERS[template])
+        invoices = [make_invoice(template, args.seed, i) for i in range(args.count)]
+        results = {name: [] for name in PROFILES}
+        # Bemelegítés: fontok (a small profilnál a hinting nélküli változat), háttér, terv
+        for name in PROFILES:
+            with output_profile(name):
+                render_ms(build, invoices[0])
+        for data in invoices:
+            for name in PROFILES:
+                with output_profile(name):
+                    results[name].append(render_ms(build, data))
+        base_size = base_ms = None
+        for name, rows in results.items():
+            total, output, size = zip(*rows)
+            size = statistics.mean(size)
+            ms = statistics.median(total)
+            if base_size is None:
+                base_size, base_ms = size, ms
+            print(f"{template:<8} {name:<8} {size:>12.0f} {size / base_size:>6.0%} {ms:>10.2f} "
+                  f"{statistics.median(output):>13.2f} {ms / base_ms:>6.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""Tartós terhelés (soak): memória és késleltetés sok ezer számla után, pooled mód nélkül és vele.
+
+Módonként egy friss worker folyamat ``--count`` szintetikus számlát renderel
+memóriába egymás után (az adat generálása nem számít bele). ``--window``
+számlánként kiírjuk az aktuális RSS-t, az ablak késleltetés p50 / p99
+értékét és a ciklikus GC-ben töltött időt. A végén a második fél RSS
+növekedését 1000 számlára vetítjük: ha a pooled mód ennél többet nő, mint
+``--max-growth-mb``, a kilépési kód 1.
+
+Futtatás: python -m PDF_generator.benchmarks.soak [--count 20000] [--template general]
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import gc
+import logging
+import sys
+import time
+import warnings
+
+from ..profiling import percentile_summary
+from ..synthetic import make_invoice
+from .memory import format_mib, rss_mib
+from ..templates import TEMPLATES, resolve_renderer
+
+MODES = ("plain", "pooled")
+
+
+def soak(mode, template, count, window, seed):
+    """Egy worker futása; ablakonként ``(számlák, RSS MiB, p50 ms, p99 ms, GC ms)``."""
+    warnings.simplefilter("ignore")
+    logging.getLogger("fpdf").setLevel(logging.ERROR)
+    if mode == "pooled":
+        from .. import pool
+
+        pool.prepare()
+        render = partial(pool.render, template)
+    else:
+        render = resolve_renderer(template)
+
+    gc_seconds = [0.0]
+    started = [0.0]
+
+    def on_gc(phase, info):
+        if phase == "start":
+            started[0] = time.perf_counter()
+        else:
+            gc_seconds[0] += time.perf_counter() - started[0]
+
+    gc.callbacks.append(on_gc)
+    rows, latencies = [], []
+    for index in range(count):
+        data = make_invoice(template, seed, index)
+        start = time.perf_counter()
+        render(data)
+        latencies.append(time.perf_counter() - start)
+        if len(latencies) == window:
+            stats = percentile_summary(latencies, (50, 99))
+            rows.append((index + 1, rss_mib(), stats["p50"] * 1000, stats["p99"] * 1000, gc_seconds[0] * 1000))
+            latencies, gc_seconds[0] = [], 0.0
+    gc.callbacks.remove(on_gc)
+    return rows
+
+
+def growth_per_1000(rows):
+    """A második fél RSS növekedése 1000 számlára vetítve (MiB); ha az RSS nem mérhető, None."""
+    half = rows[len(rows) // 2 - 1] if len(rows) > 1 else rows[0]
+    last = rows[-1]
+    if half[1] is None or last[1] is None:
+        return None
+    return (last[1] - half[1]) / max(1, last[0] - half[0]) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=20_000)
+    parser.add_argument("--window", type=int, default=1000)
+    parser.add_argument("--template", choices=list(TEMPLATES), default="general")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--max-growth-mb", type=float, default=2.0,
+                        help="megengedett RSS növekedés 1000 számlánként a második félben")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    if args.count < args.window:
+        parser.error("a --count legalább a --window legyen")
+
+    results = {}
+    for mode in args.modes:
+        # Módonként friss folyamat, hogy az RSS és a GC állapot ne keveredjen
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            rows = executor.submit(soak, mode, args.template, args.count, args.window, args.seed).result()
+        results[mode] = rows
+        print(f"{mode}: {args.count} {args.template} számla")
+        print(f"  {'számla':>8} {'RSS MiB':>8} {'p50 ms':>7} {'p99 ms':>7} {'GC ms':>7}")
+        for done, rss, p50, p99, gc_ms in rows:
+            print(f"  {done:>8} {format_mib(rss)} {p50:>7.1f} {p99:>7.1f} {gc_ms:>7.0f}")
+        growth = growth_per_1000(rows)
+        if growth is None:
+            print("  RSS növekedés: nem mérhető (lásd benchmarks.memory)")
+        else:
+            print(f"  RSS növekedés a második félben: {growth:+.2f} MiB / 1000 számla")
+
+    growth = growth_per_1000(results["pooled"]) if "pooled" in results else None
+    if growth is not None and growth > args.max_growth_mb:
+        print(f"A pooled mód memóriája nő (> {args.max_growth_mb} MiB / 1000 számla)", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
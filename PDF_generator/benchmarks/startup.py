@@ -0,0 +1,57 @@
+"""Indulási idő mérése: a sablon modulok importja és a CLI ``--help`` friss interpreterben.
+
+Futtatás: python -m PDF_generator.benchmarks.startup [-r ISMÉTLÉS]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Az import közben hívott os.makedirs-eket is megszámoljuk: az importnak nem szabad I/O-t végeznie
+_IMPORT_SNIPPET = (
+    "import os; calls = []; _makedirs = os.makedirs; "
+    "os.makedirs = lambda *a, **k: calls.append(a) or _makedirs(*a, **k); "
+    "import {module}; print(len(calls))"
+)
+
+CASES = {
+    "import PDF_generator": [sys.executable, "-c", _IMPORT_SNIPPET.format(module="PDF_generator")],
+    "import simple_invoice": [sys.executable, "-c", _IMPORT_SNIPPET.format(module="PDF_generator.simple_invoice")],
+    "import modern_invoice": [sys.executable, "-c", _IMPORT_SNIPPET.format(module="PDF_generator.modern_invoice")],
+    "import general_invoice": [sys.executable, "-c", _IMPORT_SNIPPET.format(module="PDF_generator.general_invoice")],
+    "cli --help": [sys.executable, "-m", "PDF_generator", "--help"],
+}
+
+
+def measure(cmd, repeat):
+    times = []
+    output = ""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run(cmd, cwd=ROOT_DIR, capture_output=True, text=True, check=True)
+        times.append(time.perf_counter() - start)
+        output = proc.stdout.strip()
+    return times, output
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-r", "--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    baseline, _ = measure([sys.executable, "-c", "pass"], args.repeat)
+    print(f"{'eset':<24} {'medián ms':>10} {'min ms':>8} {'makedirs':>9}")
+    print(f"{'python -c pass':<24} {statistics.median(baseline) * 1000:>10.1f} {min(baseline) * 1000:>8.1f}")
+    for name, cmd in CASES.items():
+        times, output = measure(cmd, args.repeat)
+        makedirs = output if name.startswith("import") else "-"
+        print(f"{name:<24} {statistics.median(times) * 1000:>10.1f} {min(times) * 1000:>8.1f} {makedirs:>9}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+"""Reprodukálható benchmark a sablonok, tételszámok, szövegtípusok és futtatási módok mátrixán.
+
+Esetenként mérjük: számla/s, számlánkénti késleltetés (p50/p95/p99, átlag),
+csúcs RSS (a mérő worker folyamat(ok)é, lásd ``memory``; ahol nem mérhető,
+``null``) és a kimeneti PDF mérete. A számlák a
+szintetikus generátorból jönnek fix seeddel, a renderelés memóriába történik.
+
+- ``single``: egy friss worker folyamat sorban renderel,
+- ``pool``: ``--workers`` folyamat, a számlák chunkokban oszlanak el.
+
+A mérés előtt minden worker bemelegszik (fontok, terv, háttér): a pool
+``initializer``-e renderel egy számlát, majd egy barrier-en megvárja a
+többit, így a mért szakasz egyik workeren sem tartalmaz indulást.
+
+Az eredmény JSON (commit, Python és fpdf verzió, gép adatai + esetek), két
+futás összevethető a ``compare`` paranccsal, regresszió esetén 1-es kilépési kóddal.
+
+Futtatás:
+    python -m PDF_generator.benchmarks.suite run [--quick] [--out FILE]
+    python -m PDF_generator.benchmarks.suite compare regi.json uj.json [--threshold 0.1]
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import datetime
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import warnings
+
+from ..profiling import percentile_summary
+from ..synthetic import SyntheticConfig, make_invoice
+from ..templates import TEMPLATES, resolve_renderer
+from .memory import format_mib, peak_rss_mib
+
+ITEM_COUNTS = (1, 10, 100, 1000, 10000)
+# Szövegtípus -> a szintetikus generátor nyelvi beállításai
+TEXTS = {
+    "ascii": {"hungarian_share": 0.0, "unicode_share": 0.0},
+    "hungarian": {"hungarian_share": 1.0, "unicode_share": 0.0},
+    "unicode": {"hungarian_share": 0.5, "unicode_share": 0.5},
+}
+MODES = ("single", "pool")
+# Ennyi ideig várunk a többi worker bemelegedésére (s)
+WARMUP_TIMEOUT = 300
+QUICK = {"items": (1, 100), "texts": ("ascii", "unicode"), "modes": ("single",)}
+
+
+def case_config(items, text):
+    """Fix tételszám, nincs hosszú farok és szándékos adathiba (az esetek összevethetők)."""
+    return SyntheticConfig(items=(items, items), items_tail_share=0.0, corrupt_share=0.0, **TEXTS[text])
+
+
+def _quiet():
+    warnings.simplefilter("ignore")
+    logging.getLogger("fpdf").setLevel(logging.ERROR)
+
+
+def _render(template, seed, indices, items, text):
+    # Worker folyamatban fut: (másodperc, bájt) számlánként, és a folyamat csúcs RSS-e
+    _quiet()
+    render = resolve_renderer(template)
+    config = case_config(items, text)
+    samples = []
+    for index in indices:
+        data = make_invoice(template, seed, index, config)
+        start = time.perf_counter()
+        size = len(render(data))
+        samples.append((time.perf_counter() - start, size))
+    return samples, peak_rss_mib()
+
+
+def _warmup(template, seed, ready):
+    # A worker initializere: fontok, lefordított terv és háttér betöltése, hogy ne az
+    # első mért számlát terhelje; a barrier-en az összes worker bemelegedését várjuk
+    _render(template, seed, [-1], 1, "ascii")
+    ready.wait(WARMUP_TIMEOUT)
+
+
+def _ready():
+    pass
+
+
+def run_case(template, items, text, mode, invoices, workers, seed=0, chunksize=4):
+    """Egy eset lefuttatása friss worker folyamat(ok)ban, az eredmény egy JSON-kész dict."""
+    n_workers = 1 if mode == "single" else workers
+    indices = list(range(invoices))
+    context = multiprocessing.get_context()
+    ready = context.Barrier(n_workers)
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=context, initializer=_warmup,
+                             initargs=(template, seed, ready)) as pool:
+        # Amíg egy worker az initializerben vár, nem szabad: minden job új workert indít,
+        # így a barrier-en mind az n_workers worker átjut, mielőtt a mérés indul
+        for future in [pool.submit(_ready) for _ in range(n_workers)]:
+            future.result()
+        start = time.perf_counter()
+        if mode == "single":
+            futures = [pool.submit(_render, template, seed, indices, items, text)]
+        else:
+            futures = [pool.submit(_render, template, seed, indices[i:i + chunksize], items, text)
+                       for i in range(0, invoices, chunksize)]
+        results = [future.result() for future in futures]
+        wall = time.perf_counter() - start
+
+    samples = [sample for chunk, _ in results for sample in chunk]
+    rss = [peak for _, peak in results]
+    latencies = [seconds * 1000 for seconds, _ in samples]
+    sizes = [size for _, size in samples]
+    return {
+        "template": template,
+        "items": items,
+        "text": text,
+        "mode": mode,
+        "workers": n_workers,
+        "invoices": invoices,
+        "wall_seconds": wall,
+        "invoices_per_second": invoices / wall,
+        "latency_ms": {**percentile_summary(latencies), "mean": statistics.fmean(latencies)},
+        "peak_rss_mb": None if None in rss else max(rss),
+        "output_bytes_mean": statistics.fmean(sizes),
+    }
+
+
+def invoice_count(items, invoices, item_budget, minimum=2):
+    """Nagy tételszámnál kevesebb számla, hogy egy eset ideje korlátos maradjon."""
+    return max(minimum, min(invoices, item_budget // items))
+
+
+def metadata(args):
+    def git(*cmd):
+        try:
+            return subprocess.run(["git", *cmd], capture_output=True, text=True, check=True,
+                                  cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return "unknown"
+
+    import fpdf
+
+    return {
+        "commit": git("rev-parse", "--short", "HEAD"),
+        "dirty": git("status", "--porcelain", "--untracked-files=no") not in ("", "unknown"),
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "fpdf": fpdf.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "seed": args.seed,
+        "workers": args.workers,
+    }
+
+
+def cmd_run(args):
+    items = QUICK["items"] if args.quick else args.items
+    texts = QUICK["texts"] if args.quick else args.texts
+    modes = QUICK["modes"] if args.quick else args.modes
+    templates = args.templates or list(TEMPLATES)
+
+    report = {"meta": metadata(args), "results": []}
+    print(f"{'sablon':<8} {'tétel':>6} {'szöveg':<10} {'mód':<7} {'db':>4} {'számla/s':>9} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'RSS MiB':>8} {'KiB':>7}")
+    for template in templates:
+        for n_items in items:
+            for text in texts:
+                for mode in modes:
+                    count = invoice_count(n_items, args.invoices, args.item_budget)
+                    result = run_case(template, n_items, text, mode, count, args.workers, args.seed)
+                    report["results"].append(result)
+                    lat = result["latency_ms"]
+                    print(f"{template:<8} {n_items:>6} {text:<10} {mode:<7} {count:>4} "
+                          f"{result['invoices_per_second']:>9.1f} {lat['p50']:>8.1f} {lat['p95']:>8.1f} "
+                          f"{lat['p99']:>8.1f} {format_mib(result['peak_rss_mb'])} "
+                          f"{result['output_bytes_mean'] / 1024:>7.1f}", flush=True)
+
+    out = args.out or f"suite-{report['meta']['commit']}.json"
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Eredmények: {out}")
+    return 0
+
+
+def _case_key(result):
+    return result["template"], result["items"], result["text"], result["mode"]
+
+
+def compare(old, new, threshold=0.1):
+    """Esetenkénti összevetés; (sorok, regressziók) a ``threshold`` relatív romlás felett."""
+    old_cases = {_case_key(r): r for r in old["results"]}
+    rows, regressions = [], []
+    for result in new["results"]:
+        base = old_cases.get(_case_key(result))
+        if base is None:
+            continue
+        throughput = result["invoices_per_second"] / base["invoices_per_second"]
+        p95 = result["latency_ms"]["p95"] / base["latency_ms"]["p95"]
+        size = result["output_bytes_mean"] / base["output_bytes_mean"]
+        row = (_case_key(result), throughput, p95, size)
+        rows.append(row)
+        if throughput < 1 - threshold or p95 > 1 + threshold or size > 1 + threshold:
+            regressions.append(row)
+    return rows, regressions
+
+
+def cmd_compare(args):
+    with open(args.old, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+    rows, regressions = compare(old, new, args.threshold)
+    print(f"{old['meta']['commit']} -> {new['meta']['commit']}")
+    print(f"{'eset':<36} {'számla/s':>9} {'p95':>7} {'méret':>7}")
+    for key, throughput, p95, size in rows:
+        flag = "  <-- regresszió" if (key, throughput, p95, size) in regressions else ""
+        print(f"{'/'.join(map(str, key)):<36} {throughput:>8.2f}x {p95:>6.2f}x {size:>6.2f}x{flag}")
+    return 1 if regressions else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="a benchmark mátrix lefuttatása")
+    run.add_argument("--templates", nargs="+", choices=list(TEMPLATES))
+    run.add_argument("--items", type=int, nargs="+", default=list(ITEM_COUNTS))
+    run.add_argument("--texts", nargs="+", choices=list(TEXTS), default=list(TEXTS))
+    run.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    run.add_argument("--quick", action="store_true", help=f"kis mátrix gyors ellenőrzéshez: {QUICK}")
+    run.add_argument("--invoices", type=int, default=30, help="számlák száma esetenként (legfeljebb)")
+    run.add_argument("--item-budget", type=int, default=20000,
+                     help="esetenként legfeljebb ennyi tétel összesen (a számlák száma ehhez igazodik)")
+    run.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1)
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--out", help="JSON eredményfájl (alapból suite-<commit>.json)")
+    run.set_defaults(func=cmd_run)
+
+    cmp = sub.add_parser("compare", help="két JSON eredmény összevetése")
+    cmp.add_argument("old")
+    cmp.add_argument("new")
+    cmp.add_argument("--threshold", type=float, default=0.1, help="megengedett relatív romlás")
+    cmp.set_defaults(func=cmd_compare)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""Tételtáblázat: az eredeti cellánkénti ciklus vs. a ``table`` renderelő.
+
+Sablononként a tételtáblázat (``TableSpec``) kirajzolását mérjük 10, 1 000 és
+10 000 tétellel, egy friss dokumentum első oldalától kezdve (a dokumentum
+szerializálása nélkül). A tételek a szintetikus generátorból jönnek.
+
+Futtatás: python -m PDF_generator.benchmarks.table [--sizes 10 1000 10000] [--repeat 3]
+"""
+import argparse
+import itertools
+import logging
+import statistics
+import time
+import warnings
+
+from .. import general_invoice, modern_invoice, simple_invoice
+from ..layout import FONT_FAMILY
+from ..synthetic import make_invoice
+from ..table import render_table
+
+CASES = {
+    "simple": (simple_invoice.SimpleInvoice, simple_invoice.compile_simple_plan),
+    "modern": (modern_invoice.ModernInvoice, modern_invoice.compile_modern_plan),
+    "general": (general_invoice.ComplexInvoice, general_invoice.compile_complex_plan),
+}
+
+
+def legacy_table(pdf, spec, rows):
+    """Az eredeti sablonok ciklusa: multi_cell, vissza a sor tetejére, cell() oszloponként."""
+    widths, aligns, lh = spec.widths, spec.aligns, spec.line_height
+    for row in rows:
+        x_start = pdf.get_x()
+        y_start = pdf.get_y()
+        y_end = y_start
+        for i, value in enumerate(row[:len(widths)]):
+            if i == spec.wrap_col:
+                pdf.multi_cell(widths[i], lh, str(value), align=aligns[i])
+                y_end = pdf.get_y()
+                pdf.set_xy(x_start + sum(widths[:i + 1]), y_start)
+            else:
+                pdf.cell(widths[i], lh, str(value), align=aligns[i])
+        pdf.set_xy(spec.x, y_end)
+        if spec.separator is not None:
+            pdf.set_draw_color(*spec.separator)
+            pdf.line(spec.x, y_end, 200, y_end)
+            pdf.set_draw_color(0, 0, 0)
+        if spec.row_gap:
+            pdf.ln(spec.row_gap)
+
+
+def table_spec(compile_plan):
+    return next(op[2] for op in compile_plan().ops if op[0] == "table")
+
+
+def make_rows(template, count, seed=0):
+    rows = itertools.chain.from_iterable(
+        make_invoice(template, seed, i)["items"] for i in itertools.count())
+    return list(itertools.islice(rows, count))
+
+
+def cpu_ms(pdf_class, spec, rows, draw, repeat):
+    times = []
+    for _ in range(repeat):
+        pdf = pdf_class()
+        pdf.add_page()
+        pdf.set_font(FONT_FAMILY, "", 9)
+        pdf.set_xy(spec.x, 60)
+        start = time.process_time()
+        draw(pdf, spec, rows)
+        times.append((time.process_time() - start) * 1000)
+    return statistics.median(times), pdf.page
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    warnings.simplefilter("ignore")
+    logging.getLogger("fpdf").setLevel(logging.ERROR)
+
+    print(f"{'sablon':<8} {'tétel':>6} {'ciklus ms':>11} {'oldal':>6} {'renderelő ms':>13} {'oldal':>6} {'gyorsulás':>10}")
+    for template, (pdf_class, compile_plan) in CASES.items():
+        spec = table_spec(compile_plan)
+        for size in args.sizes:
+            rows = make_rows(template, size, args.seed)
+            legacy, legacy_pages = cpu_ms(pdf_class, spec, rows, legacy_table, args.repeat)
+            fast, fast_pages = cpu_ms(pdf_class, spec, rows, render_table, args.repeat)
+            print(f"{template:<8} {size:>6} {legacy:>11.1f} {legacy_pages:>6} {fast:>13.1f} {fast_pages:>6} "
+                  f"{legacy / fast:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Szálak vs. folyamatok: ugyanaz a batch thread poolban és process poolban.
+
+Módonként egy friss interpreter rendereli le ugyanazt a ``--count`` szintetikus
+számlát memóriába (``BatchConfig(archive=True)``, lemezre írás nélkül),
+``--workers`` workerrel. Mérjük az áteresztést és a folyamatfa memóriáját: a
+futás alatt 50 ms-onként összeadjuk a folyamat és a gyerekei PSS értékét (a
+megosztott lapok arányosan számítanak; ahol nincs ``smaps_rollup``, ott az RSS
+összeg; ``/proc`` nélkül a ``memory`` modul mérése, ha az sem, ``n/a``), és a
+csúcsot írjuk ki. A GIL-es interpreteren a szálak a renderelést
+nem párhuzamosítják; free-threaded buildben (``python3.13t``) igen.
+
+Futtatás: python -m PDF_generator.benchmarks.threads [--count 400] [--workers 4]
+"""
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+import warnings
+
+from .memory import child_pids, format_mib, rss_mib
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MODES = ("thread", "process")
+
+
+def _memory_mib(pid):
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # /proc nélkül (vagy PSS nélkül) az RSS, ha a platformon mérhető
+    return rss_mib(pid)
+
+
+def tree_memory_mib(pid=None):
+    """A folyamat és a közvetlen gyerekei memóriája (PSS, MiB); ha nem mérhető, None."""
+    pid = pid or os.getpid()
+    own = _memory_mib(pid)
+    if own is None:
+        return None
+    # Egy közben kilépett gyerek nem számít
+    return own + sum(_memory_mib(child) or 0 for child in child_pids(pid))
+
+
+def run(mode, template, count, workers, chunksize, seed, output_profile):
+    """Egy mód mérése ebben a folyamatban; az eredmény dict."""
+    from ..batch import BatchConfig, iter_batch
+    from ..synthetic import iter_jobs
+
+    warnings.simplefilter("ignore")
+    logging.getLogger("fpdf").setLevel(logging.ERROR)
+    jobs = list(iter_jobs(template, seed=seed, count=count))
+    baseline = tree_memory_mib()
+    peak = [baseline]
+    done = threading.Event()
+
+    def sample():
+        while baseline is not None and not done.wait(0.05):
+            current = tree_memory_mib()
+            if current is not None:
+                peak[0] = max(peak[0], current)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    start = time.perf_counter()
+    failed = total_bytes = 0
+    config = BatchConfig(output_profile=output_profile, archive=True, threads=mode == "thread")
+    for result in iter_batch(jobs, workers, chunksize, config=config):
+        failed += not result.ok
+        total_bytes += len(result.pdf or b"")
+    wall = time.perf_counter() - start
+    done.set()
+    sampler.join()
+    gil = sys._is_gil_enabled() if hasattr(sys, "_is_gil_enabled") else True
+    return {"mode": mode, "wall": wall, "per_second": count / wall, "peak_mib": peak[0],
+            "baseline_mib": baseline, "failed": failed, "bytes": total_bytes, "gil": gil}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunksize", type=int, default=8)
+    parser.add_argument("--template", default="general")
+    parser.add_argument("--output-profile", default="default")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--run", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    options = (args.template, args.count, args.workers, args.chunksize, args.seed, args.output_profile)
+    if args.run:
+        print(json.dumps(run(args.run, *options)))
+        return 0
+
+    print(f"{args.count} {args.template} számla, {args.workers} worker, {sys.version.split()[0]}")
+    print(f"{'mód':<8} {'idő s':>7} {'számla/s':>9} {'csúcs MiB':>10} {'alap MiB':>9}  GIL")
+    rows = {}
+    for mode in args.modes:
+        # Módonként friss interpreter, hogy a cache-ek és a memória ne keveredjenek
+        cmd = [sys.executable, "-m", __spec__.name, "--run", mode, "--count", str(args.count),
+               "--workers", str(args.workers), "--chunksize", str(args.chunksize), "--template", args.template,
+               "--output-profile", args.output_profile, "--seed", str(args.seed)]
+        proc = subprocess.run(cmd, cwd=ROOT_DIR, capture_output=True, text=True, check=True)
+        row = rows[mode] = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(f"{mode:<8} {row['wall']:>7.2f} {row['per_second']:>9.1f} {format_mib(row['peak_mib'], 10)} "
+              f"{format_mib(row['baseline_mib'], 9)}  {'be' if row['gil'] else 'ki'}")
+        if row["failed"]:
+            print(f"  {row['failed']} hibás számla", file=sys.stderr)
+    if len(rows) == 2 and rows["thread"]["bytes"] != rows["process"]["bytes"]:
+        print("A két mód kimenetének mérete eltér", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""Gyűjtő PDF: sok számla egyetlen többoldalas PDF-ben, számlánkénti könyvjelzővel.
+
+A számlákat a batch egyenként rendereli (``JobResult.pdf``), a ``BundleWriter``
+pedig sorban, folyamatosan hozzáfűzi őket a gyűjtő fájlhoz: az fpdf kimenetének
+objektumait (xref tábla alapján) átszámozva kiírja, a számla katalógusát és
+``/Info`` objektumát elhagyja, a számla oldalfáját (``/Pages``) pedig a gyűjtő
+gyökér oldalfája alá köti. Így az örökölt oldal attribútumok (``/MediaBox``)
+változatlanok maradnak, a streamekhez (tartalom, fontok) nem nyúlunk. A
+memóriában csak az objektumok offsetjei és a számlák oldalfáinak sorszámai
+maradnak, a PDF-ek nem.
+
+Minden számla kap egy könyvjelzőt (outline elem a számla első oldalára, címe
+a számlaszám), és egy sort a mellékindexben (JSONL)::
+
+    {"id": "#3426811420", "file": "modern_000042.pdf", "first_page": 85, "last_page": 86}
+
+Az oldalszámok 1-től indulnak, a tartomány zárt: egy daraboló a PDF újra
+feldolgozása nélkül vághatja szét a gyűjtőt. A gyűjtő és az index írás közben
+``.part`` végű, lezáráskor (``close``) kerül a végleges nevére.
+
+Használat::
+
+    with BundleWriter("szamlak.pdf") as bundle:
+        run_batch(bundle.track(jobs), archive=bundle)
+    pages = read_index("szamlak.index.jsonl")    # id -> (első, utolsó oldal)
+"""
+from array import array
+import json
+import os
+import re
+
+from .batch import _normalize_job
+
+# A sablonok számlaszám kulcsai (az első nem üres számít)
+ID_KEYS = ("inv_number", "invoice_no", "invoice_id")
+
+_HEADER = b"%PDF-1.4\n%\xe9\xeb\xf1\xbf\n"
+# A gyűjtő saját objektumai: gyökér oldalfa, katalógus, könyvjelzők gyökere
+_PAGES, _CATALOG, _OUTLINES = 1, 2, 3
+_RESERVED = 4    # a 0. objektum a szabad lista feje
+
+_STARTXREF = re.compile(rb"startxref\s+(\d+)")
+_XREF_ENTRY = re.compile(rb"(\d{10}) (\d{5}) ([nf])")
+_TRAILER_REF = re.compile(rb"/(Root|Info) (\d+) 0 R")
+_VERSION = re.compile(rb"%PDF-(\d\.\d)")
+# Hivatkozás egy szótárban; a zárójeles szövegeken belül nem számozunk át
+_REF_OR_STRING = re.compile(rb"\((?:\\.|[^\\()])*\)|(\d+) 0 R")
+_SUBSET_TAG = re.compile(rb"/[A-Z]{6}\+")
+_PAGES_OF = re.compile(rb"/Pages (\d+) 0 R")
+_KIDS = re.compile(rb"/Kids \[(\d+) 0 R")
+_COUNT = re.compile(rb"/Count (\d+)")
+
+
+class BundleError(ValueError):
+    """A számla PDF nem fűzhető a gyűjtőhöz (nem az fpdf által írt szerkezet)."""
+
+
+def invoice_id(data, default=""):
+    """A számlaszám a sablon kulcsai közül (``ID_KEYS``), ha nincs, ``default``."""
+    for key in ID_KEYS:
+        value = data.get(key)
+        if value and value != "N/A":
+            return str(value)
+    return default
+
+
+def default_index_path(path):
+    return os.path.splitext(path)[0] + ".index.jsonl"
+
+
+def read_index(path):
+    """A mellékindex: számlaszám (vagy fájlnév) -> ``(első oldal, utolsó oldal)``."""
+    pages = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            pages[record["id"] or record["file"]] = (record["first_page"], record["last_page"])
+    return pages
+
+
+def _text(value):
+    # PDF szöveg: UTF-16BE BOM-mal, hex alakban (ékezetes számlaszámokhoz is)
+    return b"<FEFF" + value.encode("utf-16-be").hex().upper().encode() + b">"
+
+
+def _subset_tag(number):
+    # Számlánként más subset előtag: az fpdf mindig MPDFAA+-t ír, a gyűjtőben ütköznének
+    letters = []
+    for _ in range(6):
+        number, digit = divmod(number, 26)
+        letters.append(65 + digit)
+    return b"/" + bytes(reversed(letters)) + b"+"
+
+
+def _parse(pdf):
+    """Az fpdf kimenet objektumai: ``({szám: (szótár, stream rész)}, katalógus, info, verzió)``."""
+    match = _STARTXREF.search(pdf, len(pdf) - 64)
+    version = _VERSION.match(pdf)
+    if match is None or version is None or not pdf.startswith(b"xref", int(match.group(1))):
+        raise BundleError("nem klasszikus xref táblás PDF")
+    xref = int(match.group(1))
+    trailer = pdf.find(b"trailer", xref)
+    offsets = [int(m.group(1)) for m in _XREF_ENTRY.finditer(pdf, xref, trailer) if m.group(3) == b"n"]
+    refs = dict((key.decode(), int(number)) for key, number in _TRAILER_REF.findall(pdf, trailer))
+    if "Root" not in refs:
+        raise BundleError("hiányzó /Root a trailerben")
+
+    objects = {}
+    ends = sorted(offsets) + [xref]
+    for start, end in zip(ends, ends[1:]):
+        header = pdf.index(b" 0 obj\n", start, end)
+        number = int(pdf[start:header])
+        body = pdf[header + 7:pdf.rindex(b"endobj", start, end)]
+        split = body.find(b"stream\n")
+        objects[number] = (body, b"") if split < 0 else (body[:split], body[split:])
+    return objects, refs["Root"], refs.get("Info"), version.group(1)
+
+
+class BundleWriter:
+    """Számla PDF-ek folyamatos összefűzése egy gyűjtő PDF-be és a mellékindexbe.
+
+    A ``write(index, name, pdf)`` felülete az ``archive.ShardWriter``-é, így a
+    ``batch.run_batch(..., archive=...)`` közvetlenül ide írhat; a számlaszámokat
+    a ``track`` a jobokból gyűjti ki (ennek hiányában a fájlnév a cím).
+    """
+
+    def __init__(self, path, index_path=None):
+        self.path = path
+        self.index_path = index_path or default_index_path(path)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path + ".part", "wb")
+        self._index = open(self.index_path + ".part", "w", encoding="utf-8")
+        self._file.write(_HEADER)
+        self._offsets = array("Q", [0] * _RESERVED)
+        # A számlák oldalfái, a gyökér /Kids tömbje
+        self._trees = array("Q")
+        self._ids = {}
+        self._version = b"1.4"
+        self._outline = None    # az utolsó, még ki nem írt könyvjelző: (objektum, cím, első oldal, előző)
+        self._first_outline = None
+        self.written = 0
+        self.pages = 0
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def track(self, jobs, start=0):
+        """A jobokat változatlanul továbbadja, közben feljegyzi a számlaszámokat a job index szerint."""
+        for index, job in enumerate(jobs, start):
+            _, _, data, _ = _normalize_job(index, job)
+            self._ids[index] = invoice_id(data)
+            yield job
+
+    def _object(self, number, *parts):
+        while len(self._offsets) <= number:
+            self._offsets.append(0)
+        self._offsets[number] = self._file.tell()
+        self._file.write(b"%d 0 obj\n" % number)
+        for part in parts:
+            self._file.write(part)
+        self._file.write(b"endobj\n")
+
+    def _flush_outline(self, next_number=None):
+        number, title, page, previous = self._outline
+        entries = [b"<<\n/Title ", _text(title), b"\n/Parent %d 0 R\n/Dest [%d 0 R /Fit]\n" % (_OUTLINES, page)]
+        if previous is not None:
+            entries.append(b"/Prev %d 0 R\n" % previous)
+        if next_number is not None:
+            entries.append(b"/Next %d 0 R\n" % next_number)
+        self._object(number, *entries, b">>\n")
+
+    def write(self, index, name, pdf):
+        """Egy számla PDF hozzáfűzése (a ``track``-elt számlaszámmal vagy a fájlnévvel)."""
+        objects, catalog, info, version = _parse(pdf)
+        tree = _PAGES_OF.search(objects[catalog][0])
+        if tree is None:
+            raise BundleError(f"{name}: a katalógusban nincs /Pages")
+        tree = int(tree.group(1))
+        first = _KIDS.search(objects[tree][0])
+        count = _COUNT.search(objects[tree][0])
+        if first is None or count is None:
+            raise BundleError(f"{name}: üres oldalfa")
+
+        # Átszámozás: a számla objektumai a gyűjtő végére kerülnek, sorrendben
+        base = len(self._offsets)
+        kept = sorted(number for number in objects if number not in (catalog, info))
+        numbers = {old: base + i for i, old in enumerate(kept)}
+        tag = _subset_tag(self.written)
+
+        def renumber(match):
+            if match.group(1) is None:
+                return match.group(0)
+            return b"%d 0 R" % numbers[int(match.group(1))]
+
+        for old in kept:
+            head, stream = objects[old]
+            head = _SUBSET_TAG.sub(tag, _REF_OR_STRING.sub(renumber, head))
+            if old == tree:
+                head = head.replace(b"<<", b"<<\n/Parent %d 0 R" % _PAGES, 1)
+            self._object(numbers[old], head, stream)
+        self._version = max(self._version, version)
+
+        # Könyvjelző: az előzőt most írjuk ki, amikor már ismert a /Next
+        outline = len(self._offsets)
+        self._offsets.append(0)
+        number = self._ids.pop(index, "")
+        title = number or os.path.splitext(name)[0]
+        if self._outline is None:
+            self._first_outline = outline
+        else:
+            self._flush_outline(outline)
+        self._outline = (outline, title, numbers[int(first.group(1))],
+                         None if self._outline is None else self._outline[0])
+
+        pages = int(count.group(1))
+        record = {"id": number, "file": name,
+                  "first_page": self.pages + 1, "last_page": self.pages + pages}
+        self._index.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._trees.append(numbers[tree])
+        self.pages += pages
+        self.written += 1
+
+    def close(self):
+        """A gyökér oldalfa, a könyvjelzők, a katalógus és az xref kiírása; a fájlok végleges helyükre kerülnek."""
+        if self.closed:
+            return
+        if self._outline is not None:
+            self._flush_outline()
+            self._object(_OUTLINES, b"<<\n/Type /Outlines\n/First %d 0 R\n/Last %d 0 R\n/Count %d\n>>\n"
+                         % (self._first_outline, self._outline[0], self.written))
+        else:
+            self._object(_OUTLINES, b"<<\n/Type /Outlines\n/Count 0\n>>\n")
+        kids = b" ".join(b"%d 0 R" % number for number in self._trees)
+        self._object(_PAGES, b"<<\n/Type /Pages\n/Kids [", kids, b"]\n/Count %d\n>>\n" % self.pages)
+        version = b"/Version /%s\n" % self._version if self._version > _HEADER[5:8] else b""
+        self._object(_CATALOG, b"<<\n/Type /Catalog\n/Pages %d 0 R\n/Outlines %d 0 R\n/PageMode /UseOutlines\n"
+                     % (_PAGES, _OUTLINES), version, b">>\n")
+
+        xref = self._file.tell()
+        self._file.write(b"xref\n0 %d\n0000000000 65535 f \n" % len(self._offsets))
+        for offset in self._offsets[1:]:
+            self._file.write(b"%010d 00000 n \n" % offset)
+        self._file.write(b"trailer\n<<\n/Size %d\n/Root %d 0 R\n>>\nstartxref\n%d\n%%%%EOF\n"
+                         % (len(self._offsets), _CATALOG, xref))
+        self._file.close()
+        self._index.close()
+        os.replace(self.path + ".part", self.path)
+        os.replace(self.index_path + ".part", self.index_path)
+        self.closed = True
+
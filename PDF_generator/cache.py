@@ -0,0 +1,272 @@
+"""Tartalom-címzett render cache: azonos sablon + adat esetén a kész PDF bájtok.
+
+A kulcs a sablon neve, a sablon verziója (a sablon modulja és az általa
+közvetve importált csomagbeli modulok forrása, a font fájlok és az fpdf verzió
+hash-e, lásd ``render_sources``), a normalizált adat dict és a nem
+alapértelmezett kimeneti profil neve (lásd ``output``) SHA-256-ja.
+A ``_`` kezdetű kulcsok (pl. a szintetikus ``_corrupted_fields``) metaadatok,
+a renderelést nem befolyásolják, ezért a kulcsba sem kerülnek bele.
+
+Két szint:
+
+- memória: LRU, bájtban megadott felső korláttal,
+- lemez: ``OUTPUT_DIR/render_cache`` alatt, bájt korláttal; a legrégebben
+  használt (mtime) fájlok törlődnek. Több folyamat is használhatja egyszerre,
+  a korlátot ilyenkor csak közelítőleg tartja.
+
+Egy ``RenderCache`` több szálból is használható (a memória szint és a
+számlálók zár alatt frissülnek, a lemezre írás atomikus).
+"""
+from collections import OrderedDict
+from functools import lru_cache
+import ast
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from .config import OUTPUT_DIR, SCRIPT_DIR, current_config, write_output
+from .fonts import font_paths
+from .output import current_profile
+from .templates import TEMPLATES, resolve_renderer, template_module
+
+CACHE_DIR = os.path.join(OUTPUT_DIR, "render_cache")
+
+DEFAULT_MEMORY_BYTES = 64 * 2**20
+DEFAULT_DISK_BYTES = 1024 * 2**20
+
+
+def render_sources(path, package_dir=SCRIPT_DIR):
+    """A modul és az általa (közvetve, függvényen belül is) importált csomagbeli modulok forrásfájljai.
+
+    A relatív importokat (``from .money import ...``, ``from . import compat``) a
+    forrásból olvassuk ki, így egy új segédmodul a renderelés útjában külön
+    felsorolás nélkül is a sablon verziójába kerül.
+    """
+    seen = set()
+    stack = [os.path.abspath(path)]
+    while stack:
+        path = stack.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        with open(path, "rb") as f:
+            tree = ast.parse(f.read(), path)
+        for node in ast.walk(tree):
+            if not isinstance(node, ast.ImportFrom) or node.level != 1:
+                continue
+            names = [node.module] if node.module else [alias.name for alias in node.names]
+            for name in names:
+                base = os.path.join(package_dir, *name.split("."))
+                for candidate in (base + ".py", os.path.join(base, "__init__.py")):
+                    if os.path.isfile(candidate):
+                        stack.append(os.path.abspath(candidate))
+                        break
+    return sorted(seen)
+
+
+def source_version(path, package_dir=SCRIPT_DIR):
+    """A modul (``render_sources``), a fontok és az fpdf verziójának hash-e."""
+    import fpdf
+
+    digest = hashlib.sha256(fpdf.__version__.encode())
+    paths = render_sources(path, package_dir) + list(font_paths().values())
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()[:16]
+
+
+@lru_cache(maxsize=None)
+def template_version(template):
+    """A sablon verziója (``source_version`` a sablon moduljára); folyamatonként egyszer számoljuk."""
+    return source_version(template_module(template).__file__)
+
+
+def normalize(data):
+    """Determinisztikus JSON forma: rendezett kulcsok, ``_`` kezdetű kulcsok nélkül."""
+    public = {key: value for key, value in data.items() if not str(key).startswith("_")}
+    return json.dumps(public, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def cache_key(template, data):
+    if template not in TEMPLATES:
+        raise ValueError(f"Ismeretlen sablon: {template!r} (választható: {', '.join(TEMPLATES)})")
+    payload = f"{template}\0{template_version(template)}\0{normalize(data)}"
+    profile = current_profile().name
+    if profile != "default":
+        # Más profillal más a PDF; az alap profil kulcsai a korábbiakkal egyeznek
+        payload += f"\0{profile}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    """Kétszintű (memória + lemez) cache a renderelt PDF-ekhez, találat / hiba számlálókkal."""
+
+    def __init__(self, memory_bytes=DEFAULT_MEMORY_BYTES, disk_bytes=DEFAULT_DISK_BYTES, directory=CACHE_DIR):
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.directory = directory
+        self._memory = OrderedDict()
+        self._memory_used = 0
+        self._disk_used = None  # első lemezre íráskor számoljuk
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+
+    # --- publikus API ---
+
+    def render(self, template, data):
+        """A PDF bájtjai: cache-ből, vagy rendereléssel (és eltárolással)."""
+        pdf, _ = self.lookup(template, data)
+        return pdf
+
+    def lookup(self, template, data):
+        """``(pdf_bytes, forrás)``, ahol a forrás ``"memory"``, ``"disk"`` vagy ``"render"``."""
+        key = cache_key(template, data)
+        with self._lock:
+            pdf = self._memory.get(key)
+            if pdf is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return pdf, "memory"
+        pdf = self._disk_get(key)
+        if pdf is not None:
+            with self._lock:
+                self.disk_hits += 1
+            self._memory_put(key, pdf)
+            return pdf, "disk"
+        with self._lock:
+            self.misses += 1
+        # Renderelés zár nélkül: két szál ugyanazt a számlát legfeljebb kétszer rendereli
+        pdf = resolve_renderer(template)(data)
+        self._memory_put(key, pdf)
+        self._disk_put(key, pdf)
+        return pdf, "render"
+
+    def create(self, template, filename, data):
+        """Mint a ``create_*_invoice``, de a cache-en keresztül; a forrást adja vissza."""
+        pdf, source = self.lookup(template, data)
+        config = current_config()
+        filepath = write_output(filename, pdf, config)
+        if config.verbose:
+            print(f"[OK] {template} számla ({source}): {filepath}")
+        return source
+
+    def stats(self):
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "memory_bytes": self._memory_used,
+                "memory_entries": len(self._memory),
+            }
+
+    def clear_memory(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_used = 0
+
+    # --- memória szint ---
+
+    def _memory_put(self, key, pdf):
+        if len(pdf) > self.memory_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_used -= len(previous)
+            self._memory[key] = pdf
+            self._memory_used += len(pdf)
+            while self._memory_used > self.memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_used -= len(evicted)
+
+    # --- lemez szint ---
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.pdf")
+
+    def _disk_get(self, key):
+        if not self.disk_bytes:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                pdf = f.read()
+        except FileNotFoundError:
+            return None
+        # Az mtime a legutóbbi használat ideje (LRU törléshez)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return pdf
+
+    def _disk_put(self, key, pdf):
+        if not self.disk_bytes or len(pdf) > self.disk_bytes:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Atomikus írás: párhuzamos olvasó sosem lát félkész fájlt
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(pdf)
+        os.replace(tmp, path)
+        with self._disk_lock:
+            if self._disk_used is None:
+                self._disk_used = sum(size for _, size, _ in self._disk_entries())
+            else:
+                self._disk_used += len(pdf)
+            if self._disk_used > self.disk_bytes:
+                self._evict_disk()
+
+    def _disk_entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".pdf"):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    yield path, st.st_size, st.st_mtime
+
+    def _evict_disk(self):
+        # A korlát 90%-áig törlünk, hogy ne minden írás indítson újabb bejárást
+        entries = sorted(self._disk_entries(), key=lambda entry: entry[2])
+        used = sum(size for _, size, _ in entries)
+        target = self.disk_bytes * 0.9
+        removed = 0
+        for path, size, _ in entries:
+            if used <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            used -= size
+            removed += 1
+        self._disk_used = used
+        # A számlálókat a _lock védi (a _disk_lock csak a lemez könyvelését)
+        with self._lock:
+            self.evictions += removed
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_cache(**options):
+    """Folyamatonként egy közös cache (pl. a batch workerekben); az ``options`` az első hívásé."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = RenderCache(**options)
+        return _default
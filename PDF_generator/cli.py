@@ -0,0 +1,376 @@
+import argparse
+import sys
+
+from .templates import TEMPLATES
+
+# A sablon modulokat (és az fpdf-et) csak az adott parancs importálja,
+# így a `--help` és a batch worker indulása is gyors marad.
+
+
+def template_name(value):
+    # nargs="*" mellett a choices= az üres listát is elutasítaná, ezért itt ellenőrzünk
+    if value not in TEMPLATES:
+        raise argparse.ArgumentTypeError(f"ismeretlen sablon: {value!r} (választható: {', '.join(TEMPLATES)})")
+    return value
+
+
+def cmd_demo(args):
+    from .templates import template_module, resolve_template
+
+    for template in args.templates or list(TEMPLATES):
+        create = resolve_template(template)
+        for filename, data in template_module(template).DEMO_INVOICES:
+            create(filename, data)
+    return 0
+
+
+def cmd_build(args):
+    from .manifest import build, demo_jobs
+
+    jobs = demo_jobs(args.templates)
+    if args.count:
+        import itertools
+
+        from .synthetic import iter_jobs
+
+        jobs = itertools.chain(jobs, iter_jobs(args.templates or list(TEMPLATES), seed=args.seed, count=args.count))
+    report = build(jobs, args.manifest, workers=args.workers, force=args.force)
+    for result in report.failed:
+        print(f"[HIBA] {result.filename}: {result.error}", file=sys.stderr)
+    print(f"{len(report.results)} renderelt, {report.skipped} változatlan; ellenőrzés {report.check_seconds:.2f} s, "
+          f"összesen {report.wall_seconds:.2f} s")
+    return 1 if report.failed else 0
+
+
+def cmd_batch(args):
+    from .batch import BatchConfig, run_batch
+
+    if args.truth and (args.cache or args.cache_disk_mb is not None):
+        # Cache találatnál nincs renderelés, így a mezők helye sem rögzíthető
+        print("A --truth nem használható a render cache-sel", file=sys.stderr)
+        return 2
+    if args.archive and args.bundle:
+        print("A --archive és a --bundle közül csak az egyik adható meg", file=sys.stderr)
+        return 2
+    if args.threads and (args.pooled or args.recycle_after or args.profile_memory):
+        print("A --pooled, a --recycle-after és a --profile-memory csak process poollal használható",
+              file=sys.stderr)
+        return 2
+    if args.verify and (args.archive or args.bundle):
+        print("A --verify a számlánkénti PDF fájlokat ellenőrzi, --archive / --bundle mellett nem használható",
+              file=sys.stderr)
+        return 2
+
+    archive = None
+    start = 0
+    jobs = None
+    if args.bundle:
+        from .bundle import BundleWriter
+
+        archive = BundleWriter(args.bundle)
+        jobs = archive.track(_batch_jobs(args))
+    elif args.archive:
+        from .archive import ShardWriter
+
+        archive = ShardWriter(args.archive, args.shard_mb * 2**20, args.archive_format)
+        start = archive.next_index
+        if start:
+            print(f"folytatás a #{start}. számlától ({archive.shards} kész shard)")
+    if jobs is None:
+        jobs = _batch_jobs(args, start)
+    sinks = []
+    if args.profile or args.profile_jsonl or args.profile_memory:
+        from .profiling import JsonlSink, MemorySink
+
+        sinks.append(MemorySink())
+        if args.profile_jsonl:
+            sinks.append(JsonlSink(args.profile_jsonl))
+    cache = None
+    if args.cache or args.cache_disk_mb is not None:
+        cache = {} if args.cache_disk_mb is None else {"disk_bytes": args.cache_disk_mb * 2**20}
+    truth_sinks = []
+    if args.truth:
+        from .profiling import JsonlSink
+
+        truth_sinks.append(JsonlSink(args.truth))
+    try:
+        config = BatchConfig(profile_memory=args.profile_memory, cache=cache, output_profile=args.output_profile,
+                             pooled=args.pooled, max_chunks_per_worker=args.recycle_after, threads=args.threads)
+        report = run_batch(jobs, workers=args.workers, chunksize=args.chunksize, config=config,
+                           sinks=sinks, truth_sinks=truth_sinks, archive=archive, start=start)
+    finally:
+        for sink in sinks + truth_sinks:
+            sink.close()
+        if archive is not None:
+            archive.close()
+
+    for result in report.failed:
+        print(f"[HIBA] #{result.index} {result.filename}: {result.error}", file=sys.stderr)
+    print(f"{len(report.results)} számla, {report.wall_seconds:.2f} s, "
+          f"{report.invoices_per_second:.1f} számla/s ({report.workers} worker, chunk {report.chunksize})")
+    if args.bundle:
+        print(f"gyűjtő PDF: {archive.written} számla, {archive.pages} oldal ({args.bundle}, "
+              f"index: {archive.index_path})")
+    elif archive is not None:
+        print(f"archív: {archive.written} számla, {archive.shards} shard ({args.archive})")
+    if cache is not None:
+        counts = report.cache_counts
+        print(f"cache: {counts.get('memory', 0)} memória, {counts.get('disk', 0)} lemez, "
+              f"{counts.get('render', 0)} renderelt")
+    if sinks:
+        from .profiling import format_summary
+
+        print(format_summary(sinks[0].summary()))
+    if report.failed:
+        return 1
+    if args.verify:
+        from .verify import run_verify
+
+        return _print_verify(run_verify(_batch_jobs(args), workers=args.workers), args.strict_glyphs)
+    return 0
+
+
+def cmd_verify(args):
+    from .verify import run_verify
+
+    if args.demo:
+        from .templates import template_module
+
+        jobs = [(args.template, data, filename) for filename, data in template_module(args.template).DEMO_INVOICES]
+    else:
+        jobs = _batch_jobs(args)
+    kwargs = {"directory": args.dir} if args.dir else {}
+    report = run_verify(jobs, workers=args.workers, chunksize=args.chunksize, **kwargs)
+    return _print_verify(report, args.strict_glyphs, args.show)
+
+
+def _print_verify(report, strict_glyphs=False, show=20):
+    shown = 0
+    for result in report.results:
+        if result.error:
+            if shown < show:
+                print(f"[HIBA] #{result.index} {result.filename}: {result.error}", file=sys.stderr)
+            shown += 1
+        for error in result.mismatches + (result.glyphs if strict_glyphs else []):
+            if shown < show:
+                where = error.key if error.row is None else f"{error.key}[{error.row}][{error.col}]"
+                kind = f"hiányzó glif {error.missing!r}" if error.missing else "nem olvasható vissza"
+                print(f"[ELTÉRÉS] {result.filename} {where}: {kind}: {error.expected[:60]!r}", file=sys.stderr)
+            shown += 1
+    glyph_fields = sum(len(r.glyphs) for r in report.results)
+    mismatched = sum(1 for r in report.results if r.mismatches)
+    print(f"{len(report.results)} PDF, {report.fields} mező, {report.wall_seconds:.2f} s, "
+          f"{report.pdfs_per_minute:.0f} PDF/perc ({report.workers} worker)")
+    print(f"eltérés: {mismatched} PDF, hibás: {sum(1 for r in report.results if r.error)} PDF, "
+          f"hiányzó glif: {glyph_fields} mező")
+    if glyph_fields:
+        top = ", ".join(f"{char!r} {count}" for char, count in report.missing_glyphs.most_common(12))
+        print(f"hiányzó glifek (mezők száma): {top}")
+    failed = report.failed or (strict_glyphs and glyph_fields)
+    return 1 if failed else 0
+
+
+def _batch_jobs(args, start=0):
+    if args.seed is None:
+        from .templates import template_module
+
+        # Seed nélkül a sablon első demo számláját sokszorosítjuk
+        data = template_module(args.template).DEMO_INVOICES[0][1]
+        return ((args.template, data) for _ in range(start, args.count))
+    from .synthetic import iter_jobs
+
+    return iter_jobs(args.template, seed=args.seed, count=args.count, start=start)
+
+
+def cmd_submit(args):
+    import asyncio
+
+    from .pipeline import HttpSubmitter, run_pipeline
+    from .standin import serve
+
+    async def run():
+        options = dict(workers=args.workers, concurrency=args.concurrency, max_queued=args.queue,
+                       retries=args.retries)
+        if args.url:
+            return await run_pipeline(_batch_jobs(args), HttpSubmitter(args.url), **options), None
+        async with serve(latency=args.standin_latency, fail_rate=args.standin_fail_rate) as server:
+            report = await run_pipeline(_batch_jobs(args), HttpSubmitter(server.url), **options)
+            return report, server.stats()
+
+    report, stats = asyncio.run(run())
+    for result in report.failed:
+        print(f"[HIBA] #{result.index} {result.filename} ({result.attempts} kísérlet): {result.error}",
+              file=sys.stderr)
+    retried = sum(1 for r in report.results if r.attempts > 1)
+    print(f"{len(report.results)} számla, {report.wall_seconds:.2f} s, {report.invoices_per_second:.1f} számla/s, "
+          f"{report.uploaded_bytes / 2**20:.1f} MiB feltöltve, {retried} újrapróbált, {len(report.failed)} hibás")
+    if stats is not None:
+        print(f"stand-in: {stats}")
+    return 1 if report.failed else 0
+
+
+def cmd_scan(args):
+    import glob
+    import os
+
+    from .config import OUTPUT_DIR
+    from .scan import preset, scan_documents
+
+    paths = args.pdfs or sorted(glob.glob(os.path.join(OUTPUT_DIR, "*.pdf")))
+    if not paths:
+        print(f"Nincs bemenő PDF ({OUTPUT_DIR})", file=sys.stderr)
+        return 1
+    overrides = {"dpi": args.dpi} if args.dpi else {}
+    if args.lossless:
+        overrides["jpeg_quality"] = None
+
+    def documents():
+        for path in paths:
+            with open(path, "rb") as f:
+                yield os.path.basename(path), f.read()
+
+    report = scan_documents(documents(), args.out or os.path.join(OUTPUT_DIR, "scans"), preset(args.preset, **overrides),
+                            args.format, args.seed, args.batch_pages)
+    stages = ", ".join(f"{name} {seconds:.2f} s" for name, seconds in report.stages.items())
+    print(f"{report.documents} dokumentum, {report.pages} oldal, {report.seconds:.2f} s, "
+          f"{report.pages_per_second:.1f} oldal/s ({stages})")
+    return 0
+
+
+def cmd_approve(args):
+    from .approval import DEFAULT_RULES, load_table
+    from .synthetic import make_invoice
+
+    table = load_table(args.rules or DEFAULT_RULES, args.hit_policy)
+    templates = args.templates or list(TEMPLATES)
+    invoices = [make_invoice(templates[i % len(templates)], args.seed, i) for i in range(args.count)]
+    decisions = table.evaluate(table.columns(invoices))
+    counts = decisions.counts()
+    first = decisions.first()
+    unmatched = int((first < 0).sum())
+    for i, rule in enumerate(table.rules):
+        outputs = ", ".join(f"{k}={v}" for k, v in rule.outputs.items())
+        hits = int((first == i).sum()) if table.hit_policy == "first" else int(counts[i])
+        print(f"{rule.id:<6} {hits:>8}  {outputs}")
+    print(f"{len(invoices)} számla, {table.hit_policy}, illeszkedés nélkül: {unmatched}")
+    for data in invoices[:args.explain]:
+        print()
+        print(table.explain(data))
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m PDF_generator",
+                                     description="Teszt számla PDF-ek generálása")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    demo = sub.add_parser("demo", help="a sablonok demo számláinak generálása")
+    demo.add_argument("templates", nargs="*", type=template_name, metavar="TEMPLATE",
+                      help=f"sablonok ({', '.join(TEMPLATES)}); alapból mind")
+    demo.set_defaults(func=cmd_demo)
+
+    build = sub.add_parser("build", help="inkrementális generálás: csak a megváltozott sablonú / adatú számlák")
+    build.add_argument("templates", nargs="*", type=template_name, metavar="TEMPLATE",
+                       help=f"sablonok ({', '.join(TEMPLATES)}); alapból mind")
+    build.add_argument("-n", "--count", type=int, default=0,
+                       help="a demo számlák mellett ennyi szintetikus számla (a sablonok váltakoznak)")
+    build.add_argument("-s", "--seed", type=int, default=0)
+    build.add_argument("-w", "--workers", type=int, default=None, help="alapból a CPU magok száma")
+    build.add_argument("--manifest", metavar="FILE", help="alapból Test_Invoices/manifest.jsonl")
+    build.add_argument("--force", action="store_true", help="minden számla újrarenderelése")
+    build.set_defaults(func=cmd_build)
+
+    batch = sub.add_parser("batch", help="tömeges generálás process poolban")
+    batch.add_argument("template", choices=list(TEMPLATES))
+    batch.add_argument("-n", "--count", type=int, default=100)
+    batch.add_argument("-w", "--workers", type=int, default=None, help="alapból a CPU magok száma")
+    batch.add_argument("-c", "--chunksize", type=int, default=8)
+    batch.add_argument("-s", "--seed", type=int, default=None,
+                       help="szintetikus adatok ezzel a seeddel (alapból a demo számla ismétlése)")
+    batch.add_argument("--profile", action="store_true",
+                       help="fázisonkénti időmérés, p50/p95/p99 összesítő a végén")
+    batch.add_argument("--profile-jsonl", metavar="FILE",
+                       help="a számlánkénti mérések JSON lines fájlba (a --profile-t is bekapcsolja)")
+    batch.add_argument("--profile-memory", action="store_true",
+                       help="csúcs memória mérése is (tracemalloc, lassítja a generálást; a --profile-t is bekapcsolja)")
+    batch.add_argument("--cache", action="store_true",
+                       help="render cache: változatlan számla adatnál a korábban renderelt PDF-et írja ki")
+    batch.add_argument("--cache-disk-mb", type=int, metavar="MB",
+                       help="a lemezes cache mérethatára (a --cache-t is bekapcsolja)")
+    batch.add_argument("--truth", metavar="FILE",
+                       help="ground truth NDJSON: számlánként egy sor a mezők szövegével és helyével")
+    batch.add_argument("--output-profile", choices=("default", "fast", "small"), default="default",
+                       help="fast: tömörítetlen oldal tartalom, small: hinting nélküli fontok és zlib 9")
+    batch.add_argument("--threads", action="store_true",
+                       help="process pool helyett szálak (free-threaded CPython-on párhuzamosan renderelnek)")
+    batch.add_argument("--pooled", action="store_true",
+                       help="előkészített worker váz, GC takarítás a számlák között (hosszú futásokhoz)")
+    batch.add_argument("--recycle-after", type=int, metavar="CHUNKS",
+                       help="a worker folyamat újraindítása ennyi chunk után (korlátos memória)")
+    batch.add_argument("--archive", metavar="DIR",
+                       help="számlánkénti fájl helyett méretkorlátos shardok (megszakadt batch innen folytatható)")
+    batch.add_argument("--shard-mb", type=int, default=256, metavar="MB", help="egy shard mérethatára")
+    batch.add_argument("--archive-format", choices=("zip", "tar"), default="zip")
+    batch.add_argument("--bundle", metavar="FILE",
+                       help="egyetlen többoldalas PDF számlánkénti könyvjelzővel és oldaltartomány indexszel")
+    batch.add_argument("--verify", action="store_true",
+                       help="a batch után a PDF-ek szövegrétegének visszaellenőrzése (lásd verify)")
+    batch.add_argument("--strict-glyphs", action="store_true",
+                       help="a hiányzó glifek is hibának számítanak (--verify mellett)")
+    batch.set_defaults(func=cmd_batch)
+
+    verify = sub.add_parser("verify", help="a generált PDF-ek szövegének visszaolvasása és összevetése az adattal")
+    verify.add_argument("template", choices=list(TEMPLATES))
+    verify.add_argument("-n", "--count", type=int, default=100)
+    verify.add_argument("-s", "--seed", type=int, default=None,
+                        help="a batch-csel azonos seed (seed nélkül a demo számla sokszorosítva)")
+    verify.add_argument("--demo", action="store_true", help="a sablon demo számláinak ellenőrzése")
+    verify.add_argument("-w", "--workers", type=int, default=None, help="alapból a CPU magok száma")
+    verify.add_argument("-c", "--chunksize", type=int, default=32)
+    verify.add_argument("--dir", help="a PDF-ek mappája (alapból Test_Invoices)")
+    verify.add_argument("--strict-glyphs", action="store_true", help="a hiányzó glifek is hibának számítanak")
+    verify.add_argument("--show", type=int, default=20, metavar="N", help="legfeljebb ennyi eltérés kiírása")
+    verify.set_defaults(func=cmd_verify)
+
+    submit = sub.add_parser("submit", help="renderelés és feltöltés a kinyerési szolgáltatásnak (asyncio)")
+    submit.add_argument("template", choices=list(TEMPLATES))
+    submit.add_argument("-n", "--count", type=int, default=100)
+    submit.add_argument("-s", "--seed", type=int, default=None,
+                        help="szintetikus adatok ezzel a seeddel (alapból a demo számla ismétlése)")
+    submit.add_argument("-w", "--workers", type=int, default=None, help="renderelő folyamatok (alapból a CPU magok)")
+    submit.add_argument("--url", help="a szolgáltatás URL-je (alapból egy helyi stand-in indul)")
+    submit.add_argument("--concurrency", type=int, default=8, help="egyszerre futó feltöltések")
+    submit.add_argument("--queue", type=int, default=None, help="feltöltésre váró PDF-ek legfeljebb (alapból = concurrency)")
+    submit.add_argument("--retries", type=int, default=3)
+    submit.add_argument("--standin-latency", type=float, default=0.05, help="a stand-in válaszideje (s)")
+    submit.add_argument("--standin-fail-rate", type=float, default=0.0, help="a stand-in 503 válaszainak aránya")
+    submit.set_defaults(func=cmd_submit)
+
+    scan = sub.add_parser("scan", help="szkennelt hatású (raszteres, rontott) változat a generált PDF-ekből")
+    scan.add_argument("pdfs", nargs="*", metavar="PDF", help="bemenő PDF-ek (alapból a Test_Invoices/*.pdf)")
+    scan.add_argument("--preset", choices=["light", "medium", "heavy"], default="medium")
+    scan.add_argument("--format", choices=["pdf", "png", "tiff"], default="pdf")
+    scan.add_argument("--dpi", type=int, default=None, help="raszterizálási felbontás (alapból 150)")
+    scan.add_argument("--lossless", action="store_true", help="JPEG hibák nélkül (PNG oldalak)")
+    scan.add_argument("--seed", type=int, default=0)
+    scan.add_argument("--batch-pages", type=int, default=4, help="egy NumPy kötegben rontott oldalak")
+    scan.add_argument("--out", help="kimeneti mappa (alapból Test_Invoices/scans)")
+    scan.set_defaults(func=cmd_scan)
+
+    approve = sub.add_parser("approve", help="jóváhagyási döntési tábla kiértékelése szintetikus számlákon")
+    approve.add_argument("templates", nargs="*", type=template_name, metavar="TEMPLATE",
+                         help=f"sablonok ({', '.join(TEMPLATES)}); alapból mind, felváltva")
+    approve.add_argument("--rules", help="szabályok CSV / JSON fájlja (alapból approval_matrix.csv)")
+    approve.add_argument("--hit-policy", choices=["first", "collect"], default=None,
+                         help="felülírja a szabály fájlét (CSV-nél alapból first)")
+    approve.add_argument("-n", "--count", type=int, default=1000)
+    approve.add_argument("-s", "--seed", type=int, default=0)
+    approve.add_argument("--explain", type=int, default=0, metavar="N", help="az első N számla döntésének indoklása")
+    approve.set_defaults(func=cmd_approve)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
@@ -0,0 +1,31 @@
+"""Az fpdf2 verzió ellenőrzése.
+
+A renderelés néhány ponton az fpdf2 belső, nem API részeire épül:
+
+- ``background``: Form XObject a ``_resource_catalog`` listáiba és a ``_blend_group``
+  resources kapcsolón át,
+- ``layout`` / ``table``: ``_perform_page_break*``, ``_out``,
+- ``fonts``: a ``SubsetMap`` cache-elt metódusai (``__wrapped__``), a font leíró (``desc``),
+- ``output``: a kimenet előállító objektum felvétele (``OutputProducer._add_pdf_obj``)
+  és a streamek tartalma (``_contents``).
+
+Ezek kiadásonként változhatnak, ezért a modulok importáláskor ellenőrzik, hogy a
+telepített fpdf2 a tesztelt sorozatból (``FPDF_SERIES``) való-e; a függőség a
+``requirements.txt``-ben ugyanígy rögzített.
+"""
+import fpdf
+
+FPDF_SERIES = "2.8"
+
+
+def check_fpdf_version(version=None):
+    """ImportError, ha az fpdf2 (``version``, alapból a telepített) nem a ``FPDF_SERIES`` sorozatból való."""
+    version = version or fpdf.FPDF_VERSION
+    if version.split(".")[:2] != FPDF_SERIES.split("."):
+        raise ImportError(
+            f"A PDF_generator az fpdf2 {FPDF_SERIES}.x verzióival működik, a telepített verzió {version}. "
+            f"A belső fpdf részek (oldaltörés, erőforrás katalógus, font subset) más verzióban eltérhetnek; "
+            f"telepítsd a megfelelőt: pip install \"fpdf2=={FPDF_SERIES}.*\"")
+
+
+check_fpdf_version()
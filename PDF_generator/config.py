@@ -0,0 +1,96 @@
+"""Hívásonkénti renderelési beállítások és a generátorok szálbiztonsága.
+
+A ``create_*_invoice`` / ``render_*_invoice`` függvények ``config=``
+paramétere egy ``RenderConfig``: a kimeneti mappa, a kimeneti profil és az
+``[OK]`` sor kiírása. A hívás idejére a beállítás az aktuális szálon érvényes
+(mint a ``profiling`` mérése és az ``output`` profilja), így a renderelés
+mélyén futó kód sem modul szintű állapotból dolgozik::
+
+    config = RenderConfig(output_dir="/tmp/szamlak", output_profile="small", verbose=False)
+    create_simple_invoice("x.pdf", data, config=config)
+
+Szálak között megosztott, folyamatonként egyszer felépülő állapot:
+
+- a fontok feldolgozott prototípusai (``fonts``, zárral építve, utána csak olvasott),
+- a lefordított elrendezési tervek és háttér rétegek (``lru_cache``; egy versenyhelyzetben
+  kétszer fordított terv determinisztikus, bármelyik példány jó),
+- a szövegszélesség cache (``table.WIDTHS``; a dict műveletek atomikusak, ütközéskor
+  legfeljebb egy szélességet mérünk kétszer),
+- a render cache (``cache.RenderCache``, zárral).
+
+A dokumentumhoz kötött állapot (fontonként a subset és a karakter cache-e, a
+zlib szint a kiíráskor, lásd ``output.LevelOutputProducer``) dokumentumonként külön él, így a
+renderelés free-threaded CPython-on (``python3.13t``) is párhuzamosan futhat.
+A fontok és a tervek a folyamat egészére közösek: a font könyvtár ezért nem
+hívásonkénti beállítás (lásd ``fonts.font_paths``).
+"""
+from contextlib import contextmanager
+from dataclasses import dataclass
+import os
+import threading
+
+from .output import output_profile
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_DIR = os.path.join(SCRIPT_DIR, "Test_Invoices")
+
+
+@dataclass(frozen=True)
+class RenderConfig:
+    # A create_*_invoice ide ír (íráskor hozzuk létre, az import nem végez I/O-t)
+    output_dir: str = OUTPUT_DIR
+    # Kimeneti profil neve vagy OutputProfile (lásd output)
+    output_profile: object = "default"
+    # A create_*_invoice kiírja-e az [OK] sort
+    verbose: bool = True
+
+
+DEFAULT_CONFIG = RenderConfig()
+
+_local = threading.local()
+
+
+def current_config():
+    """Az aktuális szálon érvényes ``RenderConfig`` (alapból ``DEFAULT_CONFIG``)."""
+    return getattr(_local, "config", DEFAULT_CONFIG)
+
+
+@contextmanager
+def using_config(config=None):
+    """A blokk a megadott beállítással fut (None: a már érvényes marad); a ``RenderConfig``-ot adja."""
+    if config is None:
+        yield current_config()
+        return
+    previous = current_config()
+    _local.config = config
+    try:
+        with output_profile(config.output_profile):
+            yield config
+    finally:
+        _local.config = previous
+
+
+def output_path(filename, config):
+    """A kimeneti fájl útvonala a beállítás mappájában (a mappát létrehozza)."""
+    os.makedirs(config.output_dir, exist_ok=True)
+    return os.path.join(config.output_dir, filename)
+
+
+def write_output(filename, pdf, config):
+    """A kész PDF kiírása a beállítás mappájába atomikusan; az útvonalat adja vissza.
+
+    Ideiglenes fájlba írunk, majd ``os.replace``: egy meglévő fájl sosem marad
+    félkész vagy üres, ha az írás megszakad.
+    """
+    filepath = output_path(filename, config)
+    # Folyamatonként és szálanként egyedi név; open(): a jogosultság a umask szerint, mint eddig
+    tmp = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(pdf)
+        os.replace(tmp, filepath)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return filepath
@@ -0,0 +1,451 @@
+"""Duplikált és közel-duplikált számlák keresése a számla adatokból.
+
+A sablonok eltérő kulcsait (``inv_number`` / ``invoice_no`` / ``invoice_id`` ...)
+közös mezőkre képezzük le (``FIELDS``), majd normalizáljuk: kisbetű, ékezet és
+írásjel nélkül, a számlaszám csak a számjegyeivel, az összegek centre (a
+``money.parse_money`` értelmezi őket, dollár és forint, amerikai és magyar
+elválasztók).
+
+Egy számlához három lenyomat tartozik:
+
+- tartalom hash: a normalizált mezők és tételek (formázástól független egyezés),
+- üzleti kulcs hash: számlaszám + szállító + végösszeg (újraküldött számla),
+- MinHash aláírás a szöveges mezők szó-bigramjaiból, LSH sávokkal indexelve.
+
+A MinHash egy permutációs (one permutation hashing) változat: minden shingle-t
+egyszer hash-elünk, a hash alsó bitjei adják a rekeszt, a rekeszek minimuma az
+aláírás (az üres rekeszek a következő nem üresből töltődnek). Sok shingle
+(hosszú tétellista) esetén a rekeszek minimumát NumPy számolja, ugyanazzal az
+eredménnyel.
+
+Az index hash táblái (tartalom, üzleti kulcs, LSH sávonként) nem dict-ek
+számlánkénti Python int bejegyzésekkel, hanem ``_HashRuns`` multimapek:
+rendezett ``array("Q")`` futamok (``hash << 32 | azonosító``), a hash felső
+bitjei szerinti könyvtárral és ``bisect`` kereséssel, és egy kis dict puffer
+az új bejegyzéseknek. Egy számla így a lenyomataival együtt néhány száz bájt.
+A futamok összefésülése és a jelöltek hasonlósága NumPy-jal fut (``numpy``
+kell az indexhez; a lenyomat számításhoz nem).
+
+Perzisztencia: ``save(path)`` / ``DuplicateIndex.load(path)``; a fájl a
+lenyomatokat tömör tömbökként tárolja, betöltéskor a futamok újraépülnek.
+"""
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+from itertools import chain
+from operator import mul
+import hashlib
+import json
+import re
+import unicodedata
+import zlib
+
+from .money import QUANTITY_DECIMAL, format_money, parse_money
+
+# Közös mező -> a sablonok kulcsai (a meglévők szövege összefűzve)
+FIELDS = {
+    "number": ("inv_number", "invoice_no", "invoice_id"),
+    "supplier": ("remit_to_text", "pay_to_bank", "pay_to_acc_name", "pay_to_acc_no",
+                 "bank_name", "bank_institute", "bank_id"),
+    "customer": ("bill_to_text", "issued_to_name", "issued_to_company", "issued_to_address",
+                 "customer_name", "customer_phone", "customer_email", "customer_address"),
+    "date": ("inv_date", "date"),
+    "total": ("total_gross", "total_amount", "grand_total"),
+}
+
+NUM_PERM = 32
+BANDS = 8
+DEFAULT_THRESHOLD = 0.7
+
+# 2: az összegeket a money.parse_money normalizálja; 3: a tartalom hash JSON nélkül
+# (a korábbi fájlok lenyomatai mások)
+_MAGIC = b"PDFGEN-DEDUP 3\n"
+_MASK32 = 0xFFFFFFFF
+_MASK64 = (1 << 64) - 1
+_GOLDEN64 = 0x9E3779B97F4A7C15
+# Ennyi shingle felett a MinHash rekeszeit NumPy számolja (alatta a hívás költsége több)
+_VECTOR_SHINGLES = 256
+# A _HashRuns puffere: ennyi bejegyzés után lesz belőle rendezett futam
+RUN_BUFFER = 8192
+# A futamok könyvtára legfeljebb 2**_MAX_DIRECTORY_BITS rekesz
+_MAX_DIRECTORY_BITS = 24
+# Sáv kulcs: a sáv értékeinek súlyozott összege mod 2**64, a felső 32 bit (NumPy-jal is számolható)
+_BAND_WEIGHTS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93,
+                 0xFF51AFD7ED558CCD, 0xC4CEB9FE1A85EC53, 0x94D049BB133111EB, 0xBF58476D1CE4E5B9)
+# Ezres elválasztó és a nulla tizedesek (1,234.00 -> 1234) a szövegbe ágyazott számokban
+# (az írásjellel kezdődő minta gyorsabb, mint a minden pozíción futó lookbehind)
+_NUMBER_NOISE = re.compile(r"[,.](?:(?<=\d,)(?=\d{3}(?!\d))|(?<=\d\.)0+(?!\d))")
+_COMBINING = re.compile("[\u0300-\u036f\u1ab0-\u1aff\u1dc0-\u1dff\u20d0-\u20ff\ufe20-\ufe2f]")
+_WORD = re.compile(r"[^\W_]+")
+# A szavak közti (nem betű / szám) karakterek szóközzé; a \0 a tételsorok elválasztója.
+# UTF-8 bájtokon: az ASCII részt bytes.translate, a nem ASCII szakaszokat karakterenként
+# nézzük (a unicode \w regex karakterenként lassú)
+_ASCII_GAPS = bytes(c if chr(c).isalnum() or c == 0 or c >= 128 else 32 for c in range(256))
+_NON_ASCII = re.compile(rb"[\x80-\xff]+")
+
+# kind: "exact" (azonos tartalom), "key" (azonos számlaszám + szállító + összeg), "near" (MinHash)
+Match = namedtuple("Match", ["id", "label", "kind", "score"])
+Fingerprint = namedtuple("Fingerprint", ["content", "key", "signature"])
+
+
+# --- normalizálás ---
+
+def normalize_text(value):
+    """Kisbetű, ékezetek és írásjelek nélkül, egyszeres szóközökkel; a számok ezres
+    elválasztó és nulla tizedesek nélkül (``$ 1,200.00`` -> ``1200``)."""
+    text = str(value)
+    if not text.isascii():
+        text = _COMBINING.sub("", unicodedata.normalize("NFKD", text))
+    text = _NUMBER_NOISE.sub("", text.casefold())
+    return " ".join(_WORD.findall(text))
+
+
+def _normalize_rows(texts):
+    # Soronként mint a normalize_text, de egyetlen szövegen: a regex és unicode hívások
+    # száma nem nő a tételek számával (a sorokban nincs \0)
+    if not texts:
+        return []
+    text = "\0".join(texts)
+    if not text.isascii():
+        text = _COMBINING.sub("", unicodedata.normalize("NFKD", text))
+    text = _NUMBER_NOISE.sub("", text.casefold()).encode("utf-8").translate(_ASCII_GAPS)
+    text = _NON_ASCII.sub(_non_ascii_gaps, text).decode("utf-8")
+    return [" ".join(row.split()) for row in text.split("\0")]
+
+
+def _non_ascii_gaps(match):
+    return "".join(c if c.isalnum() else " " for c in match.group().decode("utf-8")).encode("utf-8")
+
+
+def normalize_number(value):
+    """Számlaszám: a számjegyek vezető nullák nélkül (``#0012`` -> ``12``), ha nincs, a szöveg."""
+    digits = "".join(c for c in str(value) if c.isdigit()).lstrip("0")
+    return digits or normalize_text(value)
+
+
+def normalize_amount(value):
+    """Összeg centben, két tizedessel (``$ 1,234.5`` és ``1 234,50 Ft`` -> ``1234.50``),
+    ha nem értelmezhető, a normalizált szöveg."""
+    cents = parse_money(str(value))
+    if cents is None:
+        return normalize_text(value)
+    return format_money(cents, QUANTITY_DECIMAL)
+
+
+def canonical(data):
+    """A közös mezők normalizált értékei és a tételsorok (soronként egy normalizált szöveg)."""
+    fields = {}
+    for name, keys in FIELDS.items():
+        raw = " ".join(str(data[key]) for key in keys if data.get(key))
+        if name == "number":
+            fields[name] = normalize_number(raw)
+        elif name == "total":
+            fields[name] = normalize_amount(raw)
+        else:
+            fields[name] = normalize_text(raw)
+    items = _normalize_rows([" ".join(map(str, row)) for row in data.get("items", ())])
+    return fields, items
+
+
+# --- lenyomatok ---
+
+def _hash64(text):
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _content_hash(fields, items):
+    # A normalizált értékekben nincs vezérlő karakter: a \0 / \1 elválasztás egyértelmű
+    return _hash64("\0".join(chain((fields[name] for name in FIELDS), ["\1"], items)))
+
+
+def _shingles(fields, items):
+    texts = [fields["supplier"], fields["customer"], fields["date"], *items]
+    shingles = {f"#{fields['number']}", f"${fields['total']}"}
+    for text in texts:
+        words = text.split()
+        if len(words) == 1:
+            shingles.add(words[0])
+        shingles.update(map(" ".join, zip(words, words[1:])))
+    return shingles
+
+
+def minhash(shingles, num_perm=NUM_PERM):
+    """Egy permutációs MinHash: ``num_perm`` rekesz (2 hatványa), 32 bites értékek.
+
+    A shingle hash CRC32 szorzásos keveréssel (a blake2b ~3x lassabb, és itt
+    nem kell kriptográfiai erősség, csak egyenletes eloszlás).
+    """
+    bits = num_perm.bit_length() - 1
+    mask = num_perm - 1
+    empty = _MASK32
+    crcs = map(zlib.crc32, map(str.encode, shingles))
+    if len(shingles) >= _VECTOR_SHINGLES:
+        import numpy as np
+
+        h = np.fromiter(crcs, np.uint64, len(shingles)) * np.uint64(_GOLDEN64)  # mod 2**64, mint lent
+        minima = np.full(num_perm, empty, np.uint64)
+        np.minimum.at(minima, h & np.uint64(mask), (h >> np.uint64(bits)) & np.uint64(_MASK32))
+        bins = minima.tolist()
+    else:
+        bins = [empty] * num_perm
+        for crc in crcs:
+            h = crc * _GOLDEN64 & _MASK64
+            b = h & mask
+            v = (h >> bits) & _MASK32
+            if v < bins[b]:
+                bins[b] = v
+    # Üres rekesz: a következő nem üres értéke, a távolsággal eltolva (rotációs sűrítés)
+    if empty in bins and len(set(bins)) > 1:
+        filled = list(bins)
+        for i, v in enumerate(bins):
+            distance = 1
+            while v == empty:
+                v = bins[(i + distance) % num_perm]
+                if v != empty:
+                    v = (v + distance * 0x9E3779B1) & _MASK32
+                distance += 1
+            filled[i] = v
+        bins = filled
+    return bins
+
+
+def fingerprint(data, num_perm=NUM_PERM):
+    fields, items = canonical(data)
+    content = _content_hash(fields, items)
+    key = _hash64(f"{fields['number']}\0{fields['supplier']}\0{fields['total']}") if fields["number"] else 0
+    return Fingerprint(content, key, minhash(_shingles(fields, items), num_perm))
+
+
+# --- index ---
+
+def _bucket_add(table, key, value):
+    # Egy elemű rekeszben közvetlenül az azonosító, többnél lista (kevesebb memória)
+    current = table.get(key)
+    if current is None:
+        table[key] = value
+    elif type(current) is list:
+        current.append(value)
+    else:
+        table[key] = [current, value]
+
+
+def _bucket(table, key):
+    current = table.get(key)
+    if current is None:
+        return ()
+    return current if type(current) is list else (current,)
+
+
+class _HashRuns:
+    """32 bites hash -> azonosítók multimap, tömör rendezett futamokban.
+
+    Egy bejegyzés egy 64 bites szám (``hash << 32 | azonosító``). Az új
+    bejegyzések egy dict pufferbe kerülnek; ``RUN_BUFFER`` után a puffer
+    rendezett ``array("Q")`` futam lesz, és a nála nem nagyobb futamokkal
+    összefésüljük (mint egy bináris számláló), így legfeljebb
+    log2(n / RUN_BUFFER) futam van. Futamonként egy könyvtár (``array("I")``)
+    adja a hash felső bitjei szerinti rekesz elejét; a rekeszen belül
+    ``bisect`` keres, így egy keresés futamonként néhány összehasonlítás.
+    """
+
+    def __init__(self, buffer=None):
+        self.buffer = buffer or RUN_BUFFER
+        self._recent = {}
+        self._pending = 0
+        # (bejegyzések, könyvtár, a könyvtár eltolása) hármasok, csökkenő méret szerint
+        self._runs = []
+
+    def __len__(self):
+        return self._pending + sum(len(run) for run, _, _ in self._runs)
+
+    def add(self, key, value):
+        _bucket_add(self._recent, key, value)
+        self._pending += 1
+        if self._pending >= self.buffer:
+            self._flush()
+
+    def extend(self, keys, values):
+        """Sok bejegyzés egyben (betöltéskor): ``keys`` és ``values`` azonos hosszú NumPy tömbök."""
+        import numpy as np
+
+        self._merge((keys.astype(np.uint64) << np.uint64(32)) | values.astype(np.uint64))
+
+    def _flush(self):
+        import numpy as np
+
+        entries = [key << 32 | value for key, values in self._recent.items()
+                   for value in (values if type(values) is list else (values,))]
+        self._recent.clear()
+        self._pending = 0
+        self._merge(np.array(entries, np.uint64))
+
+    def _merge(self, entries):
+        import numpy as np
+
+        parts = [entries]
+        while self._runs and len(self._runs[-1][0]) <= sum(map(len, parts)):
+            parts.append(np.frombuffer(self._runs.pop()[0], np.uint64))
+        merged = np.sort(np.concatenate(parts))
+        del parts
+        if not len(merged):
+            return
+        bits = min(max(len(merged).bit_length() - 1, 1), _MAX_DIRECTORY_BITS)
+        shift = 64 - bits
+        directory = np.zeros((1 << bits) + 1, np.uint32)
+        np.cumsum(np.bincount((merged >> np.uint64(shift)).astype(np.int64), minlength=1 << bits),
+                  out=directory[1:])
+        run = array("Q", merged.tobytes())
+        self._runs.append((run, array("I", directory.tobytes()), shift - 32))
+
+    def get(self, key):
+        """Az azonosítók a hash-hez (a beszúrás sorrendjétől függetlenül)."""
+        found = list(_bucket(self._recent, key))
+        low = key << 32
+        high = low | _MASK32
+        for run, directory, shift in self._runs:
+            slot = key >> shift
+            i = bisect_left(run, low, directory[slot], directory[slot + 1])
+            while i < len(run) and run[i] <= high:
+                found.append(run[i] & _MASK32)
+                i += 1
+        return found
+
+
+class DuplicateIndex:
+    """Pontos (normalizált hash) és közelítő (MinHash / LSH) keresés számla adatokra."""
+
+    def __init__(self, num_perm=NUM_PERM, bands=BANDS):
+        if num_perm & (num_perm - 1) or num_perm % bands:
+            raise ValueError("num_perm 2 hatványa és a bands többszöröse kell legyen")
+        if num_perm // bands > len(_BAND_WEIGHTS):
+            raise ValueError(f"Egy sávban legfeljebb {len(_BAND_WEIGHTS)} érték lehet")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.labels = []
+        self._content = array("Q")
+        self._keys = array("Q")
+        self._signatures = array("I")
+        # A tartalom és a kulcs hash felső 32 bitje szerint; az egyezést a teljes hash dönti el
+        self._by_content = _HashRuns()
+        self._by_key = _HashRuns()
+        self._by_band = [_HashRuns() for _ in range(bands)]
+
+    def __len__(self):
+        return len(self.labels)
+
+    def _band_keys(self, signature):
+        rows = self.num_perm // self.bands
+        weights = _BAND_WEIGHTS[:rows]
+        return [(sum(map(mul, signature[start:start + rows], weights)) & _MASK64) >> 32
+                for start in range(0, self.num_perm, rows)]
+
+    def add(self, data, label=None, fp=None):
+        """Számla felvétele; az azonosítója (0-tól folyamatos) tér vissza."""
+        fp = fp or fingerprint(data, self.num_perm)
+        doc_id = len(self.labels)
+        self.labels.append(label)
+        self._content.append(fp.content)
+        self._keys.append(fp.key)
+        self._signatures.extend(fp.signature)
+        self._by_content.add(fp.content >> 32, doc_id)
+        if fp.key:
+            self._by_key.add(fp.key >> 32, doc_id)
+        for runs, band_key in zip(self._by_band, self._band_keys(fp.signature)):
+            runs.add(band_key, doc_id)
+        return doc_id
+
+    def similarities(self, doc_ids, signature):
+        """Becsült Jaccard hasonlóságok (az egyező rekeszek aránya) a ``doc_ids`` sorrendjében."""
+        import numpy as np
+
+        if not doc_ids:
+            return []
+        # Nézet a tömbre, másolás nélkül; a visszatérés előtt elengedjük (a tömb nőhet)
+        stored = np.frombuffer(self._signatures, np.uint32).reshape(-1, self.num_perm)
+        equal = (stored[np.fromiter(doc_ids, np.int64, len(doc_ids))] == np.array(signature, np.uint32))
+        scores = (equal.sum(axis=1) / self.num_perm).tolist()
+        del stored, equal
+        return scores
+
+    def similarity(self, doc_id, signature):
+        """Becsült Jaccard hasonlóság: az egyező rekeszek aránya."""
+        start = doc_id * self.num_perm
+        stored = self._signatures[start:start + self.num_perm]
+        return sum(a == b for a, b in zip(stored, signature)) / self.num_perm
+
+    def query(self, data, threshold=DEFAULT_THRESHOLD, limit=10, fp=None):
+        """A hasonló számlák ``Match`` listája, erősség szerint (exact, key, near) és hasonlóság szerint."""
+        fp = fp or fingerprint(data, self.num_perm)
+        found = {}
+        for doc_id in self._by_content.get(fp.content >> 32):
+            if self._content[doc_id] == fp.content:
+                found[doc_id] = ("exact", 1.0)
+        keyed = []
+        if fp.key:
+            keyed = [doc_id for doc_id in self._by_key.get(fp.key >> 32)
+                     if self._keys[doc_id] == fp.key and doc_id not in found]
+        candidates = set()
+        for runs, band_key in zip(self._by_band, self._band_keys(fp.signature)):
+            candidates.update(runs.get(band_key))
+        candidates = list(candidates - found.keys() - set(keyed))
+        scores = self.similarities(keyed + candidates, fp.signature)
+        for doc_id, score in zip(keyed, scores):
+            found[doc_id] = ("key", score)
+        for doc_id, score in zip(candidates, scores[len(keyed):]):
+            if score >= threshold:
+                found[doc_id] = ("near", score)
+        order = {"exact": 0, "key": 1, "near": 2}
+        matches = sorted((Match(doc_id, self.labels[doc_id], kind, score) for doc_id, (kind, score) in found.items()),
+                         key=lambda m: (order[m.kind], -m.score, m.id))
+        return matches[:limit]
+
+    def query_and_add(self, data, label=None, threshold=DEFAULT_THRESHOLD, limit=10):
+        """Keresés, majd felvétel (egy lenyomat számítással); ``(azonosító, találatok)``."""
+        fp = fingerprint(data, self.num_perm)
+        matches = self.query(data, threshold, limit, fp)
+        return self.add(data, label, fp), matches
+
+    # --- perzisztencia ---
+
+    def save(self, path):
+        header = {"num_perm": self.num_perm, "bands": self.bands, "count": len(self), "labels": self.labels}
+        with open(path, "wb") as f:
+            f.write(_MAGIC)
+            f.write(json.dumps(header, ensure_ascii=False).encode("utf-8") + b"\n")
+            self._content.tofile(f)
+            self._keys.tofile(f)
+            self._signatures.tofile(f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            if f.readline() != _MAGIC:
+                raise ValueError(f"Nem duplikátum index fájl: {path}")
+            header = json.loads(f.readline())
+            index = cls(header["num_perm"], header["bands"])
+            count = header["count"]
+            index._content.fromfile(f, count)
+            index._keys.fromfile(f, count)
+            index._signatures.fromfile(f, count * index.num_perm)
+        index.labels = header["labels"]
+        index._rebuild()
+        return index
+
+    def _rebuild(self):
+        # Hash táblánként egyetlen rendezett futam, NumPy-jal (nem bejegyzésenkénti beszúrás)
+        import numpy as np
+
+        ids = np.arange(len(self), dtype=np.uint64)
+        content = np.frombuffer(self._content, np.uint64)
+        self._by_content.extend(content >> np.uint64(32), ids)
+        keys = np.frombuffer(self._keys, np.uint64)
+        keyed = keys != 0
+        self._by_key.extend(keys[keyed] >> np.uint64(32), ids[keyed])
+        rows = self.num_perm // self.bands
+        bands = np.frombuffer(self._signatures, np.uint32).reshape(len(self), self.bands, rows)
+        # Mint a _band_keys: súlyozott összeg mod 2**64 (a uint64 szorzás és összeadás körbefordul)
+        band_keys = (bands.astype(np.uint64) * np.array(_BAND_WEIGHTS[:rows], np.uint64)).sum(
+            axis=2, dtype=np.uint64) >> np.uint64(32)
+        for band, runs in enumerate(self._by_band):
+            runs.extend(band_keys[:, band], ids)
+        del content, keys, bands
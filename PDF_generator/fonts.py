@@ -0,0 +1,132 @@
+from fontTools import subset, ttLib
+from fpdf.fonts import SubsetMap, TTFFont
+from functools import lru_cache
+import copy
+import io
+import os
+import threading
+
+from . import compat  # belső fpdf részeket használ: verzió ellenőrzés
+from .output import current_profile
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+WINDOWS_FONT_DIR = r"C:\Windows\Fonts"
+
+# stílus -> font fájl neve
+FONT_FILES = {"": "arial.ttf", "B": "arialbd.ttf"}
+
+# (fájl útvonal, fontkey) -> (előre feldolgozott TTFFont, a font fájl bájtjai)
+_prototypes = {}
+# font fájl útvonal -> a hinting nélküli változat bájtjai (``small`` kimeneti profil)
+_dehinted = {}
+# A két registry építése; elkészülte után a bejegyzéseket csak olvassuk
+_registry_lock = threading.Lock()
+
+
+class DocumentSubsetMap(SubsetMap):
+    """``SubsetMap`` dokumentumonkénti karakter cache-sel.
+
+    Az fpdf a ``pick`` / ``get_glyph`` eredményét osztály szintű ``functools.cache``-ben
+    tartja (minden dokumentum minden karaktere egy közös táblában, amit bármelyik
+    dokumentum kiírása teljesen töröl). Itt a cache a példányé: szálak között nincs
+    közös írt tábla, és a dokumentummal együtt szabadul fel. A kiíráskor hívott
+    ``cache_clear`` továbbra is működik.
+
+    A cache nélküli függvényt a ``__wrapped__`` adja; ha az fpdf nem így cache-el
+    (``DOCUMENT_CACHES`` hamis), a ``_clone_font`` az eredeti ``SubsetMap``-et használja.
+    """
+
+    def __init__(self, font):
+        # Az ős __init__-je már használja a get_glyph-et
+        self.pick = lru_cache(maxsize=None)(SubsetMap.pick.__wrapped__.__get__(self))
+        self.get_glyph = lru_cache(maxsize=None)(SubsetMap.get_glyph.__wrapped__.__get__(self))
+        super().__init__(font)
+
+
+DOCUMENT_CACHES = all(callable(getattr(getattr(SubsetMap, name, None), "__wrapped__", None))
+                      for name in ("pick", "get_glyph"))
+
+
+@lru_cache(maxsize=None)
+def font_paths():
+    """Stílusonként a használt font fájl útvonala (folyamatonként egyszer keressük meg)."""
+    # Megpróbáljuk betölteni a script mellől, ha nincs ott, akkor a Windowsból
+    if os.path.exists(os.path.join(SCRIPT_DIR, FONT_FILES[""])):
+        font_dir = SCRIPT_DIR
+    else:
+        font_dir = WINDOWS_FONT_DIR
+    return {style: os.path.join(font_dir, fname) for style, fname in FONT_FILES.items()}
+
+
+def _prototype(pdf, path, fontkey, style):
+    entry = _prototypes.get((path, fontkey))
+    if entry is None:
+        with _registry_lock:
+            entry = _prototypes.get((path, fontkey))
+            if entry is None:
+                # Az első dokumentumnál az fpdf rendesen feldolgozza a TTF-et (cmap, szélességek, leíró)
+                with open(path, "rb") as f:
+                    font_bytes = f.read()
+                entry = (TTFFont(pdf, path, fontkey, style), font_bytes)
+                _prototypes[(path, fontkey)] = entry
+    return entry
+
+
+def _dehint(font_bytes):
+    # Minden glif megmarad a nevével együtt (a prototípus cmap-je és glyph_ids-e érvényes marad),
+    # csak a hinting (glif utasítások, fpgm / prep / cvt) és az eszközfüggő metrikák esnek ki
+    font = ttLib.TTFont(io.BytesIO(font_bytes), recalcTimestamp=False)
+    options = subset.Options(hinting=False, glyph_names=True, notdef_outline=True, legacy_kern=True,
+                             layout_features=["*"], name_IDs=["*"], name_languages=["*"],
+                             recalc_timestamp=False)
+    options.drop_tables += ["hdmx", "VDMX", "LTSH"]
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(glyphs=font.getGlyphOrder())
+    subsetter.subset(font)
+    output = io.BytesIO()
+    font.save(output)
+    return output.getvalue()
+
+
+def _font_bytes(path, font_bytes, hinting):
+    if hinting:
+        return font_bytes
+    dehinted = _dehinted.get(path)
+    if dehinted is None:
+        with _registry_lock:
+            dehinted = _dehinted.get(path)
+            if dehinted is None:
+                dehinted = _dehinted[path] = _dehint(font_bytes)
+    return dehinted
+
+
+def _clone_font(pdf, path, fontkey, style):
+    proto, font_bytes = _prototype(pdf, path, fontkey, style)
+    font_bytes = _font_bytes(path, font_bytes, current_profile().hinting)
+
+    # A feldolgozott adatokat (cmap, cw, glyph_ids, desc) megosztjuk, a dokumentumhoz
+    # kötött állapot (index, subset, hiányzó glyph-ek) viszont minden PDF-ben új.
+    font = copy.copy(proto)
+    font.i = len(pdf.fonts) + 1
+    font.subset = DocumentSubsetMap(font) if DOCUMENT_CACHES else SubsetMap(font)
+    # A font leírót a kimenet PDF objektumként számozza és a font streamet köti rá
+    font.desc = copy.copy(proto.desc)
+    font.missing_glyphs = []
+    font.biggest_size_pt = 0
+    font._hbfont = None
+    # Kimenetkor az fpdf helyben subsetteli a ttfont-ot, ezért azt nem lehet megosztani;
+    # a memóriában tartott bájtokból lustán nyitjuk meg (nincs fájl olvasás és cmap feldolgozás)
+    font.ttfont = ttLib.TTFont(io.BytesIO(font_bytes), recalcTimestamp=False, lazy=True)
+    return font
+
+
+def register_fonts(pdf, family="Arial"):
+    """Regisztrálja az Arial családot a dokumentumban (dokumentumonként egyszer hívandó).
+
+    A beágyazott font változatát (hintinggel vagy anélkül) az aktuális kimeneti profil adja.
+    """
+    for style, path in font_paths().items():
+        fontkey = f"{family.lower()}{style}"
+        if fontkey in pdf.fonts:
+            continue
+        pdf.fonts[fontkey] = _clone_font(pdf, path, fontkey, style)
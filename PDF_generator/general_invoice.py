@@ -1,212 +1,183 @@
 from fpdf import FPDF
-import os
+from functools import lru_cache
+
+from .background import compile_backgrounds, install_backgrounds, place_background
+from .config import using_config, write_output
+from .fonts import register_fonts
+from .layout import PlanBuilder, TableHeader, TableSpec, render_plan
+from .output import write_pdf
+from .profiling import phase
 
-SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-OUTPUT_DIR = os.path.join(SCRIPT_DIR, "Test_Invoices")
-os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 class ComplexInvoice(FPDF):
-    def header(self):
-        # Megkeressük a font fájlt a script mellett
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        font_path = os.path.join(script_dir, "arial.ttf") 
-        font_path_bold = os.path.join(script_dir, "arialbd.ttf")
-
-        # Megpróbáljuk betölteni a script mellől, ha nincs ott, akkor a Windowsból
-        if os.path.exists(font_path):
-            self.add_font("Arial", style="", fname=font_path)
-            self.add_font("Arial", style="B", fname=font_path_bold)
-        else:
-            # Fallback a Windows rendszermappára
-            self.add_font("Arial", style="", fname=r"C:\Windows\Fonts\arial.ttf")
-            self.add_font("Arial", style="B", fname=r"C:\Windows\Fonts\arialbd.ttf")
-
-def create_complex_invoice(filename, data):
-    pdf = ComplexInvoice()
-    pdf.add_page()
-    pdf.set_auto_page_break(auto=True, margin=15)
-    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # A fontokat dokumentumonként egyszer regisztráljuk (nem minden oldal header()-jében),
+        # a feldolgozott TTF adatokat a fonts modul folyamaton belül újrahasznosítja
+        register_fonts(self)
+        # Az oldaltörés határát a terv fordítása is látja (statikus-e egy pozíció)
+        self.set_auto_page_break(auto=True, margin=15)
+
+@lru_cache(maxsize=None)
+def compile_complex_plan():
+    """A sablon elrendezése, egyszer lefordítva (a statikus részek előre kiszámolva)."""
+    b = PlanBuilder("general")
+
     # --- 1. FEJLÉC SZEKCIÓ ---
-    
+
     # BAL OLDAL: Bill To
-    pdf.set_xy(10, 10)
-    pdf.set_font("Arial", "B", 10)
-    pdf.cell(60, 5, "Bill To", ln=True)
-    pdf.set_font("Arial", "", 9)
-    pdf.multi_cell(60, 4, data.get("bill_to_text", ""))
-    
+    b.set_xy(10, 10)
+    b.font("B", 10)
+    b.cell(60, 5, "Bill To", ln=True)
+    b.font("", 9)
+    b.multi_field(60, 4, "bill_to_text")
+
     # KÖZÉP: Remit To
-    pdf.set_xy(80, 10)
-    pdf.set_font("Arial", "B", 10)
-    pdf.cell(60, 5, "Remit to", ln=True)
-    pdf.set_xy(80, 15)
-    pdf.set_font("Arial", "", 9)
-    pdf.multi_cell(60, 4, data.get("remit_to_text", ""))
-    
+    b.set_xy(80, 10)
+    b.font("B", 10)
+    b.cell(60, 5, "Remit to", ln=True)
+    b.set_xy(80, 15)
+    b.font("", 9)
+    b.multi_field(60, 4, "remit_to_text")
+
     # JOBB OLDAL: INVOICE cím és adatok
-    pdf.set_xy(140, 10)
-    pdf.set_font("Arial", "B", 24)
-    pdf.cell(60, 10, "INVOICE", align="R", ln=True)
-    
-    # Invoice Adattábla (Number, Date, PO)
-    pdf.set_xy(140, 25)
-    pdf.set_font("Arial", "B", 9)
-    
-    # Segédfüggvény a kis táblázathoz jobb oldalt
-    def right_header_row(label, value):
-        x = pdf.get_x()
-        y = pdf.get_y()
-        pdf.rect(x, y, 25, 6) # Label box
-        pdf.rect(x+25, y, 35, 6) # Value box
-        pdf.cell(25, 6, label, border=0)
-        pdf.set_font("Arial", "", 9)
-        pdf.cell(35, 6, str(value), border=0, align="C")
-        pdf.set_font("Arial", "B", 9)
-        pdf.ln(6)
-        pdf.set_x(140)
-
-    pdf.set_x(140)
-    right_header_row("Number:", data.get("inv_number", ""))
-    right_header_row("Date:", data.get("inv_date", ""))
-    right_header_row("PO:", data.get("po_number", ""))
+    b.set_xy(140, 10)
+    b.font("B", 24)
+    b.cell(60, 10, "INVOICE", align="R", ln=True)
+
+    # Invoice Adattábla (Number, Date, PO): címke és érték kerettel
+    b.set_xy(140, 25)
+    for label, key in [("Number:", "inv_number"), ("Date:", "inv_date"), ("PO:", "po_number")]:
+        b.rect(0, 0, 25, 6) # Label box
+        b.rect(25, 0, 35, 6) # Value box
+        b.font("B", 9)
+        b.cell(25, 6, label, border=0)
+        b.font("", 9)
+        b.field(35, 6, key, border=0, align="C")
+        b.ln(6)
+        b.set_x(140)
 
     # --- 2. KÖZÉPSŐ INFORMÁCIÓS SÁV ---
 
-    pdf.ln(10) # Kis hézag
-    
+    b.ln(10) # Kis hézag
+
     # Source info
-    pdf.set_x(10)
-    pdf.set_font("Arial", "", 9)
-    pdf.cell(0, 5, f"Source: {data.get('source_ref', '')}", ln=True)
-    
+    b.set_x(10)
+    b.font("", 9)
+    b.field(0, 5, "source_ref", fmt="Source: {}", ln=True)
+
     # A hosszú vízszintes táblázat
     # Oszlop szélességek
     cols = [15, 25, 30, 30, 30, 20, 15, 25]
     headers = ["Acct.#", "A/R Cust.#", "Acct. ID", "Customer P.O.", "Attn to", "Sales Rep", "Ship Via", "Terms"]
-    values = [
-        data.get("acct_num", ""),
-        data.get("ar_cust", ""),
-        data.get("acct_id", ""),
-        data.get("cust_po", ""),
-        data.get("attn", ""),
-        data.get("sales_rep", ""),
-        data.get("ship_via", ""),
-        data.get("terms", "")
-    ]
-    
+    keys = ["acct_num", "ar_cust", "acct_id", "cust_po", "attn", "sales_rep", "ship_via", "terms"]
+
     # Fejléc sor
-    pdf.set_font("Arial", "B", 7)
-    start_y = pdf.get_y() + 2
-    pdf.set_y(start_y)
-    
+    b.font("B", 7)
+    b.ln(2)
     for i, h in enumerate(headers):
-        pdf.cell(cols[i], 5, h, border=1, align="C")
-    pdf.ln()
-    
+        b.cell(cols[i], 5, h, border=1, align="C")
+    b.ln()
+
     # Adat sor
-    pdf.set_font("Arial", "", 7)
-    for i, v in enumerate(values):
-        # Multi_cell trükk, ha a szöveg túl hosszú lenne a cellába
-        x = pdf.get_x()
-        y = pdf.get_y()
-        pdf.cell(cols[i], 8, str(v), border=1, align="C")
-    pdf.ln(12)
+    b.font("", 7)
+    for i, key in enumerate(keys):
+        b.field(cols[i], 8, key, border=1, align="C")
+    b.ln(12)
 
     # --- 3. WORK REQUESTED / PERFORMED ---
-    pdf.set_font("Arial", "B", 9)
-    pdf.cell(0, 5, "Work Requested:", ln=True)
-    pdf.set_font("Arial", "", 9)
-    pdf.multi_cell(0, 5, data.get("work_requested", ""))
-    pdf.ln(2)
-    
-    pdf.set_font("Arial", "B", 9)
-    pdf.cell(0, 5, "Work Performed:", ln=True)
-    pdf.set_font("Arial", "", 9)
-    pdf.multi_cell(0, 5, data.get("work_performed", ""))
-    pdf.ln(5)
+    b.font("B", 9)
+    b.cell(0, 5, "Work Requested:", ln=True)
+    b.font("", 9)
+    b.multi_field(0, 5, "work_requested")
+    b.ln(2)
+
+    b.font("B", 9)
+    b.cell(0, 5, "Work Performed:", ln=True)
+    b.font("", 9)
+    b.multi_field(0, 5, "work_performed")
+    b.ln(5)
 
     # --- 4. FŐ TÉTEL TÁBLÁZAT (Items) ---
 
     col_widths = [25, 80, 15, 15, 25, 30]
     table_headers = ["Part Number", "Description", "Qty.", "UOM", "Ea. Price", "Total"]
-    
-    # Fejléc
-    pdf.set_font("Arial", "B", 9)
-    for i, h in enumerate(table_headers):
-        pdf.cell(col_widths[i], 6, h, border="B", align="L" if i==1 else "C")
-    pdf.ln(8)
-    
-    # Tételek listázása
-    pdf.set_font("Arial", "", 9)
-    items = data.get("items", [])
-    
-    grand_total = 0
-    
-    for item in items:
-
-        line_height = 5
-        
-        # Mentjük a pozíciót
-        x_start = pdf.get_x()
-        y_start = pdf.get_y()
-        
-        # 1. oszlop
-        pdf.cell(col_widths[0], line_height, str(item[0]), align="C")
-        
-        # 2. oszlop (Description) - ez lehet többsoros
-        x_desc = pdf.get_x()
-        pdf.multi_cell(col_widths[1], line_height, str(item[1]), align="L")
-        y_end = pdf.get_y() 
-        
-        # Visszaállunk a sor tetejére a többi oszlophoz
-        pdf.set_xy(x_start + col_widths[0] + col_widths[1], y_start)
-        
-        # 3. Qty
-        pdf.cell(col_widths[2], line_height, str(item[2]), align="C")
-        # 4. UOM
-        pdf.cell(col_widths[3], line_height, str(item[3]), align="C")
-        # 5. Price
-        pdf.cell(col_widths[4], line_height, str(item[4]), align="R")
-        # 6. Total
-        pdf.cell(col_widths[5], line_height, str(item[5]), align="R")
-        
-        # Következő sor pozíciója
-        pdf.set_xy(10, max(y_end, y_start + line_height))
-        pdf.ln(1)
+
+    # Fejléc, minden oldalon megismétlődik
+    header = TableHeader(table_headers, ["L" if i == 1 else "C" for i in range(len(table_headers))],
+                         height=6, style="B", size=9, border="B", fill=None, advance=8)
+
+    # Tételek: (PartNo, Desc, Qty, UOM, Price, Total), a leírás lehet többsoros
+    b.font("", 9)
+    b.table("items", TableSpec(widths=col_widths, aligns=["C", "L", "C", "C", "R", "R"], line_height=5,
+                               wrap_col=1, row_gap=1, separator=None, x=10,
+                               header=header, total_col=5))
 
     # Vonal a táblázat alján
-    pdf.line(10, pdf.get_y(), 200, pdf.get_y())
-    pdf.ln(2)
+    b.line(10, 200)
+    b.ln(2)
 
     # --- 5. ÖSSZESÍTŐ (Totals) ---
 
-    y_totals = pdf.get_y()
+    # A számok egy oldalon maradnak; előbb ezeket rajzoljuk, a megjegyzés utána
+    # akár több oldalon át is folytatódhat
+    b.keep(19)
+    b.mark("totals")
     left_margin_totals = 140
-    
-    # Notes (Bal oldal)
-    pdf.set_xy(10, y_totals)
-    pdf.set_font("Arial", "", 8)
-    pdf.multi_cell(110, 4, data.get("notes", ""), border=0)
-    
+
     # Számok (Jobb oldal)
-    pdf.set_xy(left_margin_totals, y_totals)
-    
-    def print_total_row(label, value, bold=False):
-        pdf.set_x(left_margin_totals)
-        pdf.set_font("Arial", "B" if bold else "", 9)
-        pdf.cell(35, 6, label, align="R")
-        pdf.cell(25, 6, value, align="R", border="B" if bold else 0)
-        pdf.ln()
+    b.set_xy_mark(left_margin_totals, "totals")
+    for label, key, bold in [("Item Total:", "total_net", False), ("Sales Tax:", "tax", False),
+                             ("Total Amount Due:", "total_gross", True)]:
+        if bold:
+            b.ln(1)
+        b.set_x(left_margin_totals)
+        b.font("B" if bold else "", 9)
+        b.cell(35, 6, label, align="R")
+        b.field(25, 6, key, default="$ 0.00", align="R", border="B" if bold else 0)
+        b.ln()
+
+    # Notes (Bal oldal)
+    b.set_xy_mark(10, "totals")
+    b.font("", 8)
+    b.multi_field(110, 4, "notes")
 
-    print_total_row("Item Total:", data.get("total_net", "$ 0.00"))
-    print_total_row("Sales Tax:", data.get("tax", "$ 0.00"))
-    pdf.ln(1)
-    print_total_row("Total Amount Due:", data.get("total_gross", "$ 0.00"), bold=True)
+    return b.compile(ComplexInvoice)
 
-    # Mentés
-    filepath = os.path.join(OUTPUT_DIR, filename)
-    pdf.output(filepath)
-    print(f"[OK] Hagyományos számla Generálva: {filepath}")
+
+@lru_cache(maxsize=None)
+def compile_complex_background():
+    """A terv statikus rétege, folyamatonként egyszer lerenderelve (Form XObject tartalom)."""
+    return compile_backgrounds(ComplexInvoice, compile_complex_plan().background)
+
+
+def build_complex_invoice(data):
+    """Felépíti a számla dokumentumot (még nincs szerializálva)."""
+    with phase("fonts"):
+        pdf = ComplexInvoice()
+        (first_page,) = install_backgrounds(pdf, compile_complex_background())
+        pdf.add_page()
+        place_background(pdf, first_page)
+    render_plan(pdf, compile_complex_plan(), data)
+    return pdf
+
+
+def render_complex_invoice(data, out=None, config=None):
+    """PDF renderelés fájl nélkül: ``bytes``, vagy írás a megadott streambe / memoryview-ba.
+
+    A ``config`` (``config.RenderConfig``) kimeneti profilja a hívás idejére érvényes.
+    """
+    with using_config(config):
+        return write_pdf(build_complex_invoice(data), out)
+
+
+def create_complex_invoice(filename, data, config=None):
+    # Előbb a teljes renderelés, utána az atomikus írás: hibánál a régi fájl megmarad
+    # (a kimeneti mappát csak íráskor hozzuk létre, az import nem végez I/O-t)
+    with using_config(config) as config:
+        filepath = write_output(filename, render_complex_invoice(data), config)
+        if config.verbose:
+            print(f"[OK] Hagyományos számla Generálva: {filepath}")
 
 
 # --- ADATOK ÉS FUTTATÁS ---
@@ -249,14 +220,16 @@ sample_data = {
     "total_gross": "$ 220.00"
 }
 
-# 1. Generáljunk egy tökéletes másolatot
-create_complex_invoice("general_invoice_01.pdf", sample_data)
-
-# 2. Generáljunk egy "TÖRÖTT" teszt verziót (hosszú szöveggel, hogy lásd, mit bír)
+# "TÖRÖTT" teszt verzió (hosszú szöveggel, hogy lásd, mit bír)
 broken_data = sample_data.copy()
 broken_data["inv_number"] = "ERROR-999"
 broken_data["items"] = [
     ["ERR", "Ez egy extrém hosszú tétel leírás, ami biztosan el fogja törni a táblázatot, ha nem kezeli jól a sortörést a program...", "999", "db", "$ 1.00", "$ 999.00"],
     ["NaN", "Hibás ár", "-1", "db", "ingyen", "Végtelen"]
 ]
-create_complex_invoice("general_invoice_broken_01.pdf", broken_data)
\ No newline at end of file
+
+# A CLI demo parancsa ezeket rendereli: python -m PDF_generator demo
+DEMO_INVOICES = [
+    ("general_invoice_01.pdf", sample_data),
+    ("general_invoice_broken_01.pdf", broken_data),
+]
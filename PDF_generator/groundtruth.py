@@ -0,0 +1,127 @@
+"""Ground truth a generált számlákhoz: az adatmezők kirajzolt szövege és helye.
+
+Rajzolás közben a ``render_plan`` és a ``render_table`` minden adatfüggő mezőhöz
+(``field``, ``multi_field``, tételsorok cellái) rögzíti az oldalt, a dobozt és a
+szöveget, így a kinyerés pontossága PDF feldolgozás nélkül mérhető.
+
+- Koordináták mm-ben, a bal felső saroktól (mint az fpdf-ben).
+- Egysoros szövegnél a doboz a szöveg szélessége és a font ascent/descent
+  szerinti sormagasság; tördelt leírásnál a sorok befoglaló doboza, a
+  ``multi_cell``-lel rajzolt mezőknél a cella területe.
+- Az oldalak között átnyúló mező oldalanként külön doboz; a szöveg az elsőben
+  van, a folytatásoké üres.
+- A rekord oszlopos (``key``, ``row``, ``col``, ``text``, ``page``, ``x``, ``y``,
+  ``w``, ``h`` listák), táblázat cellánál a ``row`` / ``col`` a tétel és az oszlop
+  indexe, egyébként None.
+
+Használat::
+
+    with recording("simple", "x.pdf") as truth:
+        create_simple_invoice("x.pdf", data)
+    write_sidecar(path, truth.as_dict())
+
+Rögzítés nélkül (nincs aktív ``recording``) a rajzolást nem lassítja.
+"""
+from contextlib import contextmanager
+import json
+import os
+import threading
+
+COLUMNS = ("key", "row", "col", "text", "page", "x", "y", "w", "h")
+
+_local = threading.local()
+
+
+def current():
+    """Az aktuális szálon futó rögzítés (``GroundTruth``), vagy None."""
+    return getattr(_local, "truth", None)
+
+
+def _line_box(pdf, baseline):
+    # A sor teteje és magassága az aktuális font ascent / descent értékeiből
+    desc = pdf.current_font.desc
+    scale = pdf.font_size / 1000
+    return baseline - desc.ascent * scale, (desc.ascent - desc.descent) * scale
+
+
+class GroundTruth:
+    """Egy számla mezőinek gyűjtése oszlopos formában."""
+
+    def __init__(self, template, label=""):
+        self.template = template
+        self.label = label
+        self.page_size = None
+        self.columns = {name: [] for name in COLUMNS}
+
+    def __len__(self):
+        return len(self.columns["key"])
+
+    def add(self, pdf, key, text, page, x, y, w, h, row=None, col=None):
+        if self.page_size is None:
+            self.page_size = [round(pdf.w, 2), round(pdf.h, 2)]
+        for name, value in (("key", key), ("row", row), ("col", col), ("text", text), ("page", page)):
+            self.columns[name].append(value)
+        for name, value in (("x", x), ("y", y), ("w", w), ("h", h)):
+            self.columns[name].append(round(value, 2))
+
+    def text(self, pdf, key, value, x, baseline, width=None, row=None, col=None):
+        """Egysoros szöveg az aktuális oldalon, ``x`` kezdőponttal és ``baseline`` alapvonallal."""
+        if width is None:
+            width = pdf.get_string_width(value)
+        top, height = _line_box(pdf, baseline)
+        self.add(pdf, key, value, pdf.page, x, top, width, height, row, col)
+
+    def lines(self, pdf, key, value, spans, row=None, col=None):
+        """Tördelt szöveg; ``spans``: soronként ``(oldal, x, alapvonal, szélesség)``."""
+        start = 0
+        for i in range(1, len(spans) + 1):
+            if i < len(spans) and spans[i][0] == spans[start][0]:
+                continue
+            group = spans[start:i]
+            left = min(x for _, x, _, _ in group)
+            right = max(x + w for _, x, _, w in group)
+            top, _ = _line_box(pdf, group[0][2])
+            last_top, height = _line_box(pdf, group[-1][2])
+            self.add(pdf, key, value if start == 0 else "", group[0][0],
+                     left, top, right - left, last_top + height - top, row, col)
+            start = i
+
+    def block(self, pdf, key, value, page, x, y, w, row=None, col=None):
+        """``multi_cell`` terület a (``page``, ``y``) ponttól az aktuális kurzorig."""
+        for p in range(page, pdf.page + 1):
+            top = y if p == page else pdf.t_margin
+            bottom = pdf.y if p == pdf.page else pdf.page_break_trigger
+            self.add(pdf, key, value if p == page else "", p, x, top, w, bottom - top, row, col)
+
+    def as_dict(self):
+        return {
+            "template": self.template,
+            "label": self.label,
+            "unit": "mm",
+            "page_size": self.page_size,
+            "fields": self.columns,
+        }
+
+
+@contextmanager
+def recording(template, label=""):
+    """A blokkban futó renderelés mezőinek rögzítése; a ``GroundTruth`` példányt adja."""
+    truth = GroundTruth(template, label)
+    previous = current()
+    _local.truth = truth
+    try:
+        yield truth
+    finally:
+        _local.truth = previous
+
+
+def sidecar_path(pdf_path):
+    return os.path.splitext(pdf_path)[0] + ".json"
+
+
+def write_sidecar(pdf_path, record):
+    """A rekord kiírása a PDF mellé (``számla.pdf`` -> ``számla.json``), tömör JSON-ként."""
+    path = sidecar_path(pdf_path)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(record, f, ensure_ascii=False, separators=(",", ":"))
+    return path
@@ -0,0 +1,411 @@
+"""Előre lefordított (compiled) elrendezési tervek a számla sablonokhoz.
+
+Egy sablon elrendezését egyszer írjuk le a ``PlanBuilder``-rel (ugyanazokkal a
+lépésekkel, mint az fpdf hívások: ``set_xy``, ``cell``, ``multi_cell``, ``ln`` ...),
+a ``compile()`` pedig ebből egy ``LayoutPlan``-t készít:
+
+- a statikus feliratok (címkék, táblázat fejlécek) szélessége és igazítása előre
+  ki van számolva, rajzoláskor csak egy ``text()`` hívás marad belőlük,
+- a keretek, kitöltések és vonalak önálló ``rect``/``line`` lépések,
+- az adatfüggő mezők (``field``) a kulcsukkal és formátumukkal szerepelnek,
+- a redundáns fontváltásokat a fordító kiszűri,
+- ami adatfüggetlen és az oldalon fix helyen van (a kurzor pozíciója fordításkor
+  ismert), az a ``background`` rétegbe kerül abszolút koordinátákkal; ezt a
+  ``background`` modul egyszer rendereli le egy újrahasznosítható Form XObject-be.
+
+A ``render_plan`` ugyanazt a tervet használja minden számlához.
+"""
+from collections import namedtuple
+
+from . import compat  # belső fpdf részeket használ: verzió ellenőrzés
+from .groundtruth import current as current_truth
+from .profiling import current as current_timer
+from .table import _align_offset, render_table
+
+# Tételtáblázat leírása: oszlopszélességek, igazítások, sormagasság, a tördelt (leírás) oszlop
+TableSpec = namedtuple("TableSpec", [
+    "widths",           # oszlopszélességek
+    "aligns",           # oszloponkénti igazítás ("L", "C", "R")
+    "line_height",      # sormagasság
+    "wrap_col",         # a többsoros (multi_cell) oszlop indexe
+    "row_gap",          # sorok közti térköz (ln) a sor után
+    "separator",        # elválasztó vonal színe a sorok alatt, vagy None
+    "x",                # a táblázat bal széle
+    "header",           # minden oldalon megismételt fejléc (TableHeader), vagy None
+    "total_col",        # az oldalak között áthozott részösszeg oszlopa, vagy None
+], defaults=(None, None))
+
+# Táblázat fejléc: feliratok, igazítások, cellamagasság, font, keret, kitöltés, térköz utána
+TableHeader = namedtuple("TableHeader", [
+    "labels",
+    "aligns",
+    "height",
+    "style",            # font stílus ("", "B")
+    "size",             # font méret
+    "border",           # cell() keret (0, 1, "B" ...)
+    "fill",             # kitöltőszín (r, g, b), vagy None
+    "advance",          # ln() a fejléc után
+])
+
+# ops: a számlánként lefutó lépések, background: a statikus, abszolút pozíciójú rajzolás
+LayoutPlan = namedtuple("LayoutPlan", ["name", "ops", "fields", "background"])
+
+FONT_FAMILY = "Arial"
+
+
+class PlanBuilder:
+    """Egy sablon elrendezésének rögzítése; a ``compile()`` adja a ``LayoutPlan``-t."""
+
+    def __init__(self, name, page_breaks=True):
+        self.name = name
+        # Láblécben (footer()) nincs automatikus oldaltörés, ott ``page_breaks=False``
+        self.page_breaks = page_breaks
+        self._steps = []
+
+    # --- kurzor ---
+
+    def set_xy(self, x, y):
+        self._steps.append(("xy", x, y))
+
+    def set_x(self, x):
+        self._steps.append(("x", x))
+
+    def set_y(self, y):
+        self._steps.append(("y", y))
+
+    def ln(self, h=None):
+        self._steps.append(("ln", h))
+
+    def mark(self, name):
+        """Elmenti az aktuális y pozíciót (pl. egy oszlop alja)."""
+        self._steps.append(("mark", name))
+
+    def set_y_after(self, names, gap=0):
+        """y = a megjelölt pozíciók és az aktuális y maximuma + ``gap``."""
+        self._steps.append(("y_after", tuple(names), gap))
+
+    def set_xy_mark(self, x, name):
+        self._steps.append(("xy_mark", x, name))
+
+    def keep(self, h):
+        """Oldaltörés, ha ``h`` magasság már nem fér ki (egyben tartott blokk előtt)."""
+        self._steps.append(("break", h))
+
+    # --- stílus ---
+
+    def font(self, style, size):
+        self._steps.append(("font", style, size))
+
+    def draw_color(self, r, g, b):
+        self._steps.append(("draw_color", r, g, b))
+
+    def fill_color(self, r, g, b):
+        self._steps.append(("fill_color", r, g, b))
+
+    def text_color(self, r, g, b):
+        self._steps.append(("text_color", r, g, b))
+
+    # --- tartalom ---
+
+    def cell(self, w, h, text, align="L", border=0, fill=False, ln=False):
+        """Statikus felirat (címke, fejléc)."""
+        self._steps.append(("cell", w, h, text, align, border, fill, ln))
+
+    def field(self, w, h, key, default="", fmt=None, align="L", border=0, ln=False):
+        """Adatfüggő cella: ``fmt.format(data[key])`` vagy ``str(data[key])``."""
+        self._steps.append(("field", w, h, key, default, fmt, align, border, ln))
+
+    def multi_field(self, w, h, key, default="", align="J"):
+        """Adatfüggő többsoros cella (``multi_cell``), a kurzort a tartalom alá viszi."""
+        self._steps.append(("multi", w, h, key, default, align))
+
+    def rect(self, dx, dy, w, h):
+        """Keret a kurzorhoz képest."""
+        self._steps.append(("rect", dx, dy, w, h, "D"))
+
+    def line(self, x1, x2):
+        """Vízszintes vonal az aktuális y-on."""
+        self._steps.append(("line", x1, x2))
+
+    def table(self, key, spec):
+        self._steps.append(("table", key, spec))
+
+    # --- fordítás ---
+
+    def compile(self, pdf_class):
+        """A rögzített lépésekből ``LayoutPlan``; a méréshez egy ``pdf_class`` példányt használ."""
+        scratch = pdf_class()
+        k = scratch.k
+        c_margin = scratch.c_margin
+        ops = []
+        fields = []
+        background = []
+        font = None
+        last_h = None
+        # A kurzor fordításkor ismert pozíciója (None: adatfüggő, pl. multi_cell után)
+        cx, cy = scratch.l_margin, scratch.t_margin
+        # Az aktuális stílus, ill. ami ebből a háttér rétegbe már bekerült
+        style = {}
+        background_style = {}
+
+        def set_font(style, size):
+            nonlocal font
+            if font != (style, size):
+                font = (style, size)
+                scratch.set_font(FONT_FAMILY, style, size)
+                ops.append(("font", style, size))
+
+        def emit(op, static):
+            """Rajzoló lépés: ismert pozíción a háttérbe (abszolút), különben a tervbe."""
+            if not static:
+                ops.append(op)
+                return
+            for kind, style_op in style.items():
+                if background_style.get(kind) != style_op:
+                    background_style[kind] = style_op
+                    background.append(style_op)
+            background.append(_absolute(op, cx, cy))
+
+        for step in self._steps:
+            kind = step[0]
+            if kind == "font":
+                set_font(step[1], step[2])
+                style["font"] = step
+            elif kind in ("draw_color", "fill_color", "text_color"):
+                style[kind] = step
+                ops.append(step)
+            elif kind == "ln":
+                # ln() paraméter nélkül az utolsó cella magasságát használja
+                h = step[1] if step[1] is not None else last_h
+                ops.append(("ln", h))
+                cx, cy = scratch.l_margin, None if cy is None else cy + h
+            elif kind in ("cell", "field"):
+                if kind == "cell":
+                    _, w, h, text, align, border, fill, newline = step
+                else:
+                    _, w, h, key, default, fmt, align, border, newline = step
+                    fill = False
+                    fields.append(key)
+                last_h = h
+                font_size = font[1] / k
+                baseline = 0.5 * h + 0.3 * font_size
+                if w == 0 and cx is not None:
+                    # Ismert x esetén a jobb margóig tartó cella szélessége is ismert
+                    w = scratch.w - scratch.r_margin - cx
+                if w == 0 and (align != "L" or border or fill):
+                    # A jobb margóig tartó cellát nem tudjuk előre kiszámolni
+                    ops.append(("fpdf_cell", step))
+                    cx = cy = None
+                    continue
+                ops.append(("break", h))
+                if cy is not None and self.page_breaks and cy + h > scratch.page_break_trigger:
+                    cx = cy = None
+                static = cx is not None and cy is not None
+                if fill:
+                    emit(("rect", 0, 0, w, h, "F"), static)
+                if border:
+                    for op in _border_ops(w, h, border):
+                        emit(op, static)
+                if kind == "cell":
+                    if text:
+                        tw = scratch.get_string_width(text)
+                        emit(("text", _align_offset(align, w, tw, c_margin), baseline, text), static)
+                else:
+                    ops.append(("field", key, default, fmt, align, w, c_margin, baseline))
+                if newline:
+                    ops.append(("nl", h))
+                    cx, cy = scratch.l_margin, None if cy is None else cy + h
+                else:
+                    ops.append(("advance", w))
+                    cx = None if cx is None else cx + w
+            elif kind == "multi":
+                fields.append(step[3])
+                last_h = step[2]
+                ops.append(step)
+                cx = cy = None
+            elif kind in ("table", "break"):
+                if kind == "table":
+                    fields.append(step[1])
+                ops.append(step)
+                cx = cy = None
+            elif kind == "rect":
+                emit(step, cx is not None and cy is not None)
+            elif kind == "line":
+                emit(step, cy is not None)
+            else:
+                ops.append(step)
+                if kind == "xy":
+                    cx, cy = _resolve(step[1], scratch.w), _resolve(step[2], scratch.h)
+                elif kind == "x":
+                    cx = _resolve(step[1], scratch.w)
+                elif kind == "y":
+                    cx, cy = scratch.l_margin, _resolve(step[1], scratch.h)
+                elif kind == "y_after":
+                    cx, cy = scratch.l_margin, None
+                elif kind == "xy_mark":
+                    cx, cy = step[1], None
+
+        return LayoutPlan(self.name, tuple(ops), tuple(fields), tuple(background))
+
+
+def _resolve(value, size):
+    # fpdf: a negatív koordináta a jobb / alsó széltől számít
+    return size + value if value < 0 else value
+
+
+def _absolute(op, x, y):
+    """A kurzorhoz relatív rajzoló lépés abszolút koordinátákkal (a háttér réteghez)."""
+    kind = op[0]
+    if kind == "text":
+        return ("text", x + op[1], y + op[2], op[3])
+    if kind == "rect":
+        return ("rect", x + op[1], y + op[2], op[3], op[4], op[5])
+    if kind == "seg":
+        return ("line", x + op[1], y + op[2], x + op[3], y + op[4])
+    # ("line", x1, x2) az aktuális y-on
+    return ("line", op[1], y, op[2], y)
+
+
+def _border_ops(w, h, border):
+    if border == 1:
+        return [("rect", 0, 0, w, h, "D")]
+    ops = []
+    for side in str(border):
+        if side == "B":
+            ops.append(("seg", 0, h, w, h))
+        elif side == "T":
+            ops.append(("seg", 0, 0, w, 0))
+        elif side == "L":
+            ops.append(("seg", 0, 0, 0, h))
+        elif side == "R":
+            ops.append(("seg", w, 0, w, h))
+    return ops
+
+
+def _value(data, key, default, fmt):
+    value = data.get(key, default)
+    return fmt.format(value) if fmt else str(value)
+
+
+def render_background(pdf, ops):
+    """A háttér réteg (abszolút pozíciójú statikus lépések) kirajzolása."""
+    for op in ops:
+        kind = op[0]
+        if kind == "text":
+            pdf.text(op[1], op[2], op[3])
+        elif kind == "rect":
+            pdf.rect(op[1], op[2], op[3], op[4], style=op[5])
+        elif kind == "line":
+            pdf.line(op[1], op[2], op[3], op[4])
+        elif kind == "font":
+            pdf.set_font(FONT_FAMILY, op[1], op[2])
+        elif kind == "draw_color":
+            pdf.set_draw_color(op[1], op[2], op[3])
+        elif kind == "fill_color":
+            pdf.set_fill_color(op[1], op[2], op[3])
+        elif kind == "text_color":
+            pdf.set_text_color(op[1], op[2], op[3])
+        else:
+            raise ValueError(f"Ismeretlen háttér lépés: {kind!r}")
+
+
+def render_plan(pdf, plan, data):
+    """A lefordított terv kirajzolása a ``pdf`` aktuális oldalára a ``data`` adataival.
+
+    A ``plan.background`` réteget nem rajzolja ki, azt a hívó helyezi el az oldalon
+    (``background.place_background``, vagy közvetlenül ``render_background``).
+    Aktív ``groundtruth.recording`` mellett az adatmezők helyét is rögzíti.
+    """
+    marks = {}
+    text = pdf.text
+    truth = current_truth()
+    # Fázismérés (profiling): a táblázat előtti rész "header", utána "totals"
+    timer = current_timer()
+    if timer is not None:
+        timer.start("header")
+    for op in plan.ops:
+        kind = op[0]
+        if kind == "text":
+            text(pdf.x + op[1], pdf.y + op[2], op[3])
+        elif kind == "field":
+            _, key, default, fmt, align, w, c_margin, baseline = op
+            value = _value(data, key, default, fmt)
+            if value:
+                dx = c_margin if align == "L" else _align_offset(align, w, pdf.get_string_width(value), c_margin)
+                text(pdf.x + dx, pdf.y + baseline, value)
+                if truth is not None:
+                    truth.text(pdf, key, value, pdf.x + dx, pdf.y + baseline)
+        elif kind == "advance":
+            pdf.x += op[1]
+        elif kind == "nl":
+            pdf.x = pdf.l_margin
+            pdf.y += op[1]
+        elif kind == "break":
+            # Ugyanaz az automatikus oldaltörés, amit a cell() is elvégezne
+            pdf._perform_page_break_if_need_be(op[1])
+        elif kind == "font":
+            pdf.set_font(FONT_FAMILY, op[1], op[2])
+        elif kind == "xy":
+            pdf.set_xy(op[1], op[2])
+        elif kind == "x":
+            pdf.set_x(op[1])
+        elif kind == "y":
+            pdf.set_y(op[1])
+        elif kind == "ln":
+            pdf.ln(op[1])
+        elif kind == "rect":
+            pdf.rect(pdf.x + op[1], pdf.y + op[2], op[3], op[4], style=op[5])
+        elif kind == "seg":
+            x, y = pdf.x, pdf.y
+            pdf.line(x + op[1], y + op[2], x + op[3], y + op[4])
+        elif kind == "line":
+            pdf.line(op[1], pdf.y, op[2], pdf.y)
+        elif kind == "multi":
+            _, w, h, key, default, align = op
+            value = _value(data, key, default, None)
+            page, x, y = pdf.page, pdf.x, pdf.y
+            pdf.multi_cell(w, h, value, align=align)
+            if truth is not None and value:
+                truth.block(pdf, key, value, page, x, y, w or pdf.w - pdf.r_margin - x)
+        elif kind == "table":
+            if timer is not None:
+                timer.start("table")
+            render_table(pdf, op[2], data.get(op[1], []), op[1])
+            if timer is not None:
+                timer.start("totals")
+        elif kind == "mark":
+            marks[op[1]] = pdf.y
+        elif kind == "y_after":
+            pdf.set_y(max([marks[name] for name in op[1]] + [pdf.y]) + op[2])
+        elif kind == "xy_mark":
+            pdf.set_xy(op[1], marks[op[2]])
+        elif kind == "draw_color":
+            pdf.set_draw_color(op[1], op[2], op[3])
+        elif kind == "fill_color":
+            pdf.set_fill_color(op[1], op[2], op[3])
+        elif kind == "text_color":
+            pdf.set_text_color(op[1], op[2], op[3])
+        elif kind == "fpdf_cell":
+            _render_fpdf_cell(pdf, op[1], data, truth)
+        else:
+            raise ValueError(f"Ismeretlen layout lépés: {kind!r}")
+    if timer is not None:
+        timer.stop()
+
+
+def _render_fpdf_cell(pdf, step, data, truth=None):
+    if step[0] == "cell":
+        _, w, h, text, align, border, fill, newline = step
+    else:
+        _, w, h, key, default, fmt, align, border, newline = step
+        text, fill = _value(data, key, default, fmt), False
+        if truth is not None and text:
+            # A cell() oldaltörését előre elvégezzük, hogy a rögzített oldal és y helyes legyen
+            pdf._perform_page_break_if_need_be(h)
+            width = pdf.get_string_width(text)
+            dx = _align_offset(align, w or pdf.w - pdf.r_margin - pdf.x, width, pdf.c_margin)
+            truth.text(pdf, key, text, pdf.x + dx, pdf.y + 0.5 * h + 0.3 * pdf.font_size, width)
+    if newline:
+        pdf.cell(w, h, text, align=align, border=border, fill=fill, new_x="LMARGIN", new_y="NEXT")
+    else:
+        pdf.cell(w, h, text, align=align, border=border, fill=fill)
@@ -0,0 +1,200 @@
+"""Inkrementális build: csak a megváltozott bemenetű számlák renderelődnek újra.
+
+Kimeneti fájlonként egy lenyomatot tartunk nyilván egy manifestben. A
+lenyomat a render cache kulcsa (``cache.cache_key``): a sablon verziója (a
+sablon modul, a renderelő modulok és a font fájlok hash-e), a normalizált
+adat dict és a kimeneti profil. Újrafuttatáskor egy számla akkor renderelődik
+újra, ha a lenyomata eltér a manifestben tárolttól, vagy a fájl hiányzik /
+más méretű, mint amit a manifest rögzített.
+
+A manifest (alapból a kimeneti mappa ``manifest.jsonl`` fájlja) csak hozzáfűz: minden kész
+renderelés után egy sor kerül bele, így egy megszakadt build a már elkészült
+fájlokat a következő futáskor nem rendereli újra. Ugyanarra a fájlra a
+későbbi sor érvényes; ha a sorok száma a bejegyzések kétszerese fölé nő, a
+fájlt tömörítjük (atomikusan újraírjuk).
+
+A jobokat a ``Plan`` lustán szűri: a változatlanokat kihagyja, a többit
+közvetlenül a batch kapja, így egy nagy manifest inkrementális buildje is
+korlátos memóriával fut (a jobok adata nem gyűlik össze előre).
+
+Használat::
+
+    report = build(demo_jobs())                          # a demo fixture-ök
+    report = build(iter_jobs(["simple", "modern"], seed=1, count=100_000),
+                   config=RenderConfig(output_dir="out", verbose=False))
+"""
+from dataclasses import dataclass, field
+import json
+import os
+import tempfile
+import time
+
+from .batch import BatchConfig, _normalize_job, iter_batch
+from .cache import cache_key
+from .config import OUTPUT_DIR, current_config, output_path, using_config
+from .templates import TEMPLATES, template_module
+
+MANIFEST_NAME = "manifest.jsonl"
+
+
+class Manifest:
+    """Fájlnév -> ``(sablon, lenyomat, méret)``, hozzáfűzős JSONL fájlban."""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self._lines = 0
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Megszakadt írás félkész utolsó sora
+                        continue
+                    self.entries[record["file"]] = (record["template"], record["fingerprint"], record["size"])
+                    self._lines += 1
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, filename):
+        return self.entries.get(filename)
+
+    def record(self, filename, template, fingerprint, size):
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self.entries[filename] = (template, fingerprint, size)
+        record = {"file": filename, "template": template, "fingerprint": fingerprint, "size": size}
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self._lines += 1
+
+    def compact(self):
+        """A manifest újraírása fájlonként egy sorral (atomikusan)."""
+        self.close()
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for filename, (template, fingerprint, size) in self.entries.items():
+                record = {"file": filename, "template": template, "fingerprint": fingerprint, "size": size}
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        os.replace(tmp, self.path)
+        self._lines = len(self.entries)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._lines > 2 * len(self.entries) + 1000:
+            self.compact()
+
+
+@dataclass
+class BuildReport:
+    # A renderelt számlák ``batch.JobResult``-jai
+    results: list = field(default_factory=list)
+    skipped: int = 0
+    check_seconds: float = 0.0
+    wall_seconds: float = 0.0
+
+    @property
+    def failed(self):
+        return [r for r in self.results if not r.ok]
+
+
+def demo_jobs(templates=None):
+    """A sablonok demo számlái (``DEMO_INVOICES``) ``(sablon, adat, fájlnév)`` jobokként."""
+    for template in templates or list(TEMPLATES):
+        for filename, data in template_module(template).DEMO_INVOICES:
+            yield template, data, filename
+
+
+def _existing_sizes(directory):
+    # Egy könyvtár listázás a fájlonkénti stat helyett
+    try:
+        with os.scandir(directory) as entries:
+            return {entry.name: entry.stat().st_size for entry in entries if entry.name.endswith(".pdf")}
+    except FileNotFoundError:
+        return {}
+
+
+class Plan:
+    """A jobok közül a renderelendők lusta folyama (``(sablon, adat, fájlnév)``).
+
+    Iteráláskor jobonként dönt: ha a lenyomat és a fájl mérete egyezik a
+    manifestével (és nincs ``force``), a job kimarad (``skipped``). A
+    renderelendők lenyomatát a ``pop(sorszám)`` adja vissza, amikor az eredmény
+    megérkezik (a sorszám a renderelendők közti, 0-tól: a ``JobResult.index``);
+    így csak a folyamatban lévő jobok lenyomatai vannak a memóriában, és két
+    azonos nevű job sem írja felül egymásét.
+    A ``seconds`` a döntésekre fordított idő (a renderelés nélkül).
+    """
+
+    def __init__(self, jobs, manifest, directory=OUTPUT_DIR, force=False):
+        self.jobs = jobs
+        self.manifest = manifest
+        self.directory = directory
+        self.force = force
+        self.todo = 0
+        self.skipped = 0
+        self.seconds = 0.0
+        self._fingerprints = {}
+
+    def __iter__(self):
+        start = time.perf_counter()
+        existing = _existing_sizes(self.directory)
+        for index, job in enumerate(self.jobs):
+            _, template, data, filename = _normalize_job(index, job)
+            fingerprint = cache_key(template, data)
+            entry = self.manifest.get(filename)
+            if (not self.force and entry is not None and entry[1] == fingerprint
+                    and existing.get(filename) == entry[2]):
+                self.skipped += 1
+                continue
+            self._fingerprints[self.todo] = fingerprint
+            self.todo += 1
+            self.seconds += time.perf_counter() - start
+            yield template, data, filename
+            start = time.perf_counter()
+        self.seconds += time.perf_counter() - start
+
+    def pop(self, index):
+        """A ``index``-edik renderelendő job lenyomata (egyszer kérhető le)."""
+        return self._fingerprints.pop(index)
+
+
+def build(jobs, manifest_path=None, workers=None, chunksize=8, force=False, config=None):
+    """A jobok közül a megváltozottak renderelése, a manifest frissítésével.
+
+    A ``config`` (``config.RenderConfig``, alapból az érvényes) adja a kimeneti
+    mappát és profilt; a manifest alapból a mappa ``manifest.jsonl`` fájlja.
+    """
+    start = time.perf_counter()
+    config = config or current_config()
+    # A lenyomat (cache_key) a config kimeneti profiljával számolódik, mint a renderelés
+    with using_config(config), Manifest(manifest_path or os.path.join(config.output_dir, MANIFEST_NAME)) as manifest:
+        plan = Plan(jobs, manifest, config.output_dir, force=force)
+        report = BuildReport()
+        batch_config = BatchConfig(output_dir=config.output_dir, output_profile=config.output_profile)
+        # Soronként rögzítjük, ahogy a renderelések elkészülnek (megszakadt build is halad);
+        # a process pool csak az első renderelendő jobnál indít workert
+        for result in iter_batch(plan, workers, chunksize, config=batch_config):
+            fingerprint = plan.pop(result.index)
+            if result.ok:
+                size = os.path.getsize(output_path(result.filename, config))
+                manifest.record(result.filename, result.template, fingerprint, size)
+            report.results.append(result)
+        report.skipped = plan.skipped
+        report.check_seconds = plan.seconds
+    report.wall_seconds = time.perf_counter() - start
+    return report
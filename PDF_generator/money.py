@@ -0,0 +1,471 @@
+"""Pénzösszegek számként: értelmezés, formázás, összegek számítása és ellenőrzése.
+
+A számla adatokban minden összeg előre formázott szöveg (``"$ 220.00"``,
+``"$400"``, ``"10%"``). Ez a modul egész számként kezeli őket: az összegek
+és a mennyiségek is századokban (cent / fillér, ill. 0.01 darab) vannak, így a
+számítás pontos, és egy köteg ``int64`` NumPy tömbökben ellenőrizhető.
+
+- ``parse_money("$ 1,234.50")`` -> 123450, ``parse_money("1 234,50 Ft")`` -> 123450,
+  ``parse_money("ingyen")`` -> None; ``parse_percent("10%")`` -> 1000 (bázispont),
+- ``format_money(123450, HUF)`` -> ``"1 235 Ft"``; a formázás és az értelmezés
+  is gyorsítótárazott (ugyanaz az összeg sokszor előfordul),
+- ``infer_format("1 234,50 Ft")`` -> a szöveg írásmódja ``MoneyFormat``-ként (pl. a
+  tételtáblázat áthozott részösszegéhez, ami az oszlop formátumát követi),
+- ``SCHEMAS``: sablononként a tétel oszlopok (egységár, mennyiség, sorösszeg)
+  és az összesítő mezők (részösszeg, adó, végösszeg) helye és formátuma,
+- ``check(template, invoices)``: soronkénti és összesítő ellenőrzés kötegben,
+  ``inject(...)``: szándékos eltérések tömegesen, ``recompute(...)``: a
+  tételekből számolt, konzisztens összesítő.
+
+Kerekítés: a sorösszeg (egységár x mennyiség) és az adó (részösszeg x kulcs)
+centre kerekítve, a felét felfelé.
+
+Függőségek: a kötegelt rész (``parse_money_array``, ``MoneyBatch``, ``check``)
+``numpy``-t használ, ezt a függvények maguk importálják; az egyenkénti
+értelmezés és formázás (pl. a ``synthetic`` adatgenerátornak) nélküle is működik.
+"""
+from dataclasses import dataclass, field
+from functools import lru_cache
+import itertools
+from operator import itemgetter
+import random
+import re
+
+MISSING = -(1 << 63)                   # nem értelmezhető / hiányzó érték az int64 tömbökben
+
+# Eltérés fajták (bitek a ``CheckReport.flags`` tömbben)
+UNPARSEABLE = 1
+LINE = 2
+SUBTOTAL = 4
+TAX = 8
+TOTAL = 16
+ISSUES = {UNPARSEABLE: "unparseable", LINE: "line", SUBTOTAL: "subtotal", TAX: "tax", TOTAL: "total"}
+
+_SYMBOLS = r"\$|€|USD|EUR|HUF|Ft\.?"
+_MONEY = re.compile(rf"\s*(-)?\s*(?:{_SYMBOLS})?\s*(-)?\s*(\d[\d.,\s]*?)\s*(?:{_SYMBOLS})?\s*", re.IGNORECASE)
+_LAYOUT = re.compile(rf"\s*-?\s*({_SYMBOLS})?(\s*)-?\s*(\d[\d.,\s]*?)(\s*)({_SYMBOLS})?\s*", re.IGNORECASE)
+_PERCENT = re.compile(r"\s*(\d+(?:[.,]\d+)?)\s*%\s*")
+_GROUPED = re.compile(r"\d{1,3}(?:,\d{3})+|\d{1,3}(?:\.\d{3})+")
+
+
+# --- értelmezés ---
+
+def _split_number(number):
+    """``(egész rész, tizedes rész)`` a tizedes jel felismerésével, vagy None."""
+    number = "".join(number.split())
+    if "," in number and "." in number:
+        decimal_sep = "," if number.rfind(",") > number.rfind(".") else "."
+    elif "," in number or "." in number:
+        sep = "," if "," in number else "."
+        # Egyetlen elválasztó pontosan három számjeggyel utána: ezres (1,234 / 12.345)
+        head, _, tail = number.rpartition(sep)
+        decimal_sep = None if number.count(sep) > 1 or len(tail) == 3 else sep
+    else:
+        return number, ""
+    whole, decimals = number, ""
+    if decimal_sep is not None:
+        whole, _, decimals = number.rpartition(decimal_sep)
+    if whole and not whole.isdigit() and not _GROUPED.fullmatch(whole):
+        return None
+    whole = whole.replace(",", "").replace(".", "")
+    if not decimals.isdigit() and decimals:
+        return None
+    return whole or "0", decimals
+
+
+@lru_cache(maxsize=1 << 18)
+def parse_money(text):
+    """Összeg századokban (``"$ 1,234.50"`` -> 123450), ha nem értelmezhető, None.
+
+    Az amerikai (``1,234.50``) és a magyar (``1 234,50``, ``1.234,50``) írásmódot
+    is felismeri; kettőnél több tizedesjegy vagy 16-nál több egész jegy esetén None.
+    """
+    if not isinstance(text, str):
+        return None if text is None else round(text * 100)
+    match = _MONEY.fullmatch(text)
+    if match is None:
+        return None
+    parts = _split_number(match.group(3))
+    if parts is None or len(parts[1]) > 2 or len(parts[0]) > 16:
+        return None
+    whole, decimals = parts
+    value = int(whole) * 100 + int(decimals.ljust(2, "0") or 0)
+    return -value if match.group(1) or match.group(2) else value
+
+
+@lru_cache(maxsize=1024)
+def parse_percent(text):
+    """Százalék bázispontban (``"10%"`` -> 1000), ha nem értelmezhető, None."""
+    match = _PERCENT.fullmatch(str(text))
+    if match is None:
+        return None
+    return round(float(match.group(1).replace(",", ".")) * 100)
+
+
+def apply_rate(amount, rate):
+    """``amount`` (század) szorozva ``rate`` bázisponttal, centre kerekítve (a felét felfelé)."""
+    return (amount * rate + 5000) // 10000
+
+
+# --- formázás ---
+
+@dataclass(frozen=True)
+class MoneyFormat:
+    symbol: str = "$"
+    symbol_first: bool = True
+    space: str = " "            # a szimbólum és a szám között
+    decimals: int = 2           # 2 vagy 0 (egészre kerekítve, pl. forint)
+    thousands: str = ""
+    decimal_sep: str = "."
+
+
+USD = MoneyFormat()                                     # $ 1234.50 (modern, general)
+USD_COMPACT = MoneyFormat(space="")                     # $1234.50 (simple)
+USD_LOCALE = MoneyFormat(space="", thousands=",")       # $1,234.50 (en_US)
+HUF = MoneyFormat("Ft", False, " ", 0, "\u00a0", ",")   # 1 235 Ft (hu_HU, nem törő szóköz)
+HUF_DECIMAL = MoneyFormat("Ft", False, " ", 2, "\u00a0", ",")
+PLAIN = MoneyFormat("", space="", decimals=0)           # 100 (a simple egységár oszlopa)
+QUANTITY = MoneyFormat("", space="", decimals=0)        # 3
+QUANTITY_DECIMAL = MoneyFormat("", space="")            # 3.00
+
+FORMATS = {"usd": USD, "usd_compact": USD_COMPACT, "en_US": USD_LOCALE, "hu_HU": HUF, "huf": HUF,
+           "huf_decimal": HUF_DECIMAL}
+
+
+@lru_cache(maxsize=1 << 16)
+def format_money(amount, fmt=USD):
+    """Századokban adott összeg szövegként a ``fmt`` szerint."""
+    if fmt.decimals == 0:
+        whole, cents = (abs(amount) + 50) // 100, 0
+        decimals = ""
+    else:
+        whole, cents = divmod(abs(amount), 100)
+        decimals = f"{fmt.decimal_sep}{cents:02d}"
+    sign = "-" if amount < 0 and (whole or cents) else ""
+    digits = f"{whole:,}".replace(",", fmt.thousands) if fmt.thousands else str(whole)
+    if not fmt.symbol:
+        return f"{sign}{digits}{decimals}"
+    if fmt.symbol_first:
+        return f"{sign}{fmt.symbol}{fmt.space}{digits}{decimals}"
+    return f"{sign}{digits}{decimals}{fmt.space}{fmt.symbol}"
+
+
+@lru_cache(maxsize=1024)
+def infer_format(text):
+    """Az összeg szöveg írásmódja (szimbólum és helye, elválasztók), ha nem értelmezhető, None.
+
+    Tizedesjegyek nélküli forint összegnél a formátum is egészre kerekít, egyébként
+    két tizedesjegyet ír (``"$400"`` -> ``$1234.50`` alakú kimenet).
+    """
+    if not isinstance(text, str) or parse_money(text) is None:
+        return None
+    before, before_space, number, after_space, after = _LAYOUT.fullmatch(text).groups()
+    number = number.strip()
+    _, decimals = _split_number(number)
+    whole = number[:len(number) - len(decimals) - 1] if decimals else number
+    thousands = next((c for c in whole if not c.isdigit()), "")
+    symbol = before or after or ""
+    forint = symbol.lower().startswith(("ft", "huf"))
+    if decimals:
+        decimal_sep = number[-len(decimals) - 1]
+    else:
+        decimal_sep = "," if forint or thousands == "." else "."
+    return MoneyFormat(symbol, bool(before) or not after, before_space if before else after_space,
+                       2 if decimals or not forint else 0, thousands, decimal_sep)
+
+
+# --- sablonok ---
+
+@dataclass(frozen=True)
+class MoneySchema:
+    """Egy sablon pénz mezői: tétel oszlopok és összesítő kulcsok formátummal."""
+    price_col: int
+    qty_col: int
+    line_col: int
+    subtotal: str
+    tax: str
+    total: str
+    tax_percent: bool = False       # a tax mező kulcs ("10%"), nem összeg
+    tax_rate: int = None            # rögzített adókulcs bázispontban (a sablon felirata szerint)
+    price_format: MoneyFormat = USD
+    qty_format: MoneyFormat = QUANTITY
+    amount_format: MoneyFormat = USD
+
+
+SCHEMAS = {
+    "simple": MoneySchema(1, 2, 3, "subtotal", "tax", "total_amount", tax_percent=True,
+                          price_format=PLAIN, amount_format=USD_COMPACT),
+    "modern": MoneySchema(1, 2, 3, "subtotal", "tax", "grand_total", tax_rate=2000),
+    "general": MoneySchema(4, 2, 5, "total_net", "tax", "total_gross", qty_format=QUANTITY_DECIMAL),
+}
+
+
+def line_total(price, qty):
+    """Sorösszeg századokban: egységár (század) x mennyiség (század), centre kerekítve."""
+    return (price * qty + 50) // 100
+
+
+def _schema(template):
+    try:
+        return SCHEMAS[template]
+    except KeyError:
+        raise ValueError(f"Ismeretlen sablon: {template!r} (választható: {', '.join(SCHEMAS)})") from None
+
+
+def recompute(template, data, tax_rate=None):
+    """A tételekből számolt sorösszegek, részösszeg, adó és végösszeg (új dict, formázva).
+
+    Az adókulcs sorrendben: ``tax_rate``, a sablon rögzített kulcsa, a ``tax``
+    mező százaléka; ha egyik sincs, a meglévő adó összeg marad.
+    """
+    schema = _schema(template)
+    data = dict(data)
+    items, subtotal = [], 0
+    for row in data.get("items", ()):
+        row = list(row)
+        price, qty = parse_money(row[schema.price_col]), parse_money(row[schema.qty_col])
+        if price is not None and qty is not None:
+            row[schema.line_col] = format_money(line_total(price, qty), schema.amount_format)
+        subtotal += parse_money(row[schema.line_col]) or 0
+        items.append(row)
+    data["items"] = items
+    rate = tax_rate or schema.tax_rate or (parse_percent(data.get(schema.tax, "")) if schema.tax_percent else None)
+    if schema.tax_percent:
+        tax = 0 if rate is None else apply_rate(subtotal, rate)
+        if tax_rate is not None:
+            data[schema.tax] = f"{tax_rate / 100:g}%"
+    else:
+        tax = apply_rate(subtotal, rate) if rate is not None else (parse_money(data.get(schema.tax)) or 0)
+        data[schema.tax] = format_money(tax, schema.amount_format)
+    data[schema.subtotal] = format_money(subtotal, schema.amount_format)
+    data[schema.total] = format_money(subtotal + tax, schema.amount_format)
+    return data
+
+
+# --- kötegek ---
+
+def _parse_chunk(values):
+    # Gyors út a leggyakoribb alakra: [-][$][ ]számjegyek[.dd]. Az értékek NUL-lal
+    # összefűzve egy bájt tömbbe kerülnek, és a számolás szakaszonként (értékenként) fut.
+    import numpy as np
+
+    pow10 = 10 ** np.arange(19, dtype=np.int64)
+    n = len(values)
+    result = np.full(n, MISSING, np.int64)
+    try:
+        joined = "\0".join(values)
+    except TypeError:
+        joined = "\0".join(v if isinstance(v, str) else "\1" for v in values)
+    raw = np.frombuffer(joined.encode("utf-8") + b"\0\0\0", np.uint8)   # a végén túli olvasásokhoz
+    size = len(raw) - 3
+    raw, padded = raw[:size], raw
+    separators = np.flatnonzero(raw == 0)
+    if size and len(separators) == n - 1:
+        starts = np.concatenate(([0], separators + 1))
+        ends = np.concatenate((separators, [size]))
+        negative = padded[starts] == 45                         # "-"
+        first = starts + negative
+        first += padded[first] == 36                            # "$"
+        first += padded[first] == 32                            # " "
+        has_dot = (ends - first >= 4) & (padded[np.maximum(ends - 3, 0)] == 46)
+        dot_at = np.where(has_dot, ends - 3, -1)
+
+        segment = np.repeat(np.arange(n), ends - starts + 1)[:size]
+        # A számjegyek helye: [first, ends) az előtag után, a tizedespont nélkül
+        marks = np.zeros(size + 1, np.int8)
+        marks[first] = 1
+        marks[ends] -= 1
+        inside = np.cumsum(marks[:size], dtype=np.int8).view(bool)
+        inside[dot_at[has_dot]] = False
+        is_digit = raw - np.uint8(48) < 10
+        digit = inside & is_digit
+        bad = np.bincount(segment[inside & ~is_digit], minlength=n) > 0
+        digits = np.bincount(segment[digit], minlength=n)
+        # Helyiérték: a szakaszban tőle jobbra álló számjegyek száma
+        seen = np.cumsum(digit, dtype=np.int32)
+        right = seen[np.maximum(ends - 1, 0)][segment] - seen
+        place = np.where(digit, (raw - np.uint8(48)) * pow10[np.minimum(right, 18)], 0)
+        # Legfeljebb 15 jegy: a float64 összeg még pontos
+        value = np.bincount(segment, weights=place, minlength=n).astype(np.int64)
+        value = np.where(has_dot, value, value * 100)
+        ok = ~bad & (digits > 0) & (digits <= 15) & (~has_dot | (dot_at > first))
+        result[ok] = np.where(negative, -value, value)[ok]
+    else:
+        ok = np.zeros(n, bool)
+    for i in np.flatnonzero(~ok).tolist():
+        value = parse_money(values[i])
+        if value is not None:
+            result[i] = value
+    return result
+
+
+def parse_money_array(values, chunk=1 << 18):
+    """``parse_money`` egy listára, ``int64`` tömbként (MISSING: nem értelmezhető).
+
+    A ``[-][$][ ]1234[.56]`` alakot NumPy-ban értelmezi, a többit (ezres
+    elválasztó, forint, hibás érték) egyenként a ``parse_money``.
+    """
+    import numpy as np
+
+    result = np.empty(len(values), np.int64)
+    for start in range(0, len(values), chunk):
+        part = values[start:start + chunk]
+        result[start:start + len(part)] = _parse_chunk(part)
+    return result
+
+
+def _column(rows, col):
+    try:
+        return list(map(itemgetter(col), rows))
+    except IndexError:
+        return [row[col] if col < len(row) else None for row in rows]
+
+
+@dataclass
+class MoneyBatch:
+    """Egy köteg számla összegei tömbökben; a tételek sorfolytonosan, ``offsets`` szerint."""
+    template: str
+    offsets: "np.ndarray"           # (n + 1,) a számlák első tételének indexe
+    price: "np.ndarray"             # tételenként, századokban (MISSING: nem értelmezhető)
+    qty: "np.ndarray"
+    line: "np.ndarray"
+    subtotal: "np.ndarray"          # számlánként
+    tax: "np.ndarray"               # adó összeg, százalékos sablonnál MISSING
+    tax_rate: "np.ndarray"          # bázispont, ha ismert, különben MISSING
+    total: "np.ndarray"
+
+    def __len__(self):
+        return len(self.subtotal)
+
+    @classmethod
+    def from_invoices(cls, template, invoices):
+        import numpy as np
+
+        schema = _schema(template)
+        invoices = invoices if isinstance(invoices, list) else list(invoices)
+        n = len(invoices)
+        items = [data.get("items", ()) for data in invoices]
+        offsets = np.zeros(n + 1, np.int64)
+        np.cumsum(np.fromiter(map(len, items), np.int64, count=n), out=offsets[1:])
+        rows = list(itertools.chain.from_iterable(items))
+        price, qty, line = (parse_money_array(_column(rows, c)) for c in (schema.price_col, schema.qty_col,
+                                                                           schema.line_col))
+        if schema.tax_percent:
+            rates = (parse_percent(data.get(schema.tax, "")) for data in invoices)
+            tax_rate = np.fromiter((MISSING if r is None else r for r in rates), np.int64, count=n)
+            tax = np.full(n, MISSING, np.int64)
+        else:
+            tax = parse_money_array([data.get(schema.tax) for data in invoices])
+            tax_rate = np.full(n, MISSING if schema.tax_rate is None else schema.tax_rate, np.int64)
+        return cls(template, offsets, price, qty, line,
+                   parse_money_array([data.get(schema.subtotal) for data in invoices]), tax, tax_rate,
+                   parse_money_array([data.get(schema.total) for data in invoices]))
+
+    def _per_invoice(self, values):
+        """Tételenkénti értékek összege számlánként (kumulált összeg különbségével)."""
+        import numpy as np
+
+        sums = np.zeros(len(values) + 1, np.int64)
+        np.cumsum(values, out=sums[1:])
+        return sums[self.offsets[1:]] - sums[self.offsets[:-1]]
+
+    def computed(self):
+        """A tételekből számolt értékek: ``(sorösszegek, részösszeg, adó, végösszeg)``.
+
+        A részösszeg a kiírt sorösszegekből számol (azt látja az olvasó); ahol egy
+        sorösszeg nem értelmezhető, a részösszeg és a ráépülő értékek MISSING-ek.
+        """
+        import numpy as np
+
+        valid = (self.price != MISSING) & (self.qty != MISSING)
+        lines = np.where(valid, line_total(np.where(valid, self.price, 0), np.where(valid, self.qty, 0)), MISSING)
+        line_ok = self.line != MISSING
+        subtotal = self._per_invoice(np.where(line_ok, self.line, 0))
+        broken = self._per_invoice(~line_ok) > 0
+        subtotal[broken] = MISSING
+        known = (self.tax_rate != MISSING) & ~broken
+        tax = np.where(known, apply_rate(np.where(known, subtotal, 0), np.where(known, self.tax_rate, 0)), self.tax)
+        # Szabad adó összegnél (rate nélkül) a kiírt adót adjuk a részösszeghez
+        total_ok = ~broken & (tax != MISSING)
+        total = np.where(total_ok, np.where(total_ok, subtotal, 0) + np.where(total_ok, tax, 0), MISSING)
+        return lines, subtotal, tax, total
+
+
+@dataclass
+class CheckReport:
+    template: str
+    flags: "np.ndarray"             # számlánként az ``ISSUES`` bitjei
+    line_flags: "np.ndarray" = field(repr=False, default=None)     # tételenként: hibás sorösszeg
+
+    def __len__(self):
+        return len(self.flags)
+
+    @property
+    def inconsistent(self):
+        """A hibás számlák indexei."""
+        return self.flags.nonzero()[0]
+
+    def counts(self):
+        return {name: int((self.flags & bit).astype(bool).sum()) for bit, name in ISSUES.items()}
+
+    def issues(self, index):
+        return [name for bit, name in ISSUES.items() if self.flags[index] & bit]
+
+
+def check(template, invoices, tolerance=0):
+    """Számlák (dict lista vagy ``MoneyBatch``) ellenőrzése; ``tolerance`` centben."""
+    import numpy as np
+
+    batch = invoices if isinstance(invoices, MoneyBatch) else MoneyBatch.from_invoices(template, invoices)
+    schema = _schema(batch.template)
+    lines, subtotal, tax, total = batch.computed()
+
+    def differs(stated, computed):
+        both = (stated != MISSING) & (computed != MISSING)
+        return both & (np.abs(np.where(both, stated - computed, 0)) > tolerance)
+
+    line_bad = differs(batch.line, lines)
+    flags = np.zeros(len(batch), np.int64)
+    unparseable = (batch.price == MISSING) | (batch.qty == MISSING) | (batch.line == MISSING)
+    flags[batch._per_invoice(unparseable) > 0] |= UNPARSEABLE
+    for values in (batch.subtotal, batch.total, batch.tax_rate if schema.tax_percent else batch.tax):
+        flags[values == MISSING] |= UNPARSEABLE
+    flags[batch._per_invoice(line_bad) > 0] |= LINE
+    flags[differs(batch.subtotal, subtotal)] |= SUBTOTAL
+    if not schema.tax_percent:
+        flags[differs(batch.tax, tax)] |= TAX
+    flags[differs(batch.total, total)] |= TOTAL
+    return CheckReport(batch.template, flags, line_bad)
+
+
+def inject(template, invoices, share=0.05, seed=0, fields=("line", "subtotal", "tax", "total")):
+    """``share`` arányban egy-egy összeg elrontása (helyben, 1..999 cent eltolással).
+
+    A ``(számla index, mező)`` listát adja vissza; az adó csak összeg alapú
+    adónál (nem százaléknál) kerül sorra.
+    """
+    schema = _schema(template)
+    rng = random.Random(seed)
+    choices = [f for f in fields if not (f == "tax" and schema.tax_percent)]
+    injected = []
+    for index, data in enumerate(invoices):
+        if rng.random() >= share:
+            continue
+        kind = rng.choice(choices)
+        if kind == "line" and not data.get("items"):
+            kind = "total"
+        delta = rng.randint(1, 999) * rng.choice((-1, 1))
+        if kind == "line":
+            row = rng.choice(data["items"])
+            value = parse_money(row[schema.line_col])
+            if value is None:
+                continue
+            row[schema.line_col] = format_money(value + delta, schema.amount_format)
+        else:
+            key = getattr(schema, kind)
+            value = parse_money(data.get(key))
+            if value is None:
+                continue
+            data[key] = format_money(value + delta, schema.amount_format)
+        injected.append((index, kind))
+    return injected
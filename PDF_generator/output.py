@@ -0,0 +1,140 @@
+"""A kész dokumentum szerializálása, kimeneti profilokkal.
+
+A profil a PDF méret és a generálási idő közti választás:
+
+- ``default``: az fpdf alapértékei (oldal tartalom tömörítve, zlib 6. szint),
+- ``fast``: az oldal tartalom tömörítetlen; a mindig tömörített streameket
+  (fontok, CIDToGIDMap, CIDSet) az fpdf szintjén hagyjuk, mert az alacsonyabb
+  szintű újratömörítés több bájt, és időt sem takarít meg,
+- ``small``: zlib 9. szint, és a fontok hinting nélkül (``fpgm``, ``prep``,
+  ``cvt`` táblák és glif utasítások nélkül) kerülnek a subsetbe.
+
+A fontokat az fpdf mindig a használt glifekre subseteli, így a ``small``
+profil a subset tartalmát csökkenti tovább. A háttér rétegek előre tömörítve
+kerülnek a dokumentumba (lásd ``background``), azokat a profil nem érinti.
+
+A zlib szint dokumentumonként érvényes: az fpdf osztály szintű beállítását
+(``PDFContentStream._COMPRESSION_LEVEL``) nem írjuk át, hanem a kiírás saját
+kimenet előállítója (``LevelOutputProducer``) tömöríti újra a streameket, csak
+ha a profil szintje eltér az fpdf-étől. Más, ugyanebben a folyamatban futó fpdf
+kód így változatlanul működik.
+
+Az aktív profil szál-lokális, mint a ``profiling`` mérése::
+
+    with output_profile("small"):
+        create_simple_invoice("x.pdf", data)
+"""
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import partial
+import threading
+import zlib
+
+from fpdf.output import OutputProducer, PDFXObject
+from fpdf.syntax import PDFContentStream
+
+from . import compat  # belső fpdf részeket használ: verzió ellenőrzés
+from .profiling import phase
+
+
+@dataclass(frozen=True)
+class OutputProfile:
+    name: str
+    # Az oldal tartalom tömörítése (a font streameket az fpdf mindig tömöríti)
+    compress: bool = True
+    # zlib szint a tömörített streamekhez (-1: a zlib alapértéke, 6)
+    level: int = -1
+    # False: a fontok hinting nélkül (kisebb font stream, képernyőn kevésbé éles kis méretben)
+    hinting: bool = True
+
+
+PROFILES = {
+    "default": OutputProfile("default"),
+    "fast": OutputProfile("fast", compress=False),
+    "small": OutputProfile("small", level=9, hinting=False),
+}
+
+_local = threading.local()
+
+
+class PrecompressedStream(PDFContentStream):
+    """Már tömörített tartalmú stream (háttér rétegek); a kimeneti profil szintje nem érinti."""
+
+
+class LevelOutputProducer(OutputProducer):
+    """Az fpdf kimenet előállítója egy dokumentum saját zlib szintjével.
+
+    Az fpdf a streameket létrehozáskor az osztály szintű alapértékkel tömöríti. A
+    dokumentum objektumainak felvételekor (``_add_pdf_obj``) az így tömörített
+    streameket kicsomagoljuk és ``level`` szinten újratömörítjük; a képeket és az
+    előre tömörített streameket (``PrecompressedStream``) nem. A kiírás idejét a
+    font subset adja, a második tömörítés ehhez képest elhanyagolható.
+    """
+
+    def __init__(self, fpdf, level):
+        super().__init__(fpdf)
+        self.level = level
+
+    def _add_pdf_obj(self, pdf_obj, trace_label=None):
+        if (isinstance(pdf_obj, PDFContentStream) and pdf_obj.filter == "FlateDecode"
+                and not isinstance(pdf_obj, (PDFXObject, PrecompressedStream))):
+            pdf_obj._contents = zlib.compress(zlib.decompress(pdf_obj._contents), self.level)
+            pdf_obj.length = len(pdf_obj._contents)
+        return super()._add_pdf_obj(pdf_obj, trace_label)
+
+
+def get_profile(profile):
+    """A profil név (vagy ``OutputProfile``) feloldása."""
+    if isinstance(profile, OutputProfile):
+        return profile
+    try:
+        return PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"Ismeretlen kimeneti profil: {profile!r} (választható: {', '.join(PROFILES)})") from None
+
+
+def current_profile():
+    """Az aktuális szálon érvényes kimeneti profil (alapból ``default``)."""
+    return getattr(_local, "profile", PROFILES["default"])
+
+
+@contextmanager
+def output_profile(profile):
+    """A blokkban létrehozott és kiírt dokumentumok kimeneti profilja; az ``OutputProfile``-t adja."""
+    profile = get_profile(profile)
+    previous = current_profile()
+    _local.profile = profile
+    try:
+        yield profile
+    finally:
+        _local.profile = previous
+
+
+def _serialize(pdf, profile):
+    pdf.set_compression(profile.compress)
+    if profile.level == PDFContentStream._COMPRESSION_LEVEL:
+        return pdf.output()
+    return pdf.output(output_producer_class=partial(LevelOutputProducer, level=profile.level))
+
+
+def write_pdf(pdf, out=None):
+    """A kész dokumentum szerializálása fájl nélkül, az aktuális kimeneti profillal.
+
+    - ``out=None``: a PDF ``bytes``-ként tér vissza
+    - írható bináris stream (``write()`` metódussal): beleírjuk, a kiírt bájtok számát adja vissza
+    - ``memoryview`` / ``bytearray``: az elejére másoljuk, a kiírt bájtok számát adja vissza
+    """
+    with phase("output"):
+        buf = _serialize(pdf, current_profile())
+        if out is None:
+            return bytes(buf)
+        if isinstance(out, (memoryview, bytearray)):
+            view = memoryview(out).cast("B")
+            if view.readonly:
+                raise ValueError("A megadott memoryview csak olvasható")
+            if len(buf) > len(view):
+                raise ValueError(f"A puffer túl kicsi: {len(view)} bájt, a PDF {len(buf)} bájt")
+            view[:len(buf)] = buf
+            return len(buf)
+        out.write(buf)
+        return len(buf)
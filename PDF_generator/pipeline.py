@@ -0,0 +1,247 @@
+"""Renderelés és feltöltés egy asyncio pipeline-ban, korlátos párhuzamossággal.
+
+A számlák renderelése (CPU) process poolban fut, a kész PDF-ek egy korlátos
+sorba kerülnek, ahonnan ``concurrency`` darab feltöltő viszi őket a
+``submitter``-nek (pl. ``HttpSubmitter`` a kinyerési szolgáltatás felé).
+
+Visszanyomás (backpressure): ha a feltöltés lassabb, a sor megtelik, a
+renderelők nem tudnak újabb PDF-et lerakni, így új renderelés sem indul.
+Egyszerre legfeljebb ``render_ahead`` renderelés fut és ``max_queued`` kész
+PDF vár, a memóriahasználat a jobok számától független.
+
+A feltöltő tetszőleges objektum lehet egy ``async submit(item)`` metódussal;
+ha ``SubmitError``-t dob ``retryable=True``-val (vagy hálózati hibát,
+időtúllépést), a pipeline exponenciális várakozással újrapróbálja.
+
+Használat::
+
+    async with standin.serve() as server:
+        report = await run_pipeline(jobs, HttpSubmitter(server.url))
+
+Parancssorból: ``python -m PDF_generator submit general -n 1000`` (``--url`` nélkül
+egy helyi stand-in szolgáltatás indul, lásd ``standin``).
+"""
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+import json
+import os
+import random
+import time
+from urllib.parse import quote, urlsplit
+
+from .batch import _normalize_job
+from .templates import resolve_renderer
+
+
+class SubmitError(Exception):
+    """Sikertelen feltöltés; ``retryable=True`` esetén érdemes újrapróbálni."""
+
+    def __init__(self, message, retryable=False):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+@dataclass
+class RenderedInvoice:
+    index: int
+    template: str
+    filename: str
+    pdf: bytes
+
+
+@dataclass
+class SubmitResult:
+    index: int
+    template: str
+    filename: str
+    ok: bool
+    attempts: int
+    seconds: float          # renderelés kezdetétől a sikeres / végleges hibás feltöltésig
+    response: object = None
+    error: str = ""
+    # Az on_result kivétele (a feltöltés sikerét nem érinti)
+    callback_error: str = ""
+
+
+@dataclass
+class PipelineReport:
+    results: list = field(default_factory=list)
+    wall_seconds: float = 0.0
+    uploaded_bytes: int = 0
+
+    @property
+    def failed(self):
+        return [r for r in self.results if not r.ok]
+
+    @property
+    def callback_failed(self):
+        """Az eredmények, amelyeknél az ``on_result`` kivételt dobott."""
+        return [r for r in self.results if r.callback_error]
+
+    @property
+    def invoices_per_second(self):
+        if self.wall_seconds <= 0:
+            return 0.0
+        return len(self.results) / self.wall_seconds
+
+
+def _render(template, data):
+    # A worker folyamatban fut
+    return resolve_renderer(template)(data)
+
+
+class HttpSubmitter:
+    """A PDF feltöltése HTTP POST-tal (``application/pdf`` törzs), a válasz JSON.
+
+    A szabványos könyvtár asyncio streamjeire épül, kérésenként új kapcsolattal;
+    az 5xx, 429 válasz és a hálózati hiba újrapróbálható, a többi 4xx nem. A
+    fájlnév az ``X-Filename`` fejlécben százalékos kódolással (UTF-8) megy.
+    """
+
+    def __init__(self, url, timeout=30.0):
+        parts = urlsplit(url)
+        if parts.scheme != "http":
+            raise ValueError(f"Csak http:// URL támogatott: {url!r}")
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.path = parts.path or "/"
+        self.timeout = timeout
+
+    async def submit(self, item):
+        try:
+            return await asyncio.wait_for(self._post(item), self.timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as exc:
+            raise SubmitError(f"{type(exc).__name__}: {exc}", retryable=True) from exc
+
+    async def _post(self, item):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            head = (f"POST {self.path} HTTP/1.1\r\n"
+                    f"Host: {self.host}:{self.port}\r\n"
+                    f"Content-Type: application/pdf\r\n"
+                    f"Content-Length: {len(item.pdf)}\r\n"
+                    f"X-Filename: {quote(item.filename)}\r\n"
+                    f"X-Template: {item.template}\r\n"
+                    f"Connection: close\r\n\r\n")
+            writer.write(head.encode("latin-1"))
+            writer.write(item.pdf)
+            await writer.drain()
+            status, headers = await _read_head(reader)
+            length = int(headers.get("content-length", 0))
+            body = await reader.readexactly(length) if length else await reader.read()
+        finally:
+            writer.close()
+        if status >= 500 or status == 429:
+            raise SubmitError(f"HTTP {status}", retryable=True)
+        if status >= 400:
+            raise SubmitError(f"HTTP {status}: {body[:200].decode('utf-8', 'replace')}")
+        return json.loads(body) if body else None
+
+
+async def _read_head(reader):
+    status_line = await reader.readline()
+    try:
+        status = int(status_line.split()[1])
+    except (IndexError, ValueError):
+        raise SubmitError(f"Hibás HTTP válasz: {status_line[:80]!r}", retryable=True) from None
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            return status, headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+
+async def _submit_with_retries(submitter, item, retries, backoff):
+    """``(ok, kísérletek, válasz, hiba)``; újrapróbálás exponenciális várakozással és jitterrel."""
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            return True, attempt, await submitter.submit(item), ""
+        except SubmitError as exc:
+            if not exc.retryable or attempt > retries:
+                return False, attempt, None, str(exc)
+        except Exception as exc:
+            return False, attempt, None, f"{type(exc).__name__}: {exc}"
+        await asyncio.sleep(backoff * 2 ** (attempt - 1) * (0.5 + random.random()))
+
+
+async def run_pipeline(jobs, submitter, workers=None, concurrency=8, render_ahead=None, max_queued=None,
+                       retries=3, backoff=0.2, on_result=None):
+    """Jobok renderelése és feltöltése; összesítő riportot ad vissza.
+
+    - ``jobs``: ``(template, data)`` vagy ``(template, data, filename)``, akár végtelen iterátor,
+    - ``workers``: renderelő folyamatok száma (alapból a CPU magok száma),
+    - ``concurrency``: egyszerre futó feltöltések száma,
+    - ``render_ahead``: egyszerre futó renderelések (alapból ``workers * 2``),
+    - ``max_queued``: feltöltésre váró kész PDF-ek (alapból ``concurrency``),
+    - ``on_result``: minden ``SubmitResult``-ra meghívva (pl. naplózás, haladás); ha kivételt
+      dob, a kivétel az eredmény ``callback_error`` mezőjébe kerül (az ``ok`` marad, lásd
+      ``PipelineReport.callback_failed``), a pipeline tovább fut.
+    """
+    workers = workers or os.cpu_count() or 1
+    render_ahead = render_ahead or workers * 2
+    max_queued = max_queued or concurrency
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=max_queued)
+    slots = asyncio.Semaphore(render_ahead)
+    report = PipelineReport()
+    started = {}
+
+    def finish(result):
+        report.results.append(result)
+        if on_result is None:
+            return
+        try:
+            on_result(result)
+        except Exception as exc:
+            # A feltöltő taszk nem állhat le: a sor különben nem ürülne ki, és a renderelők várnának
+            result.callback_error = f"{type(exc).__name__}: {exc}"
+
+    async def render_one(pool, index, template, data, filename):
+        try:
+            pdf = await loop.run_in_executor(pool, _render, template, data)
+        except Exception as exc:
+            finish(SubmitResult(index, template, filename, False, 0, time.perf_counter() - started.pop(index),
+                                error=f"{type(exc).__name__}: {exc}"))
+        else:
+            # Tele sornál itt várunk: a slot foglalt marad, így új renderelés sem indul
+            await queue.put(RenderedInvoice(index, template, filename, pdf))
+        finally:
+            slots.release()
+
+    async def upload():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            ok, attempts, response, error = await _submit_with_retries(submitter, item, retries, backoff)
+            if ok:
+                report.uploaded_bytes += len(item.pdf)
+            finish(SubmitResult(item.index, item.template, item.filename, ok, attempts,
+                                time.perf_counter() - started.pop(item.index), response, error))
+
+    start = time.perf_counter()
+    uploaders = [asyncio.create_task(upload()) for _ in range(concurrency)]
+    renders = set()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for index, job in enumerate(jobs):
+                index, template, data, filename = _normalize_job(index, job)
+                await slots.acquire()
+                started[index] = time.perf_counter()
+                task = asyncio.create_task(render_one(pool, index, template, data, filename))
+                renders.add(task)
+                task.add_done_callback(renders.discard)
+            await asyncio.gather(*renders)
+        for _ in uploaders:
+            await queue.put(None)
+        await asyncio.gather(*uploaders)
+    finally:
+        for task in uploaders:
+            task.cancel()
+    report.wall_seconds = time.perf_counter() - start
+    return report
@@ -0,0 +1,78 @@
+"""Pooled renderelés hosszú batch futásokhoz: előkészített váz, olcsó takarítás számlák között.
+
+Egy worker első számlája előtt (``prepare``) minden sablonból lerenderelünk
+egy demo számlát: így betöltődnek a folyamaton belül újrahasznosított részek
+(a fontok feldolgozott prototípusai, a lefordított elrendezési tervek, az
+előre tömörített háttér rétegek, a fontTools táblák moduljai). Ezután ezeket
+a hosszú életű objektumokat kivesszük a ciklikus GC hatóköréből
+(``gc.freeze``), és a legfiatalabb generáció küszöbét megemeljük.
+
+Számlák között (``after_document``) a fiatal generációkat magunk gyűjtjük
+be: a fontTools subset minden dokumentumnál néhány ezer ciklikus objektumot
+hagy hátra, ezek így nem a következő számla renderelése közben, hanem a két
+számla között szabadulnak fel, a memória pedig nem gyűlik fel a teljes
+gyűjtésig.
+
+Maga az fpdf dokumentum nem újrahasznosítható: a dokumentumhoz kötött
+állapot (fontonként a subset és a kimenetkor helyben subsetelt ``TTFont``,
+az erőforrás katalógus, az oldalak) sok objektumban szétszórva él, és egy
+pillanatkép visszaállítása (deepcopy) mérten kb. hétszer lassabb, mint a
+dokumentum létrehozása a már előkészített részekből (~0,5 ms).
+
+A folyamaton belüli cache-ek korlátosak (``table.WIDTHS`` fontonként és
+méretenként, a ``money`` formázó / értelmező cache-ei), így az RSS az első
+néhány ezer számla alatt nő, utána beáll. Kemény felső korlátot a process
+pool worker újraindítása ad (``batch.BatchConfig(max_chunks_per_worker=...)``);
+a stabilitást a ``benchmarks.soak`` ellenőrzi.
+"""
+import gc
+import threading
+
+from .templates import TEMPLATES, resolve_renderer, template_module
+
+# A legfiatalabb generáció küszöbe pooled módban (alapból 700 allokáció)
+GC_THRESHOLD = (20_000, 20, 100)
+# Ennyi számlánként gyűjtjük be a fiatal generációkat
+COLLECT_EVERY = 1
+
+_prepared = False
+_documents = 0
+# A prepare folyamat szintű állapotot állít (GC); egyszerre csak egy hívás fut
+_lock = threading.Lock()
+
+
+def prepare(templates=None, threshold=GC_THRESHOLD):
+    """A worker előkészítése (folyamatonként egyszer hat): bemelegítés, ``gc.freeze``, GC küszöb.
+
+    A GC beállítások a folyamat egészére hatnak: a pooled mód process pool
+    workereknek való (a ``batch.BatchConfig`` szálakkal nem engedi).
+    """
+    global _prepared
+    with _lock:
+        if _prepared:
+            return
+        for template in templates or list(TEMPLATES):
+            data = template_module(template).DEMO_INVOICES[0][1]
+            resolve_renderer(template)(data)
+        gc.collect()
+        gc.freeze()
+        gc.set_threshold(*threshold)
+        _prepared = True
+
+
+def after_document():
+    """Két számla között hívandó: a fiatal generációk begyűjtése ``COLLECT_EVERY`` számlánként."""
+    global _documents
+    _documents += 1
+    if _documents % COLLECT_EVERY == 0:
+        gc.collect(1)
+
+
+def render(template, data, out=None):
+    """Mint a ``render_*_invoice``, előkészített workerben, utána takarítással."""
+    prepare()
+    try:
+        return resolve_renderer(template)(data, out)
+    finally:
+        after_document()
+
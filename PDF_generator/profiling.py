@@ -0,0 +1,173 @@
+"""Fázisonkénti időmérés a számla generáláshoz.
+
+Egy számla fázisai: ``fonts`` (dokumentum, fontok, háttér), ``header`` (a terv
+táblázat előtti része), ``table`` (tételek), ``totals`` (a táblázat utáni rész)
+és ``output`` (szerializálás és írás). Fázisonként a falióra időt, a CPU időt
+(a hívó szálé) és opcionálisan a csúcs memóriát (tracemalloc) mérjük.
+
+Használat::
+
+    sink = MemorySink()
+    with profile("simple", sink=sink):
+        create_simple_invoice("x.pdf", data)
+    print(format_summary(sink.summary()))
+
+Kikapcsolt állapotban (nincs aktív ``profile``) a mérési pontok egy
+szál-lokális attribútum olvasásába kerülnek, a ``render_plan`` lépésenkénti
+ciklusát nem érintik.
+"""
+from contextlib import contextmanager, nullcontext
+import json
+import threading
+import time
+import tracemalloc
+
+PHASES = ("fonts", "header", "table", "totals", "output")
+PERCENTILES = (50, 95, 99)
+
+_local = threading.local()
+_NULL = nullcontext()
+
+
+def current():
+    """Az aktuális szálon futó mérés (``PhaseTimer``), vagy None."""
+    return getattr(_local, "timer", None)
+
+
+def phase(name):
+    """Context manager egy fázis méréséhez; mérés nélkül egy megosztott no-op."""
+    timer = getattr(_local, "timer", None)
+    return _NULL if timer is None else timer.phase(name)
+
+
+class PhaseTimer:
+    """Egy számla fázisainak mérése; egyszerre egy fázis fut, az ismétlődők összeadódnak."""
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.phases = {}
+        self._name = None
+
+    def start(self, name):
+        self.stop()
+        self._name = name
+        if self.memory:
+            tracemalloc.reset_peak()
+            self._mem = tracemalloc.get_traced_memory()[0]
+        self._cpu = time.thread_time()
+        self._wall = time.perf_counter()
+
+    def stop(self):
+        if self._name is None:
+            return
+        wall = time.perf_counter() - self._wall
+        cpu = time.thread_time() - self._cpu
+        stats = self.phases.setdefault(self._name, {"wall": 0.0, "cpu": 0.0})
+        stats["wall"] += wall
+        stats["cpu"] += cpu
+        if self.memory:
+            peak = tracemalloc.get_traced_memory()[1] - self._mem
+            stats["peak"] = max(stats.get("peak", 0), peak)
+        self._name = None
+
+    @contextmanager
+    def phase(self, name):
+        self.start(name)
+        try:
+            yield
+        finally:
+            self.stop()
+
+
+@contextmanager
+def profile(template, label="", sink=None, memory=False):
+    """Egy számla mérése: a blokkban futó generálás fázisai a ``sink``-be kerülnek.
+
+    ``memory=True`` esetén a tracemalloc is fut, ez a mért időket jelentősen megnöveli.
+    """
+    timer = PhaseTimer(memory)
+    started = memory and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    previous = current()
+    _local.timer = timer
+    wall = time.perf_counter()
+    cpu = time.thread_time()
+    record = {"template": template, "label": label}
+    try:
+        yield record
+    finally:
+        timer.stop()
+        _local.timer = previous
+        if started:
+            tracemalloc.stop()
+        record["wall"] = time.perf_counter() - wall
+        record["cpu"] = time.thread_time() - cpu
+        record["phases"] = timer.phases
+        if memory:
+            record["peak"] = max((stats.get("peak", 0) for stats in timer.phases.values()), default=0)
+        if sink is not None:
+            sink.emit(record)
+
+
+class MemorySink:
+    """A rekordok gyűjtése a memóriában, percentilis összesítővel."""
+
+    def __init__(self):
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+    def close(self):
+        pass
+
+    def summary(self, percentiles=PERCENTILES):
+        """``{fázis: {metrika: {"p50": ..., ...}}}``, a ``total`` sor a teljes számlára."""
+        values = {}
+        for record in self.records:
+            for name, stats in record["phases"].items():
+                for metric, value in stats.items():
+                    values.setdefault(name, {}).setdefault(metric, []).append(value)
+            for metric in ("wall", "cpu", "peak"):
+                if metric in record:
+                    values.setdefault("total", {}).setdefault(metric, []).append(record[metric])
+        order = [name for name in PHASES if name in values] + sorted(set(values) - set(PHASES))
+        return {name: {metric: percentile_summary(samples, percentiles) for metric, samples in values[name].items()}
+                for name in order}
+
+
+class JsonlSink:
+    """Rekordonként egy JSON sor egy fájlba (pl. későbbi összevetéshez)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+
+    def emit(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def close(self):
+        self._file.close()
+
+
+def percentile_summary(samples, percentiles=PERCENTILES):
+    """A minta megadott percentilisei ``{"p50": ..., ...}`` formában."""
+    # Legközelebbi rang módszer, kis mintán is értelmes
+    ordered = sorted(samples)
+    n = len(ordered)
+    return {f"p{p}": ordered[min(n - 1, max(0, -(-p * n // 100) - 1))] for p in percentiles}
+
+
+def format_summary(summary):
+    """Olvasható táblázat a ``MemorySink.summary()`` eredményéből (ms, KiB)."""
+    lines = [f"{'fázis':<8} {'wall p50/p95/p99 ms':>24} {'cpu p50/p95/p99 ms':>24} {'peak p50/p95/p99 KiB':>24}"]
+    for name, metrics in summary.items():
+        cols = []
+        for metric, scale in (("wall", 1000), ("cpu", 1000), ("peak", 1 / 1024)):
+            if metric in metrics:
+                cols.append("/".join(f"{v * scale:.1f}" for v in metrics[metric].values()))
+            else:
+                cols.append("-")
+        lines.append(f"{name:<8} {cols[0]:>24} {cols[1]:>24} {cols[2]:>24}")
+    return "\n".join(lines)
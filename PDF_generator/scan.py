@@ -0,0 +1,296 @@
+"""Szkennelt dokumentum szimuláció az alacsony konfidenciájú kinyerési tesztekhez.
+
+A generált (vektoros) PDF oldalait szürkeárnyalatos képpé raszterizáljuk, majd
+oldalanként véletlen (de seedelt) paraméterekkel rontjuk:
+
+- ferde behúzás: már a raszterizálás forgatja el az oldalt (pontos és ingyenes,
+  a képen végzett interpolációnál többszörösen gyorsabb),
+- halványuló toner (oldalanként más erősségű, térben egyenetlen),
+- életlenség (Gauss elmosás),
+- só-bors zaj,
+- JPEG tömörítési hibák.
+
+A rontások egész oldal kötegeken (``(N, H, W)`` NumPy tömb) futnak, nem
+pixelenként; csak a JPEG kódolás oldalankénti (Pillow). A véletlen értékek
+oldalanként a ``(seed, dokumentum index, oldalszám)`` hármasból jönnek, így az
+eredmény a kötegmérettől független (az elmosás kernele oldalanként a saját
+szigmájának háromszorosáig terjed, a köteg szélesebb ablakában nulla
+súlyokkal). Kimenet: csak képet tartalmazó PDF (a JPEG adat újrakódolás
+nélkül kerül bele), oldalanként PNG, vagy többoldalas TIFF.
+
+Függőségek: ``numpy``, ``pymupdf`` (raszterizálás, PDF írás), ``Pillow``.
+
+Használat: ``python -m PDF_generator scan [PDF ...] --preset heavy --format pdf``.
+"""
+from dataclasses import dataclass, field, replace
+import io
+import os
+import time
+
+import numpy as np
+import pymupdf
+from PIL import Image
+
+FORMATS = ("pdf", "png", "tiff")
+
+
+@dataclass(frozen=True)
+class ScanConfig:
+    dpi: int = 150
+    # Tartományok: oldalanként egyenletes eloszlásból húzzuk az értéket
+    skew: float = 1.5                   # legfeljebb ennyi fok ferdeség (mindkét irányba)
+    blur: tuple = (0.0, 1.0)            # Gauss szigma pixelben
+    jpeg_quality: tuple = (40, 85)      # None: nincs JPEG (veszteségmentes kimenet)
+    salt_pepper: tuple = (0.0, 0.002)   # a zajos pixelek aránya
+    fade: tuple = (0.0, 0.35)           # toner halványodás (0: nincs, 1: eltűnik)
+    fade_patchiness: float = 0.6        # a halványodás térbeli egyenetlensége (0..1)
+    fade_grid: tuple = (6, 4)           # az egyenetlenség rácsa (függőleges, vízszintes)
+
+
+PRESETS = {
+    "light": ScanConfig(skew=0.5, blur=(0.0, 0.5), jpeg_quality=(70, 90), salt_pepper=(0.0, 0.0005),
+                        fade=(0.0, 0.15)),
+    "medium": ScanConfig(),
+    "heavy": ScanConfig(skew=3.0, blur=(0.8, 1.8), jpeg_quality=(15, 40), salt_pepper=(0.002, 0.01),
+                        fade=(0.3, 0.6)),
+}
+
+
+@dataclass
+class ScanReport:
+    documents: int = 0
+    pages: int = 0
+    seconds: float = 0.0
+    # Szakaszonként: rasterize, degrade, encode, write
+    stages: dict = field(default_factory=dict)
+
+    @property
+    def pages_per_second(self):
+        if self.seconds <= 0:
+            return 0.0
+        return self.pages / self.seconds
+
+
+# --- raszterizálás ---
+
+def rasterize(pdf, dpi=150, skew=None):
+    """A PDF oldalai szürkeárnyalatos ``uint8`` tömbökként és az oldalméretek (pt).
+
+    ``skew``: oldalszám -> fok függvény; az elforgatott oldalt az eredeti méretre
+    vágjuk (a lap közepe körül forog, a kilógó sarkok fehérek).
+    """
+    pages, sizes = [], []
+    zoom = dpi / 72
+    with pymupdf.open(stream=pdf, filetype="pdf") as doc:
+        for page_no, page in enumerate(doc):
+            matrix = pymupdf.Matrix(zoom, zoom)
+            target = (page.rect * matrix).irect
+            angle = skew(page_no) if skew is not None else 0
+            if angle:
+                matrix.prerotate(angle)
+            pix = page.get_pixmap(matrix=matrix, colorspace=pymupdf.csGRAY, alpha=False)
+            arr = np.frombuffer(pix.samples, np.uint8).reshape(pix.height, pix.stride)[:, :pix.width]
+            top = (pix.height - target.height) // 2
+            left = (pix.width - target.width) // 2
+            pages.append(arr[top:top + target.height, left:left + target.width].copy())
+            sizes.append((page.rect.width, page.rect.height))
+    return pages, sizes
+
+
+# --- rontások (N, H, W) kötegeken ---
+
+def page_params(rng, config):
+    """Egy oldal véletlen paraméterei."""
+    quality = None
+    if config.jpeg_quality is not None:
+        quality = int(rng.integers(config.jpeg_quality[0], config.jpeg_quality[1] + 1))
+    return {
+        "angle": rng.uniform(-config.skew, config.skew),
+        "blur": rng.uniform(*config.blur),
+        "salt_pepper": rng.uniform(*config.salt_pepper),
+        "fade": rng.uniform(*config.fade),
+        "fade_field": rng.random(config.fade_grid, dtype=np.float32),
+        "quality": quality,
+    }
+
+
+def _interp_matrix(size, grid):
+    """(size, grid) mátrix: a ``grid`` pontú rácsról lineáris interpoláció ``size`` pontra."""
+    pos = np.linspace(0, grid - 1, size, dtype=np.float32)
+    lo = np.minimum(pos.astype(np.int64), grid - 2)
+    frac = pos - lo
+    m = np.zeros((size, grid), np.float32)
+    rows = np.arange(size)
+    m[rows, lo] = 1 - frac
+    m[rows, lo + 1] = frac
+    return m
+
+
+def fade(stack, amounts, fields, patchiness):
+    """Toner halványodás: a sötétség oldalanként ``amount``, térben a ``fields`` rács szerint csökken."""
+    n, h, w = stack.shape
+    smooth = _interp_matrix(h, fields.shape[1]) @ fields @ _interp_matrix(w, fields.shape[2]).T
+    keep = 1 - amounts[:, None, None] * (1 - patchiness + patchiness * smooth)
+    # 255 - (255 - stack) * keep, helyben
+    np.subtract(255, stack, out=stack)
+    stack *= keep
+    return np.subtract(255, stack, out=stack)
+
+
+def blur(stack, sigmas):
+    """Szeparálható Gauss elmosás oldalanként eltérő szigmával (0: változatlan)."""
+    radius = int(np.ceil(3 * sigmas.max())) if len(sigmas) else 0
+    if radius == 0:
+        return stack
+    taps = np.arange(-radius, radius + 1, dtype=np.float32)
+    safe = np.maximum(sigmas, 1e-3).astype(np.float32)[:, None]
+    weights = np.exp(-0.5 * (taps[None, :] / safe) ** 2)
+    # Oldalanként a saját sugaráig: az eredmény nem függ a köteg többi oldalától
+    weights[np.abs(taps)[None, :] > np.ceil(3 * sigmas)[:, None]] = 0
+    weights /= weights.sum(axis=1, keepdims=True)
+    n, h, w = stack.shape
+    tmp = np.empty_like(stack)
+    for axis, size in ((1, h), (2, w)):
+        pad = [(0, 0), (0, 0), (0, 0)]
+        pad[axis] = (radius, radius)
+        padded = np.pad(stack, pad, mode="edge")
+
+        def window(k):
+            return padded[:, k:k + size, :] if axis == 1 else padded[:, :, k:k + size]
+
+        out = window(radius) * weights[:, radius, None, None]
+        # A kernel szimmetrikus: a ±k eltolásokat összeadva egy szorzás elég
+        for k in range(radius):
+            np.add(window(k), window(2 * radius - k), out=tmp)
+            tmp *= weights[:, k, None, None]
+            out += tmp
+        stack = out
+    return stack
+
+
+def salt_pepper(stack, shares, noise):
+    """Só-bors zaj: a ``noise`` egyenletes mezőből ``share / 2`` fehér és ugyanannyi fekete pixel."""
+    half = (shares / 2)[:, None, None]
+    stack[noise < half] = 255
+    stack[noise > 1 - half] = 0
+    return stack
+
+
+def degrade(pages, params, config):
+    """Azonos méretű oldalak rontása egy kötegben; ``uint8`` ``(N, H, W)`` tömböt ad."""
+    stack = np.stack(pages).astype(np.float32)
+
+    def column(name):
+        return np.array([p[name] for p in params], np.float32)
+
+    stack = fade(stack, column("fade"), np.stack([p["fade_field"] for p in params]), config.fade_patchiness)
+    stack = blur(stack, column("blur"))
+    stack = salt_pepper(stack, column("salt_pepper"), np.stack([p["noise"] for p in params]))
+    return np.clip(np.rint(stack), 0, 255).astype(np.uint8)
+
+
+# --- kódolás és kimenet ---
+
+def encode_page(page, quality):
+    """Egy oldal JPEG (``quality`` esetén) vagy PNG bájtjai, és a dekódolt kép."""
+    image = Image.fromarray(page, mode="L")
+    buf = io.BytesIO()
+    if quality is None:
+        image.save(buf, "PNG", optimize=False)
+        return buf.getvalue(), page
+    image.save(buf, "JPEG", quality=quality)
+    data = buf.getvalue()
+    return data, np.asarray(Image.open(io.BytesIO(data)))
+
+
+def write_document(path, fmt, encoded, images, sizes, dpi):
+    """Egy dokumentum kiírása; ``encoded`` az oldalak JPEG/PNG bájtjai, ``images`` a pixeleik."""
+    if fmt == "pdf":
+        with pymupdf.open() as doc:
+            for data, (width, height) in zip(encoded, sizes):
+                page = doc.new_page(width=width, height=height)
+                page.insert_image(page.rect, stream=data)
+            doc.save(path, garbage=0, deflate=False)
+        return [path]
+    if fmt == "tiff":
+        first, *rest = [Image.fromarray(image, mode="L") for image in images]
+        first.save(path, "TIFF", save_all=True, append_images=rest, compression="tiff_deflate",
+                   dpi=(dpi, dpi))
+        return [path]
+    root, _ = os.path.splitext(path)
+    paths = []
+    for page_no, image in enumerate(images, 1):
+        page_path = f"{root}_p{page_no}.png"
+        Image.fromarray(image, mode="L").save(page_path, "PNG", dpi=(dpi, dpi))
+        paths.append(page_path)
+    return paths
+
+
+def scan_documents(documents, out_dir, config=None, fmt="pdf", seed=0, batch_pages=4):
+    """``(név, pdf_bytes)`` párok szimulált szkennelése az ``out_dir`` mappába.
+
+    A dokumentumokat addig gyűjtjük, amíg legalább ``batch_pages`` oldal össze nem
+    jön; az azonos méretű oldalak egy kötegben romlanak. 150 dpi-nél egy oldal már
+    több millió pixel, így a nagy köteg nem gyorsít (a kisebb cache-barátabb). A nevek kiterjesztése a
+    ``fmt``-hez igazodik (PNG esetén oldalanként ``név_p1.png`` ...).
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Ismeretlen formátum: {fmt!r} (választható: {', '.join(FORMATS)})")
+    config = config or PRESETS["medium"]
+    os.makedirs(out_dir, exist_ok=True)
+    report = ScanReport(stages={"rasterize": 0.0, "degrade": 0.0, "encode": 0.0, "write": 0.0})
+    pending = []
+    start = time.perf_counter()
+
+    def flush():
+        # Oldalak csoportosítása méret szerint, csoportonként egy köteg
+        groups = {}
+        for doc in pending:
+            for page_no, page in enumerate(doc["pages"]):
+                groups.setdefault(page.shape, []).append((doc, page_no))
+        t = time.perf_counter()
+        for members in groups.values():
+            out = degrade([doc["pages"][i] for doc, i in members], [doc["params"][i] for doc, i in members], config)
+            for (doc, i), page in zip(members, out):
+                doc["pages"][i] = page
+        report.stages["degrade"] += time.perf_counter() - t
+        for doc in pending:
+            t = time.perf_counter()
+            encoded, images = zip(*(encode_page(page, params["quality"])
+                                    for page, params in zip(doc["pages"], doc["params"])))
+            t2 = time.perf_counter()
+            path = os.path.join(out_dir, f"{os.path.splitext(doc['name'])[0]}.{'tif' if fmt == 'tiff' else fmt}")
+            write_document(path, fmt, encoded, images, doc["sizes"], config.dpi)
+            report.stages["encode"] += t2 - t
+            report.stages["write"] += time.perf_counter() - t2
+            report.documents += 1
+            report.pages += len(images)
+        pending.clear()
+
+    for index, (name, pdf) in enumerate(documents):
+        rngs, params = [], []
+
+        def page_skew(page_no):
+            # Oldalanként saját generátor: a paraméterek a raszterizálás előtt kellenek (forgatás)
+            rng = np.random.default_rng([seed, index, page_no])
+            rngs.append(rng)
+            params.append(page_params(rng, config))
+            return params[-1]["angle"]
+
+        t = time.perf_counter()
+        pages, sizes = rasterize(pdf, config.dpi, page_skew)
+        report.stages["rasterize"] += time.perf_counter() - t
+        for rng, p, page in zip(rngs, params, pages):
+            p["noise"] = rng.random(page.shape, dtype=np.float32)
+        pending.append({"name": name, "pages": pages, "sizes": sizes, "params": params})
+        if sum(len(doc["pages"]) for doc in pending) >= batch_pages:
+            flush()
+    if pending:
+        flush()
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def preset(name, **overrides):
+    """Előre beállított rontási szint (``light``, ``medium``, ``heavy``) módosításokkal."""
+    return replace(PRESETS[name], **overrides)
@@ -1,166 +1,155 @@
 from fpdf import FPDF
-import os
+from functools import lru_cache
+
+from .background import compile_backgrounds, install_backgrounds, place_background
+from .config import using_config, write_output
+from .fonts import register_fonts
+from .layout import PlanBuilder, TableHeader, TableSpec, render_plan
+from .output import write_pdf
+from .profiling import phase
 
-SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-OUTPUT_DIR = os.path.join(SCRIPT_DIR, "Test_Invoices")
-os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 class SimpleInvoice(FPDF):
-    def header(self):
-        # Megkeressük a font fájlt a script mellett
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        font_path = os.path.join(script_dir, "arial.ttf") 
-        font_path_bold = os.path.join(script_dir, "arialbd.ttf")
-
-        # Megpróbáljuk betölteni a script mellől, ha nincs ott, akkor a Windowsból
-        if os.path.exists(font_path):
-            self.add_font("Arial", style="", fname=font_path)
-            self.add_font("Arial", style="B", fname=font_path_bold)
-        else:
-            # Fallback a Windows rendszermappára
-            self.add_font("Arial", style="", fname=r"C:\Windows\Fonts\arial.ttf")
-            self.add_font("Arial", style="B", fname=r"C:\Windows\Fonts\arialbd.ttf")
-
-def create_simple_invoice(filename, data):
-    pdf = SimpleInvoice()
-    pdf.add_page()
-    pdf.set_auto_page_break(auto=True, margin=20)
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # A fontokat dokumentumonként egyszer regisztráljuk (nem minden oldal header()-jében),
+        # a feldolgozott TTF adatokat a fonts modul folyamaton belül újrahasznosítja
+        register_fonts(self)
+        # Az oldaltörés határát a terv fordítása is látja (statikus-e egy pozíció)
+        self.set_auto_page_break(auto=True, margin=20)
+
+@lru_cache(maxsize=None)
+def compile_simple_plan():
+    """A sablon elrendezése, egyszer lefordítva (a statikus részek előre kiszámolva)."""
+    b = PlanBuilder("simple")
 
     # --- 1. FEJLÉC SZEKCIÓ (Két oszlopos elrendezés) ---
-    
-    # Y pozíció mentése a kezdéshez
     start_y = 20
-    pdf.set_y(start_y)
+    b.set_y(start_y)
 
     # --- BAL OSZLOP (Issued To & Pay To) ---
-    pdf.set_x(10)
-    
+    b.set_x(10)
+
     # ISSUED TO
-    pdf.set_font("Arial", "B", 10)
-    pdf.cell(100, 5, "ISSUED TO:", ln=True)
-    
-    pdf.set_font("Arial", "", 10)
-    pdf.cell(100, 5, str(data.get("issued_to_name", "")), ln=True)
-    pdf.cell(100, 5, str(data.get("issued_to_company", "")), ln=True)
-    pdf.multi_cell(90, 5, str(data.get("issued_to_address", "")))
-    
-    pdf.ln(5) # Kis térköz
+    b.font("B", 10)
+    b.cell(100, 5, "ISSUED TO:", ln=True)
+
+    b.font("", 10)
+    b.field(100, 5, "issued_to_name", ln=True)
+    b.field(100, 5, "issued_to_company", ln=True)
+    b.multi_field(90, 5, "issued_to_address")
+
+    b.ln(5) # Kis térköz
 
     # PAY TO
-    pdf.set_font("Arial", "B", 10)
-    pdf.cell(100, 5, "PAY TO:", ln=True)
-    
-    pdf.set_font("Arial", "", 10)
-    pdf.cell(100, 5, str(data.get("pay_to_bank", "")), ln=True)
-    pdf.cell(100, 5, f"Account Name: {data.get('pay_to_acc_name', '')}", ln=True)
-    pdf.cell(100, 5, f"Account No.: {data.get('pay_to_acc_no', '')}", ln=True)
+    b.font("B", 10)
+    b.cell(100, 5, "PAY TO:", ln=True)
+
+    b.font("", 10)
+    b.field(100, 5, "pay_to_bank", ln=True)
+    b.field(100, 5, "pay_to_acc_name", fmt="Account Name: {}", ln=True)
+    b.field(100, 5, "pay_to_acc_no", fmt="Account No.: {}", ln=True)
 
     # Mentjük, hol végződött a bal oldal
-    left_column_end_y = pdf.get_y()
+    b.mark("left_column_end")
 
     # --- JOBB OSZLOP (INVOICE felirat és dátumok) ---
     # Visszaállunk a tetejére, de jobbra toljuk az X-et
-    pdf.set_xy(120, start_y)
-    
+    b.set_xy(120, start_y)
+
     # INVOICE cím
-    pdf.set_font("Arial", "B", 24)
-    pdf.cell(70, 10, "INVOICE", align="R", ln=True)
-    
+    b.font("B", 24)
+    b.cell(70, 10, "INVOICE", align="R", ln=True)
+
     # Adatok (Invoice No, Date, Due Date)
-    pdf.set_font("Arial", "B", 10)
-    
-    def right_data_row(label, value):
-        pdf.set_x(120) # Mindig innen kezdjük a sort
-        pdf.set_font("Arial", "B", 10)
-        pdf.cell(35, 6, label, align="L")
-        pdf.set_font("Arial", "", 10)
-        pdf.cell(35, 6, value, align="R", ln=True)
-
-    pdf.ln(5)
-    right_data_row("INVOICE NO:", data.get("invoice_no", ""))
-    right_data_row("DATE:", data.get("date", ""))
-    right_data_row("DUE DATE:", data.get("due_date", ""))
+    b.ln(5)
+    for label, key in [("INVOICE NO:", "invoice_no"), ("DATE:", "date"), ("DUE DATE:", "due_date")]:
+        b.set_x(120) # Mindig innen kezdjük a sort
+        b.font("B", 10)
+        b.cell(35, 6, label, align="L")
+        b.font("", 10)
+        b.field(35, 6, key, align="R", ln=True)
 
     # --- 2. TÁBLÁZAT ---
-    
+
     # A táblázatnak a két oszlop közül a lejjebb lévő alatt kell kezdődnie
-    table_start_y = max(left_column_end_y, pdf.get_y()) + 15
-    pdf.set_y(table_start_y)
+    b.set_y_after(["left_column_end"], 15)
 
     # Oszlopok: Description, Unit Price, Qty, Total
     cols = [90, 35, 25, 40]
     headers = ["DESCRIPTION", "UNIT PRICE", "QTY", "TOTAL"]
 
-    # Fejléc
-    pdf.set_font("Arial", "B", 9)
-    pdf.set_fill_color(255, 255, 255) # Fehér háttér (minimalista)
-    
-    for i, h in enumerate(headers):
-        align = "L" if i == 0 else "R"
-        pdf.cell(cols[i], 8, h, border="B", align=align) # Csak alsó vonal
-    pdf.ln(10)
+    # Fejléc: félkövér, csak alsó vonal, fehér (nincs) háttér; minden oldalon megismétlődik
+    header = TableHeader(headers, ["L", "R", "R", "R"], height=8, style="B", size=9,
+                         border="B", fill=None, advance=10)
 
-    # Tételek
-    pdf.set_font("Arial", "", 9)
-    items = data.get("items", [])
-
-    for item in items:
-        # item = [Desc, Price, Qty, Total]
-        
-        # Mentés a multi_cell miatt
-        x_start = pdf.get_x()
-        y_start = pdf.get_y()
-
-        # 1. Description (ez lehet többsoros)
-        pdf.multi_cell(cols[0], 6, str(item[0]), align="L")
-        y_end = pdf.get_y()
-
-        # Visszaállunk a sor tetejére
-        pdf.set_xy(x_start + cols[0], y_start)
-
-        # 2. Unit Price
-        pdf.cell(cols[1], 6, str(item[1]), align="R")
-        # 3. Qty
-        pdf.cell(cols[2], 6, str(item[2]), align="R")
-        # 4. Total
-        pdf.cell(cols[3], 6, str(item[3]), align="R")
-
-        # Következő sor pozíciója
-        pdf.set_xy(10, y_end)
-        pdf.ln(2) # Kis sorköz
+    # Tételek: item = [Desc, Price, Qty, Total], a leírás lehet többsoros
+    b.font("", 9)
+    b.table("items", TableSpec(widths=cols, aligns=["L", "R", "R", "R"], line_height=6,
+                               wrap_col=0, row_gap=2, separator=None, x=10,
+                               header=header, total_col=3))
 
     # --- 3. ÖSSZESÍTŐ (Totals) ---
-    pdf.ln(5)
-    
+    b.ln(5)
+    b.keep(22) # Az összesítő egy oldalon marad
+
     # Csak a jobb oldalra írunk, igazítva a táblázat széléhez
-    x_totals = 135 
-    
-    def total_line(label, value, bold=False):
-        pdf.set_x(x_totals)
-        pdf.set_font("Arial", "B" if bold else "", 10)
-        pdf.cell(25, 6, label, align="L") # Label
-        pdf.cell(30, 6, value, align="R", ln=True) # Value
-
-    total_line("SUBTOTAL", data.get("subtotal", ""))
-    total_line("Tax", data.get("tax", ""))
-    pdf.ln(2)
+    x_totals = 135
+    for label, key in [("SUBTOTAL", "subtotal"), ("Tax", "tax")]:
+        b.set_x(x_totals)
+        b.font("", 10)
+        b.cell(25, 6, label, align="L") # Label
+        b.field(30, 6, key, align="R", ln=True) # Value
+    b.ln(2)
     # Végösszeg vastagon
-    pdf.set_font("Arial", "B", 12)
-    pdf.set_x(x_totals)
-    pdf.cell(25, 8, "TOTAL", align="L")
-    pdf.cell(30, 8, data.get("total_amount", ""), align="R", ln=True)
+    b.font("B", 12)
+    b.set_x(x_totals)
+    b.cell(25, 8, "TOTAL", align="L")
+    b.field(30, 8, "total_amount", align="R", ln=True)
 
     # --- 4. ALÁÍRÁS / LÁBLÉC ---
     # Bal oldalra, alulra
-    pdf.ln(15)
-    pdf.set_x(10)
-    pdf.set_font("Arial", "B", 10)
-    pdf.cell(0, 5, str(data.get("signer_name", "")), ln=True)
-    
-    # Mentés
-    filepath = os.path.join(OUTPUT_DIR, filename)
-    pdf.output(filepath)
-    print(f"[OK] Simple Invoice Generálva: {filepath}")
+    b.ln(15)
+    b.set_x(10)
+    b.font("B", 10)
+    b.field(0, 5, "signer_name", ln=True)
+
+    return b.compile(SimpleInvoice)
+
+
+@lru_cache(maxsize=None)
+def compile_simple_background():
+    """A terv statikus rétege, folyamatonként egyszer lerenderelve (Form XObject tartalom)."""
+    return compile_backgrounds(SimpleInvoice, compile_simple_plan().background)
+
+
+def build_simple_invoice(data):
+    """Felépíti a számla dokumentumot (még nincs szerializálva)."""
+    with phase("fonts"):
+        pdf = SimpleInvoice()
+        (first_page,) = install_backgrounds(pdf, compile_simple_background())
+        pdf.add_page()
+        place_background(pdf, first_page)
+    render_plan(pdf, compile_simple_plan(), data)
+    return pdf
+
+
+def render_simple_invoice(data, out=None, config=None):
+    """PDF renderelés fájl nélkül: ``bytes``, vagy írás a megadott streambe / memoryview-ba.
+
+    A ``config`` (``config.RenderConfig``) kimeneti profilja a hívás idejére érvényes.
+    """
+    with using_config(config):
+        return write_pdf(build_simple_invoice(data), out)
+
+
+def create_simple_invoice(filename, data, config=None):
+    # Előbb a teljes renderelés, utána az atomikus írás: hibánál a régi fájl megmarad
+    # (a kimeneti mappát csak íráskor hozzuk létre, az import nem végez I/O-t)
+    with using_config(config) as config:
+        filepath = write_output(filename, render_simple_invoice(data), config)
+        if config.verbose:
+            print(f"[OK] Simple Invoice Generálva: {filepath}")
 
 
 # --- ADATOK A FELTÖLTÖTT KÉP ALAPJÁN ---
@@ -198,10 +187,7 @@ simple_data = {
     "signer_name": "Atlee Petersen"
 }
 
-# 1. Valid generálás
-create_simple_invoice("simple_invoice_01.pdf", simple_data)
-
-# 2. "Stressz teszt" adatokkal
+# "Stressz teszt" adatok
 stress_data = simple_data.copy()
 stress_data["issued_to_name"] = "Dr. Very Long Name " * 5
 stress_data["items"] = [
@@ -209,4 +195,9 @@ stress_data["items"] = [
     ["Normál tétel", "10", "1", "$10"]
 ]
 stress_data["tax"] = "ÁFA mentes" # Szám helyett szöveg
-create_simple_invoice("simple_invoice_stress_test.pdf", stress_data)
\ No newline at end of file
+
+# A CLI demo parancsa ezeket rendereli: python -m PDF_generator demo
+DEMO_INVOICES = [
+    ("simple_invoice_01.pdf", simple_data),
+    ("simple_invoice_stress_test.pdf", stress_data),
+]
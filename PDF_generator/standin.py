@@ -0,0 +1,128 @@
+"""Helyi HTTP stand-in a kinyerési szolgáltatáshoz (offline teszteléshez).
+
+POST kérésben PDF-et fogad (bármely útvonalon), ellenőrzi a fejlécét, és
+egy rövid JSON választ ad (fájlnév, méret, SHA-256). Beállítható késleltetés
+(a valódi feldolgozási idő utánzása) és hibaarány (503 válasz, az
+újrapróbálás teszteléséhez). A ``GET /stats`` a számlálókat adja vissza.
+
+Használat::
+
+    async with serve(latency=0.05, fail_rate=0.1) as server:
+        ...  # HttpSubmitter(server.url)
+
+Önállóan: ``python -m PDF_generator.standin --port 8080 --latency 0.05``.
+"""
+import argparse
+import asyncio
+from contextlib import asynccontextmanager
+import hashlib
+import json
+import random
+from urllib.parse import unquote
+
+
+class StandinServer:
+    """A stand-in állapota: beállítások és számlálók."""
+
+    def __init__(self, latency=0.0, fail_rate=0.0, seed=None):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.random = random.Random(seed)
+        self.url = None
+        self.received = 0
+        self.received_bytes = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def stats(self):
+        return {
+            "received": self.received,
+            "received_bytes": self.received_bytes,
+            "failed": self.failed,
+            "max_in_flight": self.max_in_flight,
+        }
+
+    async def handle(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            method, path = (request_line.decode("latin-1").split() + ["", ""])[:2]
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+            status, payload = await self.respond(method, path, headers, body)
+            data = json.dumps(payload).encode()
+            writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                         f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode("latin-1") + data)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, method, path, headers, body):
+        if method == "GET" and path == "/stats":
+            return "200 OK", self.stats()
+        if method != "POST":
+            return "405 Method Not Allowed", {"error": "csak POST"}
+        if not body.startswith(b"%PDF-"):
+            return "400 Bad Request", {"error": "a törzs nem PDF"}
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            if self.random.random() < self.fail_rate:
+                self.failed += 1
+                return "503 Service Unavailable", {"error": "szimulált hiba"}
+        finally:
+            self.in_flight -= 1
+        self.received += 1
+        self.received_bytes += len(body)
+        return "200 OK", {
+            "filename": unquote(headers.get("x-filename", "")),
+            "bytes": len(body),
+            "sha256": hashlib.sha256(body).hexdigest(),
+        }
+
+
+@asynccontextmanager
+async def serve(host="127.0.0.1", port=0, latency=0.0, fail_rate=0.0, seed=None):
+    """A stand-in futtatása a blokk idejére; ``port=0`` esetén szabad portot választ."""
+    state = StandinServer(latency, fail_rate, seed)
+    server = await asyncio.start_server(state.handle, host, port)
+    bound_host, bound_port = server.sockets[0].getsockname()[:2]
+    state.url = f"http://{bound_host}:{bound_port}/extract"
+    try:
+        yield state
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+async def _serve_forever(args):
+    async with serve(args.host, args.port, args.latency, args.fail_rate) as state:
+        print(f"Stand-in: {state.url}", flush=True)
+        await asyncio.Event().wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="válaszidő másodpercben")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="503 válaszok aránya (0..1)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve_forever(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
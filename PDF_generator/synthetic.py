@@ -0,0 +1,246 @@
+"""Szintetikus számla adatok végtelen, reprodukálható folyamként.
+
+Minden számla a ``(seed, index)`` párból determinisztikusan áll elő, így a folyam
+bármely eleme újragenerálható, és a generátor nem tart semmit a memóriában
+(a batch rendererrel millió számla is előállítható konstans memóriával).
+
+A ``_corrupted_fields`` kulcs felsorolja, mely mezőket rontottuk el szándékosan
+("ingyen", "Végtelen", ...); a sablonok az ismeretlen kulcsokat figyelmen kívül hagyják.
+"""
+from dataclasses import dataclass
+import itertools
+import random
+
+from .money import QUANTITY_DECIMAL, USD, USD_COMPACT, apply_rate, format_money
+from .templates import TEMPLATES
+
+
+@dataclass
+class SyntheticConfig:
+    # Tételszám: alapból egyenletes [min, max], ``items_tail_share`` eséllyel a hosszú farokból
+    items: tuple = (1, 12)
+    items_tail: tuple = (50, 500)
+    items_tail_share: float = 0.02
+    # Leírás hossza szavakban; ``long_description_share`` eséllyel extrém hosszú
+    description_words: tuple = (1, 6)
+    long_description_words: tuple = (20, 60)
+    long_description_share: float = 0.05
+    # Szöveges mezők nyelve: magyar (ékezetes) szókincs, ill. extrém Unicode betétek
+    hungarian_share: float = 0.3
+    unicode_share: float = 0.02
+    # Számlánként ennyi eséllyel rontunk el 1-3 mezőt
+    corrupt_share: float = 0.05
+
+
+DEFAULT_CONFIG = SyntheticConfig()
+
+# --- SZÓKINCS ---
+
+EN_WORDS = ["Brand", "consultation", "Logo", "design", "Website", "page", "Social", "media", "templates",
+            "Professional", "Service", "Labor", "Extra", "Fee", "Travel", "costs", "Business", "Card",
+            "Magazine", "License", "Support", "Maintenance", "Hosting", "Installation", "Cable", "Router"]
+HU_WORDS = ["Szolgáltatás", "díj", "Tanácsadás", "Kiszállás", "Karbantartás", "Szoftver", "licenc",
+            "Éves", "előfizetés", "Hálózati", "eszköz", "Munkaóra", "Ügyfélszolgálat", "Árajánlat",
+            "Különdíj", "Gyorsjavítás", "Őrzött", "tárhely", "Üzemeltetés", "Független", "hűtőrendszer"]
+UNICODE_SNIPPETS = ["漢字テスト", "עברית", "العربية", "Ω≈ç√∫µ", "🧾💶✅", "Z̷a̸l̴g̵o̶", "ǅungla", "ﬁﬂ ligatúra",
+                    "​zero​width", "𝔘𝔫𝔦𝔠𝔬𝔡𝔢", "Ελληνικά", "Кириллица"]
+
+FIRST_NAMES = ["Richard", "Marceline", "Curtis", "Adeline", "Atlee", "Lorna", "Gary", "Ben", "Lisa"]
+LAST_NAMES = ["Sanchez", "Anderson", "Brown", "Palmerston", "Petersen", "Alvarado", "Miller", "Kim"]
+HU_FIRST_NAMES = ["Ádám", "Éva", "Ödön", "Zsófia", "Gergő", "Réka", "Ünige", "Bálint", "Tünde"]
+HU_LAST_NAMES = ["Kovács", "Szabó", "Tóth", "Horváth", "Kiss", "Molnár", "Németh", "Fülöp", "Győri"]
+COMPANIES = ["Thynk Unlimited", "ABC Communication", "Standard Products", "Fauget", "Borcele Bank",
+             "Példa Kft.", "Gyorsjavító Bt.", "Őszi Hálózat Zrt.", "Északi Üzemeltető Kft."]
+STREETS = ["Anywhere St.", "NE Willoughby Blvd.", "SW 9th Street", "Fő utca", "Petőfi Sándor út", "Árpád híd"]
+CITIES = ["Any City", "Miami, FL", "Sturt, FL", "Budapest", "Győr", "Szeged", "Pécs", "Debrecen"]
+BANKS = ["Borcele Bank", "Fauget", "OTP Bank", "K&H Bank", "Erste Bank", "Gránit Bank"]
+UOMS = ["HR", "MD", "TR", "db", "EA", "óra"]
+SHIP_VIA = ["Email", "Post", "Courier", "Személyes átvétel", "UPS"]
+TERMS = ["Due upon receipt", "Net 15", "Net 30", "8 napon belül", "Azonnali"]
+
+CORRUPT_VALUES = ["ingyen", "Végtelen", "NaN", "-1", "", "ÁFA mentes", "N/A", "1.000,00,0", "$$$"]
+
+# Sablononként az elrontható (szöveges összeg / azonosító) mezők
+_CORRUPTIBLE = {
+    "simple": ["invoice_no", "date", "due_date", "subtotal", "tax", "total_amount"],
+    "modern": ["invoice_id", "subtotal", "tax", "grand_total"],
+    "general": ["inv_number", "inv_date", "po_number", "total_net", "tax", "total_gross"],
+}
+
+
+# --- SEGÉDFÜGGVÉNYEK ---
+
+def _text(rng, cfg, n_words):
+    vocab = HU_WORDS if rng.random() < cfg.hungarian_share else EN_WORDS
+    words = [rng.choice(vocab) for _ in range(n_words)]
+    if rng.random() < cfg.unicode_share:
+        words.insert(rng.randrange(len(words) + 1), rng.choice(UNICODE_SNIPPETS))
+    return " ".join(words)
+
+
+def _description(rng, cfg):
+    if rng.random() < cfg.long_description_share:
+        return _text(rng, cfg, rng.randint(*cfg.long_description_words))
+    return _text(rng, cfg, rng.randint(*cfg.description_words))
+
+
+def _item_count(rng, cfg):
+    if rng.random() < cfg.items_tail_share:
+        return rng.randint(*cfg.items_tail)
+    return rng.randint(*cfg.items)
+
+
+def _person(rng, cfg):
+    if rng.random() < cfg.hungarian_share:
+        return f"{rng.choice(HU_LAST_NAMES)} {rng.choice(HU_FIRST_NAMES)}"
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _address(rng):
+    return f"{rng.randint(1, 9999)} {rng.choice(STREETS)}, {rng.choice(CITIES)}"
+
+
+def _date(rng):
+    return f"{rng.randint(1, 12)}/{rng.randint(1, 28)}/{rng.randint(2015, 2030)}"
+
+
+def _digits(rng, n):
+    return "".join(str(rng.randrange(10)) for _ in range(n))
+
+
+def _lines(rng, cfg, count):
+    # (leírás, egységár centben, mennyiség)
+    return [(_description(rng, cfg), rng.randint(100, 100000), rng.randint(1, 10)) for _ in range(count)]
+
+
+def _usd(cents, space=True):
+    return format_money(cents, USD if space else USD_COMPACT)
+
+
+# --- SABLONONKÉNTI SÉMÁK ---
+
+def _simple(rng, cfg):
+    # Az egységár oszlop egész dollár, így a sorösszeg is abból számol
+    lines = [(desc, price - price % 100, qty) for desc, price, qty in _lines(rng, cfg, _item_count(rng, cfg))]
+    subtotal = sum(price * qty for _, price, qty in lines)
+    return {
+        "issued_to_name": _person(rng, cfg),
+        "issued_to_company": rng.choice(COMPANIES),
+        "issued_to_address": _address(rng),
+        "pay_to_bank": rng.choice(BANKS),
+        "pay_to_acc_name": _person(rng, cfg),
+        "pay_to_acc_no": f"{_digits(rng, 4)} {_digits(rng, 4)} {_digits(rng, 4)}",
+        "invoice_no": _digits(rng, 5),
+        "date": _date(rng),
+        "due_date": _date(rng),
+        "items": [[desc, str(price // 100), str(qty), _usd(price * qty, space=False)]
+                  for desc, price, qty in lines],
+        "subtotal": _usd(subtotal, space=False),
+        "tax": "10%",
+        "total_amount": _usd(subtotal + apply_rate(subtotal, 1000), space=False),
+        "signer_name": _person(rng, cfg),
+    }
+
+
+def _modern(rng, cfg):
+    lines = _lines(rng, cfg, _item_count(rng, cfg))
+    subtotal = sum(price * qty for _, price, qty in lines)
+    tax = apply_rate(subtotal, 2000)
+    return {
+        "invoice_id": f"#{_digits(rng, 10)}",
+        "customer_name": _person(rng, cfg),
+        "customer_phone": f"+{_digits(rng, 3)}-{_digits(rng, 3)}-{_digits(rng, 4)}",
+        "customer_email": f"{rng.choice(EN_WORDS).lower()}@{rng.choice(EN_WORDS).lower()}.com",
+        "customer_address": _address(rng),
+        "items": [[desc, _usd(price), str(qty), _usd(price * qty)] for desc, price, qty in lines],
+        "bank_name": _person(rng, cfg),
+        "bank_id": f"{_digits(rng, 3)}-{_digits(rng, 3)}-{_digits(rng, 4)}",
+        "bank_institute": rng.choice(BANKS),
+        "subtotal": _usd(subtotal),
+        "tax": _usd(tax),
+        "grand_total": _usd(subtotal + tax),
+    }
+
+
+def _general(rng, cfg):
+    lines = _lines(rng, cfg, _item_count(rng, cfg))
+    total = sum(price * qty for _, price, qty in lines)
+
+    def party():
+        return (f"{rng.choice(COMPANIES)}\n{_address(rng)}\n"
+                f"Phone: ({_digits(rng, 2)}) {_digits(rng, 3)}-{_digits(rng, 4)}")
+
+    return {
+        "bill_to_text": party(),
+        "remit_to_text": party(),
+        "inv_number": _digits(rng, 6),
+        "inv_date": _date(rng),
+        "po_number": f"{_digits(rng, 4)}-{_digits(rng, 4)}",
+        "source_ref": f"S.O. #{_digits(rng, 6)}",
+        "acct_num": _digits(rng, 3),
+        "ar_cust": rng.choice(COMPANIES)[:12],
+        "acct_id": rng.choice(CITIES),
+        "cust_po": f"{_digits(rng, 6)}-{_digits(rng, 4)}",
+        "attn": _person(rng, cfg),
+        "sales_rep": _person(rng, cfg) if rng.random() < 0.5 else "",
+        "ship_via": rng.choice(SHIP_VIA),
+        "terms": rng.choice(TERMS),
+        "work_requested": _text(rng, cfg, rng.randint(5, 30)),
+        "work_performed": _text(rng, cfg, rng.randint(5, 30)),
+        "items": [[_digits(rng, 4), desc, format_money(qty * 100, QUANTITY_DECIMAL), rng.choice(UOMS), _usd(price), _usd(price * qty)]
+                  for desc, price, qty in lines],
+        "notes": _text(rng, cfg, rng.randint(0, 20)),
+        "total_net": _usd(total),
+        "tax": "$ 0.00",
+        "total_gross": _usd(total),
+    }
+
+
+_SCHEMAS = {"simple": _simple, "modern": _modern, "general": _general}
+
+
+def make_invoice(template, seed, index, config=None):
+    """A folyam ``index``-edik számlája az adott sablonhoz (determinisztikus)."""
+    cfg = config or DEFAULT_CONFIG
+    try:
+        schema = _SCHEMAS[template]
+    except KeyError:
+        raise ValueError(f"Ismeretlen sablon: {template!r} (választható: {', '.join(TEMPLATES)})") from None
+
+    rng = random.Random(f"{template}:{seed}:{index}")
+    data = schema(rng, cfg)
+
+    corrupted = []
+    if rng.random() < cfg.corrupt_share:
+        corrupted = rng.sample(_CORRUPTIBLE[template], rng.randint(1, 3))
+        for key in corrupted:
+            data[key] = rng.choice(CORRUPT_VALUES)
+        # Egy tétel összege is elromolhat
+        if data["items"] and rng.random() < 0.5:
+            row = rng.choice(data["items"])
+            row[-1] = rng.choice(CORRUPT_VALUES)
+            corrupted.append("items")
+    data["_corrupted_fields"] = corrupted
+    return data
+
+
+def generate_invoices(template, seed=0, config=None, start=0):
+    """Végtelen számla folyam egy sablonhoz; ``itertools.islice``-szal vágható."""
+    for index in itertools.count(start):
+        yield make_invoice(template, seed, index, config)
+
+
+def iter_jobs(templates, seed=0, count=None, config=None, start=0):
+    """Batch jobok ``(template, data, filename)`` formában, lustán.
+
+    ``templates`` egy sablon neve vagy nevek listája (ilyenkor a sablonok sorban
+    váltakoznak). ``count=None`` esetén a folyam végtelen. ``start`` az első
+    job sorszáma (a számlák sorszámtól függenek, így a folyam bárhonnan folytatható).
+    """
+    if isinstance(templates, str):
+        templates = [templates]
+    indices = itertools.count(start) if count is None else range(start, count)
+    for index in indices:
+        template = templates[index % len(templates)]
+        data = make_invoice(template, seed, index, config)
+        yield template, data, f"{template}_{seed}_{index:07d}.pdf"
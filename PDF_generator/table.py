@@ -0,0 +1,276 @@
+"""Tételtáblázat renderelő nagy (több száz / ezer soros) számlákhoz.
+
+A ``multi_cell`` + ``set_xy`` + cellánkénti rajzolás helyett egy sor egyetlen
+lépésben áll elő:
+
+- a szövegszélességeket fontonként és méretenként memoizáljuk (``WidthCache``),
+  a tördelt oszlopot szavanként mért szélességekkel törjük sorokra,
+- a sor magassága a rajzolás előtt ismert, így az oldaltörésről is előre döntünk,
+- minden szöveg egy ``text()`` hívás, a kurzort csak a táblázat végén állítjuk,
+- az elválasztó vonalakat oldalanként egyetlen path-ként rajzoljuk ki,
+- oldaltöréskor a fejléc megismétlődik és a részösszeg átkerül a következő oldalra;
+  a sorokat egyenként dolgozzuk fel, így az idő és a memória is lineáris.
+
+A jobbról balra író (héber, arab) és a speciális törési pontot (zero-width space,
+feltételes elválasztójel) tartalmazó leírásokat továbbra is az fpdf ``multi_cell``-je
+rendereli.
+"""
+import re
+
+from . import compat  # belső fpdf részeket használ: verzió ellenőrzés
+from .groundtruth import current as current_truth
+from .money import format_money, infer_format, parse_money
+
+# Egy font/méret párhoz legfeljebb ennyi mért szöveget tartunk meg
+MAX_CACHED_WIDTHS = 100_000
+
+# Ezeket a leírásokat a multi_cell tördeli és rajzolja (RTL írás, ZWSP, soft hyphen)
+_FPDF_WRAPPED = re.compile("[\u0590-\u08ff\ufb1d-\ufdff\ufe70-\ufeff\u00ad\u200b]")
+
+CARRIED_FORWARD = "Carried forward"
+BROUGHT_FORWARD = "Brought forward"
+
+
+class WidthCache:
+    """Szövegszélességek (mm) memoizálva ``(font, méret)`` szerint, folyamaton belül közösen."""
+
+    def __init__(self, max_entries=MAX_CACHED_WIDTHS):
+        self.max_entries = max_entries
+        self._tables = {}
+
+    def table(self, pdf):
+        """Az aktuális fonthoz és mérethez tartozó ``{szöveg: szélesség}`` szótár."""
+        key = (pdf.current_font.fontkey, pdf.font_size_pt, pdf.font_stretching, pdf.char_spacing)
+        widths = self._tables.get(key)
+        if widths is None or len(widths) > self.max_entries:
+            widths = self._tables[key] = {}
+        return widths
+
+    def clear(self):
+        self._tables.clear()
+
+
+WIDTHS = WidthCache()
+
+
+def _width(widths, pdf, text):
+    w = widths.get(text)
+    if w is None:
+        w = widths[text] = pdf.get_string_width(text)
+    return w
+
+
+def wrap_text(pdf, widths, text, max_width):
+    """A ``multi_cell`` sortörése: szóhatáron, a túl hosszú szavakat karakterenként."""
+    lines = []
+    space = _width(widths, pdf, " ")
+    for paragraph in text.split("\n"):
+        line = []
+        line_width = 0.0
+        for word in paragraph.split(" "):
+            ww = _width(widths, pdf, word)
+            if line and line_width + space + ww <= max_width:
+                line.append(word)
+                line_width += space + ww
+                continue
+            if line:
+                lines.append(" ".join(line))
+            if ww <= max_width:
+                line, line_width = [word], ww
+                continue
+            # A sornál hosszabb szó: karakterenként töltjük a sorokat
+            chunk, chunk_width = "", 0.0
+            for char in word:
+                cw = _width(widths, pdf, char)
+                if chunk and chunk_width + cw > max_width:
+                    lines.append(chunk)
+                    chunk, chunk_width = "", 0.0
+                chunk += char
+                chunk_width += cw
+            line, line_width = [chunk], chunk_width
+        lines.append(" ".join(line))
+    return lines
+
+
+def render_table(pdf, spec, rows, key="items"):
+    """Tételsorok: a ``wrap_col`` oszlop több sorra törik, a többi egysoros szöveg.
+
+    A ``rows`` bármilyen iterálható lehet (pl. generátor), egyszer járjuk be.
+    Oldaltöréskor a ``spec.header`` fejléc megismétlődik, ``spec.total_col``
+    esetén az oldal alján "Carried forward", a következő oldal tetején
+    "Brought forward" sor viszi tovább a részösszeget. A ``key`` az adat kulcsa,
+    ezen a néven kerülnek a cellák a ground truth-ba (``groundtruth.recording``).
+    """
+    widths, aligns, lh = spec.widths, spec.aligns, spec.line_height
+    n_cols = len(widths)
+    c_margin = pdf.c_margin
+    baseline = 0.5 * lh + 0.3 * pdf.font_size
+    offsets = [spec.x + sum(widths[:i]) for i in range(n_cols)]
+    wrap_col = spec.wrap_col
+    wrap_width = widths[wrap_col] - 2 * c_margin
+    row_font = (pdf.font_style, pdf.font_size_pt)
+    measured = WIDTHS.table(pdf)
+    text = pdf.text
+    separators = []
+    carry = _Carry(spec.total_col)
+    # Az oldal alján a "Carried forward" sornak mindig marad hely
+    reserve = lh if spec.total_col is not None else 0
+    truth = current_truth()
+
+    def draw_value(i, value, y):
+        """Egy cella szövege; visszaadja a szöveg x pozícióját."""
+        dx = c_margin
+        if aligns[i] != "L":
+            dx = _align_offset(aligns[i], widths[i], _width(measured, pdf, value), c_margin)
+        text(offsets[i] + dx, y + baseline, value)
+        return offsets[i] + dx
+
+    def draw_carry(label, y):
+        if label:
+            draw_value(wrap_col, label, y)
+        draw_value(spec.total_col, carry.formatted(), y)
+        return y + lh
+
+    def page_break(y):
+        """Oldal lezárása (részösszeg, elválasztók), új oldal fejléccel; az első sor y-ja."""
+        if carry:
+            draw_carry(CARRIED_FORWARD, y)
+        _draw_separators(pdf, spec, separators)
+        pdf._perform_page_break()
+        y = _draw_header(pdf, spec, row_font, pdf.y)
+        if carry:
+            y = draw_carry(BROUGHT_FORWARD, y)
+        return y
+
+    y = pdf.y
+    header_pending = spec.header is not None
+    page_top = None
+
+    for index, row in enumerate(rows):
+        values = [str(value) for value in row[:n_cols]]
+        description = values[wrap_col] if wrap_col < len(values) else ""
+        fallback = _FPDF_WRAPPED.search(description) is not None
+        if fallback:
+            lines = pdf.multi_cell(widths[wrap_col], lh, description, dry_run=True, output="LINES")
+        else:
+            lines = wrap_text(pdf, measured, description, wrap_width)
+
+        # Oldaltörés a sor előtt, ha nem fér ki (és nem egy friss oldal tetején vagyunk);
+        # a fejléc nem maradhat az oldal alján az első sor nélkül
+        needed = len(lines) * lh + reserve + (spec.header.advance if header_pending else 0)
+        if y != page_top and _breaks(pdf, y, needed):
+            if header_pending:
+                pdf._perform_page_break()
+                y = pdf.y
+            else:
+                y = page_top = page_break(y)
+        if header_pending:
+            y = page_top = _draw_header(pdf, spec, row_font, y)
+            header_pending = False
+
+        for i, value in enumerate(values):
+            if i != wrap_col and value:
+                x = draw_value(i, value, y)
+                if truth is not None:
+                    truth.text(pdf, key, value, x, y + baseline, _width(measured, pdf, value), index, i)
+
+        if fallback:
+            page = pdf.page
+            pdf.set_xy(offsets[wrap_col], y)
+            pdf.multi_cell(widths[wrap_col], lh, description, align=aligns[wrap_col])
+            if truth is not None and description:
+                truth.block(pdf, key, description, page, offsets[wrap_col], y, widths[wrap_col], index, wrap_col)
+            y = pdf.y
+        else:
+            spans = []
+            for line in lines:
+                if _breaks(pdf, y, lh + reserve):
+                    # Egy oldalnál magasabb leírás: a maradék sorok a következő oldalra kerülnek
+                    y = page_top = page_break(y)
+                if line:
+                    x = draw_value(wrap_col, line, y)
+                    if truth is not None:
+                        spans.append((pdf.page, x, y + baseline, _width(measured, pdf, line)))
+                y += lh
+            if spans:
+                truth.lines(pdf, key, description, spans, index, wrap_col)
+
+        carry.add(values)
+        if spec.separator is not None:
+            separators.append(y)
+        y += spec.row_gap
+
+    if header_pending:
+        y = _draw_header(pdf, spec, row_font, y)
+    _draw_separators(pdf, spec, separators)
+    # A kurzor a táblázat alá kerül (ln(row_gap) után a bal margóra)
+    pdf.set_xy(pdf.l_margin if spec.row_gap else spec.x, y)
+
+
+def _draw_header(pdf, spec, row_font, y):
+    """A fejléc sor kirajzolása ``y``-ra; visszaadja az első tételsor y-ját."""
+    header = spec.header
+    if header is None:
+        return y
+    pdf.set_font(pdf.font_family, header.style, header.size)
+    if header.fill is not None:
+        pdf.set_fill_color(*header.fill)
+    pdf.set_xy(spec.x, y)
+    for label, width, align in zip(header.labels, spec.widths, header.aligns):
+        pdf.cell(width, header.height, label, border=header.border, fill=header.fill is not None, align=align)
+    pdf.set_font(pdf.font_family, *row_font)
+    return y + header.advance
+
+
+class _Carry:
+    """Az oldalakon áthozott részösszeg (századokban) a ``total_col`` oszlop értékeiből.
+
+    Az értékeket a ``money.parse_money`` értelmezi (dollár és forint, amerikai és
+    magyar elválasztók), a nem szám értékeket ("ingyen", "N/A" ...) kihagyja; a
+    kiírás formátuma az első felismert érték írásmódját követi (``money.infer_format``).
+    """
+
+    def __init__(self, col):
+        self.col = col
+        self.total = 0
+        self.format = None
+
+    def __bool__(self):
+        return self.col is not None
+
+    def add(self, values):
+        if self.col is None or self.col >= len(values):
+            return
+        value = parse_money(values[self.col])
+        if value is None:
+            return
+        self.total += value
+        if self.format is None:
+            self.format = infer_format(values[self.col])
+
+    def formatted(self):
+        return format_money(self.total, self.format) if self.format else format_money(self.total)
+
+
+def _breaks(pdf, y, h):
+    return pdf.auto_page_break and not pdf.in_footer and y + h > pdf.page_break_trigger
+
+
+def _align_offset(align, w, text_width, c_margin):
+    if align == "R":
+        return w - c_margin - text_width
+    if align == "C":
+        return (w - text_width) / 2
+    return c_margin
+
+
+def _draw_separators(pdf, spec, ys):
+    """Az oldal összes elválasztó vonala egyetlen path-ként, egy színváltással."""
+    if not ys:
+        return
+    k, h = pdf.k, pdf.h
+    x1, x2 = spec.x * k, (pdf.w - pdf.r_margin) * k
+    pdf.set_draw_color(*spec.separator)
+    pdf._out(" ".join(f"{x1:.2f} {(h - y) * k:.2f} m {x2:.2f} {(h - y) * k:.2f} l" for y in ys) + " S")
+    pdf.set_draw_color(0, 0, 0)
+    ys.clear()
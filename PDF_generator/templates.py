@@ -0,0 +1,31 @@
+from collections import namedtuple
+import importlib
+
+TemplateSpec = namedtuple("TemplateSpec", ["module", "create", "render"])
+
+# Sablon neve -> modul, fájlba író függvény, memóriába renderelő függvény
+# A modult csak akkor töltjük be, amikor először szükség van rá (CLI, batch worker).
+TEMPLATES = {
+    "simple": TemplateSpec("simple_invoice", "create_simple_invoice", "render_simple_invoice"),
+    "modern": TemplateSpec("modern_invoice", "create_modern_invoice", "render_modern_invoice"),
+    "general": TemplateSpec("general_invoice", "create_complex_invoice", "render_complex_invoice"),
+}
+
+
+def template_module(template):
+    """A sablon modulja, lusta importtal."""
+    try:
+        module_name = TEMPLATES[template].module
+    except KeyError:
+        raise ValueError(f"Ismeretlen sablon: {template!r} (választható: {', '.join(TEMPLATES)})") from None
+    return importlib.import_module(f".{module_name}", __package__)
+
+
+def resolve_template(template):
+    """A sablon névhez tartozó ``create_*_invoice(filename, data)`` függvény."""
+    return getattr(template_module(template), TEMPLATES[template].create)
+
+
+def resolve_renderer(template):
+    """A sablon névhez tartozó ``render_*_invoice(data, out=None)`` függvény."""
+    return getattr(template_module(template), TEMPLATES[template].render)
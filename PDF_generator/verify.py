@@ -0,0 +1,173 @@
+"""Visszaolvasás ellenőrzés: a generált PDF szövegrétegéből kinyerhető-e a számla minden mezője.
+
+A workerek (process pool) a PDF-ek szövegét a PyMuPDF-fel nyerik ki, és a
+forrás adat dict minden szöveges mezőjét (a ``_`` kezdetűek kivételével) és a
+tételsorok minden celláját egyenként keresik benne. Az összevetés szóközök
+nélkül történik, így a sortörés, a cellán belüli tördelés és az oldaltörés nem
+számít eltérésnek. Egy mező eredménye:
+
+- megvan: a szöveg változatlanul szerepel a kinyert szövegben,
+- hiányzó glif: a szöveg csak néhány nem ASCII karaktere nélkül szerepel. Az
+  fpdf a fontból hiányzó karaktert kihagyja a kimenetből (a rajzolásnál
+  figyelmeztet), ezért ez a szövegrétegben kimaradó karakterként jelenik meg,
+- eltérés: a mező így sem található.
+
+A rövid (pl. egyjegyű mennyiség) mezőknél a tartalmazás gyenge ellenőrzés: a
+mező helyét nem nézzük, csak azt, hogy a szöveg kinyerhető-e.
+
+Függőségek: ``pymupdf``.
+
+Használat::
+
+    report = run_verify(iter_jobs(["general"], seed=1, count=10_000))
+    print(report.pdfs_per_minute, report.missing_glyphs.most_common(10))
+"""
+from collections import Counter, deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+import os
+import re
+import time
+
+import pymupdf
+
+from .batch import _chunks
+from .config import OUTPUT_DIR
+
+_WHITESPACE = re.compile(r"\s+")
+
+# row / col: a tétel és az oszlop indexe, egyébként None; missing: a hiányzó karakterek
+FieldError = namedtuple("FieldError", ["key", "row", "col", "expected", "missing"])
+
+
+@dataclass
+class VerifyResult:
+    index: int
+    filename: str
+    fields: int = 0
+    mismatches: list = field(default_factory=list)
+    glyphs: list = field(default_factory=list)
+    error: str = ""
+    seconds: float = 0.0
+
+    @property
+    def ok(self):
+        return not self.error and not self.mismatches
+
+
+@dataclass
+class VerifyReport:
+    results: list
+    wall_seconds: float
+    workers: int
+
+    @property
+    def failed(self):
+        return [r for r in self.results if not r.ok]
+
+    @property
+    def fields(self):
+        return sum(r.fields for r in self.results)
+
+    @property
+    def missing_glyphs(self):
+        """Karakter -> hány mezőből hiányzott."""
+        counts = Counter()
+        for result in self.results:
+            for error in result.glyphs:
+                counts.update(set(error.missing))
+        return counts
+
+    @property
+    def pdfs_per_minute(self):
+        return len(self.results) / self.wall_seconds * 60 if self.wall_seconds else 0.0
+
+
+def expected_fields(data):
+    """A forrás adat mezői ``(kulcs, sor, oszlop, szöveg)`` alakban (a tételek cellánként)."""
+    for key, value in data.items():
+        if key == "items" or key.startswith("_") or value in (None, ""):
+            continue
+        yield key, None, None, str(value)
+    for row, item in enumerate(data.get("items", ())):
+        for col, value in enumerate(item):
+            if value not in (None, ""):
+                yield "items", row, col, str(value)
+
+
+def extract_text(pdf):
+    """A PDF (bájtok vagy útvonal) összes oldalának szövege, szóközök nélkül."""
+    with (pymupdf.open(stream=pdf, filetype="pdf") if isinstance(pdf, bytes) else pymupdf.open(pdf)) as doc:
+        return _WHITESPACE.sub("", "".join(page.get_text() for page in doc))
+
+
+def _missing_glyphs(expected, text, present):
+    # A nem ASCII karakterek elhagyhatók; a kimaradtak a hiányzó glifek
+    pattern = "".join(re.escape(c) if c.isascii() else f"(?:{re.escape(c)})?" for c in expected)
+    match = re.search(pattern, text)
+    if match is None or (not match.group() and any(c in present for c in expected)):
+        return None
+    return "".join((Counter(expected) - Counter(match.group())).elements())
+
+
+def verify_pdf(pdf, data, index=0, filename=""):
+    """Egy PDF összevetése a forrás adattal, mezőnként (``VerifyResult``)."""
+    start = time.perf_counter()
+    result = VerifyResult(index, filename)
+    try:
+        text = extract_text(pdf)
+    except Exception as exc:
+        result.error = f"{type(exc).__name__}: {exc}"
+        result.seconds = time.perf_counter() - start
+        return result
+    present = set(text)
+    for key, row, col, value in expected_fields(data):
+        result.fields += 1
+        expected = _WHITESPACE.sub("", value)
+        if expected in text:
+            continue
+        missing = _missing_glyphs(expected, text, present)
+        if missing is None:
+            result.mismatches.append(FieldError(key, row, col, value, ""))
+        else:
+            result.glyphs.append(FieldError(key, row, col, value, missing))
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def _verify_chunk(chunk, directory):
+    # A worker folyamatban fut: a chunk PDF-jeit olvassa be és veti össze
+    results = []
+    for index, _, data, filename in chunk:
+        path = os.path.join(directory, filename)
+        if not os.path.exists(path):
+            results.append(VerifyResult(index, filename, error="hiányzó PDF"))
+            continue
+        results.append(verify_pdf(path, data, index, filename))
+    return results
+
+
+def iter_verify(jobs, directory=OUTPUT_DIR, workers=None, chunksize=32, max_pending=None):
+    """A batch jobjai (``(sablon, adat[, fájlnév])``) szerint a ``directory`` PDF-jeinek
+    ellenőrzése process poolban; az eredményeket sorrendben adja, korlátos memóriával."""
+    workers = workers or os.cpu_count() or 1
+    if chunksize < 1:
+        raise ValueError("chunksize legalább 1 kell legyen")
+    max_pending = max_pending or workers * 2
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in _chunks(jobs, chunksize):
+            pending.append(pool.submit(_verify_chunk, chunk, directory))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def run_verify(jobs, directory=OUTPUT_DIR, workers=None, chunksize=32, max_pending=None):
+    """Az összes job ellenőrzése, összesítő riporttal (eltérések, hiányzó glifek, áteresztés)."""
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    results = list(iter_verify(jobs, directory, workers, chunksize, max_pending))
+    return VerifyReport(results, time.perf_counter() - start, workers)
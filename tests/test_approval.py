@@ -0,0 +1,112 @@
+import json
+import math
+
+import numpy as np
+import pytest
+
+from PDF_generator.approval import (DEFAULT_RULES, DecisionTable, Rule, RuleError, load_table, parse_amount,
+                                    parse_condition)
+
+
+@pytest.mark.parametrize("text, value", [
+    ("$ 1,234.50", 1234.5),
+    ("$400", 400.0),
+    ("2 500 000 Ft", 2500000.0),
+    ("1.234,50", 1234.5),
+    ("999,00 Ft", 999.0),
+    ("1 234,50 Ft", 1234.5),
+    ("-$ 5.00", -5.0),
+    (12, 12.0),
+])
+def test_parse_amount(text, value):
+    assert parse_amount(text) == value
+
+
+@pytest.mark.parametrize("text", ["ingyen", "", "N/A", "1.000,00,0"])
+def test_parse_amount_nan(text):
+    assert math.isnan(parse_amount(text))
+
+
+@pytest.mark.parametrize("total, rule, level", [
+    ("2 500 000 Ft", "R7", "3"),
+    ("1.234,50", "R4", "1"),
+    ("999,00 Ft", "R2", "0"),
+    ("$ 12,500.00", "R6", "2"),
+    ("-$ 5.00", "R1", "0"),
+    ("ingyen", "R8", "0"),
+])
+def test_default_rules_hungarian_totals(total, rule, level):
+    table = load_table(DEFAULT_RULES)
+    data = {"total_gross": total, "terms": "Net 30", "ship_via": "Email"}
+    decision = table.decide([data])[0]
+    assert decision["level"] == level
+    assert table.explain(data).startswith(f"Döntés: {rule}")
+    # A köteg (columns) és a számlánkénti (explain) értelmezés egyezik
+    assert table.rules[table.evaluate(table.columns([data])).first()[0]].id == rule
+
+
+def test_parse_condition_kinds():
+    assert parse_condition("").kind == "any"
+    assert parse_condition("-").kind == "any"
+    c = parse_condition(">= 1000")
+    assert (c.kind, c.op, c.low) == ("compare", ">=", 1000.0)
+    c = parse_condition("[1000..5000)")
+    assert (c.kind, c.low, c.high, c.closed) == ("range", 1000.0, 5000.0, (True, False))
+    c = parse_condition("]1..2[")
+    assert c.closed == (False, False)
+    assert parse_condition('"Net 30", "Net 15"').values == ("Net 30", "Net 15")
+    assert parse_condition("Net 30").values == ("Net 30",)
+    assert parse_condition("5").values == (5.0,)
+    c = parse_condition("not(< 0)")
+    assert c.negate and c.test(1.0) and not c.test(-1.0)
+    assert parse_condition([1, "a"]).values == (1.0, "a")
+
+
+@pytest.mark.parametrize("cell", ["[5..1]", "not()", "not(-)", None, True])
+def test_parse_condition_errors(cell):
+    with pytest.raises(RuleError):
+        parse_condition(cell)
+
+
+def test_range_edges_and_nan():
+    c = parse_condition("[0..1000)")
+    assert c.test(0.0) and c.test(999.99) and not c.test(1000.0)
+    assert not c.test(math.nan)
+    assert parse_condition("not([0..1000))").test(math.nan)
+
+
+def test_compiled_table_matches_conditions():
+    rules = [Rule("A", {"total": parse_condition("[10..20]")}, {"x": "a"}),
+             Rule("B", {"total": parse_condition("> 15"), "terms": parse_condition('"Net 30"')}, {"x": "b"}),
+             Rule("C", {}, {"x": "c"})]
+    table = DecisionTable(rules, "collect")
+    totals = [5, 10, 15, 15.5, 20, 20.5, math.nan]
+    terms = ["Net 30", "Net 15", "Net 30", "Net 30", "Net 30", "Net 30", "Net 30"]
+    decisions = table.evaluate(table.from_arrays(total=totals, terms=terms))
+    assert [decisions.matches(i) for i in range(len(totals))] == [[2], [0, 2], [0, 2], [0, 1, 2], [0, 1, 2],
+                                                                 [1, 2], [2]]
+    assert decisions.first().tolist() == [2, 0, 0, 0, 0, 1, 2]
+    assert decisions.counts().tolist() == [4, 3, 7]
+
+
+def test_many_rules_span_words():
+    rules = [Rule(f"R{i}", {"total": parse_condition(f">= {i}")}, {"i": i}) for i in range(130)]
+    table = DecisionTable(rules[::-1])
+    first = table.evaluate(table.from_arrays(total=np.array([0.0, 64.0, 129.0, -1.0]))).first()
+    assert [table.rules[i].id if i >= 0 else None for i in first.tolist()] == ["R0", "R64", "R129", None]
+
+
+def test_mixed_column_rejected():
+    with pytest.raises(RuleError, match="keveredik"):
+        DecisionTable([Rule("A", {"t": parse_condition("< 5")}, {}), Rule("B", {"t": parse_condition("abc")}, {})])
+
+
+def test_json_rules(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"hit_policy": "collect", "rules": [
+        {"id": "X", "when": {"total": "< 1000"}, "then": {"approver": "a"}},
+        {"id": "Y", "when": {}, "then": {"approver": "b"}}]}), encoding="utf-8")
+    table = load_table(str(path))
+    assert table.hit_policy == "collect"
+    assert table.decide([{"grand_total": "999,00 Ft"}]) == [[{"approver": "a"}, {"approver": "b"}]]
+    assert table.decide([{"grand_total": "2 500 000 Ft"}]) == [[{"approver": "b"}]]
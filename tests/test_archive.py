@@ -0,0 +1,108 @@
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+from PDF_generator.archive import Archive, ShardReader, ShardWriter, completed_shards
+
+
+def pdf(index, size=3000):
+    return b"%PDF-" + bytes([index % 251]) * size
+
+
+def fill(directory, count, start=0, format="zip", shard_bytes=10_000):
+    with ShardWriter(str(directory), shard_bytes, format) as writer:
+        for index in range(start, start + count):
+            writer.write(index, f"{index:04d}.pdf", pdf(index))
+    return writer
+
+
+@pytest.mark.parametrize("format", ["zip", "tar"])
+def test_shard_offsets_match_members(tmp_path, format):
+    writer = fill(tmp_path, 10, format=format)
+    shards = completed_shards(str(tmp_path))
+    assert writer.shards == len(shards) > 1
+    # Egy shard egy összefüggő job tartomány
+    assert [s["first"] for s in shards] == [0] + [s["last"] + 1 for s in shards[:-1]]
+    assert shards[-1]["last"] == 9
+    for shard in shards:
+        path = os.path.join(tmp_path, shard["shard"])
+        assert os.path.getsize(path) == shard["bytes"]
+        with ShardReader(path) as reader:
+            for name, index, offset, size in shard["members"]:
+                assert reader.read(name) == pdf(index)
+                view = reader.view(name)
+                assert bytes(view[:5]) == b"%PDF-" and len(view) == size
+                view.release()
+        # A szabványos olvasók is ugyanazt látják a tag helyén
+        if format == "zip":
+            with zipfile.ZipFile(path) as z:
+                assert all(z.read(name) == pdf(index) for name, index, _, _ in shard["members"])
+        else:
+            with tarfile.open(path) as t:
+                assert all(t.extractfile(name).read() == pdf(index) for name, index, _, _ in shard["members"])
+
+
+def test_archive_lookup(tmp_path):
+    fill(tmp_path, 7)
+    with Archive(str(tmp_path)) as archive:
+        assert len(archive) == 7 and "0003.pdf" in archive and "x.pdf" not in archive
+        assert archive.read("0006.pdf") == pdf(6)
+        assert archive.names()[0] == "0000.pdf"
+
+
+def test_resume_after_interrupted_batch(tmp_path):
+    fill(tmp_path, 6)
+    done = completed_shards(str(tmp_path))
+    # Megszakadt batch: félkész shard index nélkül
+    (tmp_path / f"shard-{len(done) + 1:06d}.zip.part").write_bytes(b"PK\x03\x04felkesz")
+    writer = ShardWriter(str(tmp_path), 10_000)
+    assert writer.next_index == 6 and writer.shards == len(done)
+    assert not list(tmp_path.glob("*.part"))
+    with pytest.raises(ValueError, match="már archiválva"):
+        writer.write(5, "0005.pdf", pdf(5))
+    for index in range(6, 9):
+        writer.write(index, f"{index:04d}.pdf", pdf(index))
+    writer.close()
+    with Archive(str(tmp_path)) as archive:
+        assert sorted(archive.names()) == [f"{i:04d}.pdf" for i in range(9)]
+        assert archive.read("0008.pdf") == pdf(8)
+
+
+def test_empty_writer_leaves_no_shard(tmp_path):
+    ShardWriter(str(tmp_path)).close()
+    assert os.listdir(tmp_path) == []
+
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(ValueError, match="Ismeretlen archív formátum"):
+        ShardWriter(str(tmp_path), format="rar")
+
+
+@pytest.mark.parametrize("format", ["zip", "tar"])
+def test_shards_stay_under_cap(tmp_path, format):
+    # A zip központi könyvtára és a tar záró blokkjai is beleférnek a korlátba
+    cap = 24_000
+    with ShardWriter(str(tmp_path), cap, format) as writer:
+        for index in range(40):
+            writer.write(index, f"számla_{index:04d}.pdf", pdf(index, 1000 + 997 * (index % 7)))
+    shards = completed_shards(str(tmp_path))
+    assert len(shards) > 3
+    sizes = [os.path.getsize(os.path.join(tmp_path, shard["shard"])) for shard in shards]
+    assert max(sizes) <= cap
+    # A becslés pontos: a következő tag már nem fért volna bele
+    assert max(sizes) > cap - 7000
+
+
+def test_resume_finishes_rename_of_indexed_shard(tmp_path):
+    fill(tmp_path, 6)
+    last = completed_shards(str(tmp_path))[-1]
+    path = tmp_path / last["shard"]
+    # Megszakadás az index kiírása után, a shard átnevezése előtt
+    path.rename(str(path) + ".part")
+    assert completed_shards(str(tmp_path))[-1] != last
+    writer = ShardWriter(str(tmp_path), 10_000)
+    assert writer.next_index == 6 and path.exists()
+    with Archive(str(tmp_path)) as archive:
+        assert archive.read("0005.pdf") == pdf(5)
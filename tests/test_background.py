@@ -0,0 +1,45 @@
+import re
+
+import pytest
+
+from PDF_generator.background import compile_backgrounds, install_backgrounds, place_background
+from PDF_generator.simple_invoice import (DEMO_INVOICES, SimpleInvoice, compile_simple_background,
+                                          compile_simple_plan, render_simple_invoice)
+
+DATA = DEMO_INVOICES[0][1]
+
+
+def test_background_is_one_shared_form_xobject():
+    pymupdf = pytest.importorskip("pymupdf")
+    first, second = render_simple_invoice(DATA), render_simple_invoice(DEMO_INVOICES[1][1])
+    streams = []
+    for pdf in (first, second):
+        with pymupdf.open(stream=pdf, filetype="pdf") as doc:
+            forms = [xref for xref in range(1, doc.xref_length())
+                     if doc.xref_get_key(xref, "Subtype") == ("name", "/Form")]
+            assert len(forms) == 1
+            streams.append(doc.xref_stream(forms[0]))
+            page = doc[0]
+            assert re.search(rb"/I\d+ Do", page.read_contents())
+            # A háttér szövege kinyerhető, az adat mellett
+            assert "INVOICE" in page.get_text()
+    assert streams[0] == streams[1]
+
+
+def test_background_must_precede_text():
+    pdf = SimpleInvoice()
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 12)
+    pdf.text(10, 10, "zyx")
+    with pytest.raises(RuntimeError, match="előbb kell telepíteni"):
+        install_backgrounds(pdf, compile_simple_background())
+
+
+def test_compile_backgrounds_layers():
+    background = compile_backgrounds(SimpleInvoice, compile_simple_plan().background, ())
+    assert len(background.layers) == 2 and background.layers[1].fonts == ()
+    pdf = SimpleInvoice()
+    indices = install_backgrounds(pdf, background)
+    pdf.add_page()
+    place_background(pdf, indices[0])
+    assert bytes(pdf.output()).startswith(b"%PDF-")
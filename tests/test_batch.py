@@ -0,0 +1,98 @@
+from dataclasses import replace
+import re
+
+import pytest
+
+from PDF_generator.batch import BatchConfig, _normalize_job, _render_chunk, iter_batch, run_batch
+from PDF_generator.simple_invoice import DEMO_INVOICES
+from PDF_generator.synthetic import make_invoice
+
+DATA = DEMO_INVOICES[0][1]
+
+
+def chunk(*templates):
+    return [_normalize_job(i, (template, DATA, f"{i}.pdf")) for i, template in enumerate(templates)]
+
+
+def test_failure_before_profiling_has_no_record():
+    # A kimeneti profil a mérés előtt hibázik: a hiba ág nem láthat (régi) rekordot
+    results = _render_chunk(chunk("simple", "simple"), BatchConfig(profile=True, output_profile="nincs",
+                                                                   archive=True))
+    assert [r.ok for r in results] == [False, False]
+    assert all(r.profile is None and "nincs" in r.error for r in results)
+
+
+def test_failed_job_keeps_its_own_record():
+    results = _render_chunk(chunk("simple", "nincs"), BatchConfig(profile=True, archive=True))
+    assert [r.ok for r in results] == [True, False]
+    assert results[0].profile is not results[1].profile
+
+
+def test_iter_batch_with_config():
+    config = BatchConfig(archive=True, output_profile="fast", threads=True)
+    results = list(iter_batch([("simple", DATA)] * 5, workers=2, chunksize=2, config=config, start=10))
+    assert [r.index for r in results] == [10, 11, 12, 13, 14]
+    assert all(r.ok and r.pdf.startswith(b"%PDF-") for r in results)
+
+
+def test_run_batch_sets_sink_flags():
+    class Sink:
+        def __init__(self):
+            self.records = []
+
+        def emit(self, record):
+            self.records.append(record)
+
+    class Archive:
+        def __init__(self):
+            self.written = []
+
+        def write(self, index, filename, pdf):
+            self.written.append((index, pdf[:5]))
+
+    sinks, truth, archive = [Sink()], [Sink()], Archive()
+    report = run_batch([("simple", DATA)] * 3, workers=1, config=BatchConfig(threads=True),
+                       sinks=sinks, truth_sinks=truth, archive=archive)
+    assert not report.failed
+    assert len(sinks[0].records) == 3 and len(truth[0].records) == 3
+    assert archive.written == [(i, b"%PDF-") for i in range(3)]
+
+
+@pytest.mark.parametrize("options", [{"pooled": True}, {"profile_memory": True}, {"max_chunks_per_worker": 2}])
+def test_threads_reject_process_options(options):
+    with pytest.raises(ValueError, match="csak process poollal"):
+        BatchConfig(threads=True, **options)
+    with pytest.raises(ValueError):
+        replace(BatchConfig(**options), threads=True)
+
+
+def test_prepare_runs_once_under_threads(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    import gc
+
+    from PDF_generator import pool
+
+    calls = []
+    monkeypatch.setattr(pool, "_prepared", False)
+    monkeypatch.setattr(pool, "resolve_renderer", lambda template: calls.append(template) or (lambda data: b""))
+    monkeypatch.setattr(gc, "freeze", lambda: None)
+    monkeypatch.setattr(gc, "set_threshold", lambda *threshold: None)
+    with ThreadPoolExecutor(4) as executor:
+        list(executor.map(lambda _: pool.prepare(["simple"]), range(8)))
+    assert calls == ["simple"]
+
+
+def _without_date(pdf):
+    # A létrehozás ideje másodpercre pontos, a fájl azonosító (/ID) ebből is számolódik
+    return re.sub(rb"/CreationDate \(D:\d+Z\)|/ID \[<[0-9A-F]+><[0-9A-F]+>\]", b"", pdf)
+
+
+@pytest.mark.parametrize("output_profile", ["default", "small"])
+def test_threads_match_sequential_output(output_profile):
+    jobs = [(template, make_invoice(template, 5, i), f"{i}.pdf")
+            for i, template in enumerate(["simple", "modern", "general"] * 4)]
+    config = BatchConfig(archive=True, output_profile=output_profile)
+    sequential = _render_chunk([_normalize_job(i, job) for i, job in enumerate(jobs)], config)
+    threaded = list(iter_batch(jobs, workers=4, chunksize=1, config=replace(config, threads=True)))
+    assert all(r.ok for r in threaded)
+    assert [_without_date(r.pdf) for r in threaded] == [_without_date(r.pdf) for r in sequential]
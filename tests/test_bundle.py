@@ -0,0 +1,68 @@
+import re
+
+import pytest
+
+from PDF_generator.bundle import BundleError, BundleWriter, invoice_id, read_index
+from PDF_generator.synthetic import make_invoice
+from PDF_generator.templates import resolve_renderer
+
+pymupdf = pytest.importorskip("pymupdf")
+
+
+@pytest.fixture(scope="module")
+def bundle(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("bundle") / "szamlak.pdf")
+    jobs = [(template, make_invoice(template, 4, i), f"{template}_{i}.pdf")
+            for i, template in enumerate(["simple", "modern", "general"] * 2)]
+    # Egy hosszú számla, hogy legyen többoldalas tartomány is
+    jobs[2][1]["items"] = jobs[2][1]["items"] * 40
+    with BundleWriter(path) as writer:
+        for index, (template, data, filename) in enumerate(writer.track(jobs)):
+            writer.write(index, filename, resolve_renderer(template)(data))
+    return path, jobs
+
+
+def test_index_page_ranges(bundle):
+    path, jobs = bundle
+    pages = read_index(path.replace(".pdf", ".index.jsonl"))
+    ranges = [pages[invoice_id(data, filename)] for _, data, filename in jobs]
+    assert ranges[0][0] == 1
+    assert all(b[0] == a[1] + 1 for a, b in zip(ranges, ranges[1:]))
+    assert ranges[2][1] > ranges[2][0]
+    with pymupdf.open(path) as doc:
+        assert doc.page_count == ranges[-1][1]
+        for (_, data, _), (first, last) in zip(jobs, ranges):
+            text = " ".join(doc[i].get_text() for i in range(first - 1, last))
+            number = invoice_id(data).lstrip("#")
+            assert number and number in text
+
+
+def test_outline_points_to_first_pages(bundle):
+    path, jobs = bundle
+    pages = read_index(path.replace(".pdf", ".index.jsonl"))
+    with pymupdf.open(path) as doc:
+        toc = doc.get_toc()
+    assert [title for _, title, _ in toc] == [invoice_id(data, filename) for _, data, filename in jobs]
+    assert [page for _, _, page in toc] == [pages[title][0] for _, title, _ in toc]
+    assert {level for level, _, _ in toc} == {1}
+
+
+def test_subset_tags_are_unique_per_invoice(bundle):
+    path, jobs = bundle
+    pages = read_index(path.replace(".pdf", ".index.jsonl"))
+    with pymupdf.open(path) as doc:
+        assert not doc.is_repaired
+        tags = []
+        for _, data, filename in jobs:
+            first, _ = pages[invoice_id(data, filename)]
+            names = {font[3] for font in doc.get_page_fonts(first - 1)}
+            assert names and all(re.fullmatch(r"[A-Z]{6}\+.+", name) for name in names)
+            tags.append({name[:6] for name in names})
+    assert all(len(t) == 1 for t in tags)
+    assert len(set().union(*tags)) == len(jobs)
+
+
+def test_rejects_non_fpdf_pdf(tmp_path):
+    with BundleWriter(str(tmp_path / "b.pdf")) as writer:
+        with pytest.raises(BundleError):
+            writer.write(0, "x.pdf", b"%PDF-1.4\nnem pdf\n%%EOF\n")
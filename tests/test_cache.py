@@ -0,0 +1,80 @@
+import os
+import shutil
+
+import pytest
+
+from PDF_generator import cache
+from PDF_generator.cache import RenderCache, cache_key, render_sources, source_version
+from PDF_generator.output import output_profile
+from PDF_generator.synthetic import make_invoice
+from PDF_generator.templates import template_module
+
+PACKAGE_DIR = os.path.dirname(cache.__file__)
+
+
+def invoices(count):
+    return [make_invoice("simple", 2, i) for i in range(count)]
+
+
+@pytest.mark.parametrize("template", ["simple", "modern", "general"])
+def test_render_sources_follow_imports(template):
+    names = {os.path.basename(path) for path in render_sources(template_module(template).__file__)}
+    assert {"layout.py", "table.py", "money.py", "fonts.py", "output.py", "background.py"} <= names
+    assert "dedup.py" not in names and "cache.py" not in names
+
+
+def test_editing_render_module_changes_version(tmp_path):
+    package = tmp_path / "pkg"
+    shutil.copytree(PACKAGE_DIR, package, ignore=shutil.ignore_patterns("__pycache__", "Test_Invoices"))
+    module = str(package / "simple_invoice.py")
+    before = source_version(module, str(package))
+    with open(package / "dedup.py", "a", encoding="utf-8") as f:
+        f.write("\n# nem a renderelés útja\n")
+    assert source_version(module, str(package)) == before
+    with open(package / "money.py", "a", encoding="utf-8") as f:
+        f.write("\n# formázás változott\n")
+    assert source_version(module, str(package)) != before
+
+
+def test_key_ignores_metadata_and_tracks_profile():
+    data = make_invoice("simple", 1, 0)
+    key = cache_key("simple", data)
+    assert cache_key("simple", dict(data, _corrupted_fields=["x"])) == key
+    assert cache_key("simple", dict(data, invoice_no="#1")) != key
+    with output_profile("small"):
+        assert cache_key("simple", data) != key
+    with pytest.raises(ValueError):
+        cache_key("nincs", data)
+
+
+def test_memory_lru_and_counters(tmp_path):
+    data = invoices(3)
+    probe = RenderCache(disk_bytes=0, directory=str(tmp_path))
+    size = len(probe.render("simple", data[0]))
+    render_cache = RenderCache(memory_bytes=int(size * 2.5), disk_bytes=0, directory=str(tmp_path))
+    assert [render_cache.lookup("simple", d)[1] for d in data] == ["render"] * 3
+    # Az első kiesett (LRU), a másik kettő a memóriában van
+    assert render_cache.lookup("simple", data[2])[1] == "memory"
+    assert render_cache.lookup("simple", data[0])[1] == "render"
+    stats = render_cache.stats()
+    assert (stats["memory_hits"], stats["misses"], stats["memory_entries"]) == (1, 4, 2)
+    assert stats["memory_bytes"] <= render_cache.memory_bytes
+
+
+def test_disk_tier_and_eviction(tmp_path):
+    data = invoices(6)
+    render_cache = RenderCache(memory_bytes=0, disk_bytes=10**9, directory=str(tmp_path))
+    first = render_cache.render("simple", data[0])
+    assert render_cache.lookup("simple", data[0]) == (first, "disk")
+
+    small = RenderCache(memory_bytes=0, disk_bytes=int(len(first) * 3.5), directory=str(tmp_path / "kicsi"))
+    for i, d in enumerate(data):
+        small.render("simple", d)
+        path = small._path(cache_key("simple", d))
+        os.utime(path, (1000 + i, 1000 + i))    # determinisztikus használati sorrend
+    files = list(small._disk_entries())
+    assert small.stats()["evictions"] > 0
+    assert sum(size for _, size, _ in files) <= small.disk_bytes
+    # A legutóbb használt megmaradt, a legrégebbi törlődött
+    assert small.lookup("simple", data[-1])[1] == "disk"
+    assert small.lookup("simple", data[0])[1] == "render"
@@ -0,0 +1,14 @@
+import pytest
+
+from PDF_generator import compat
+
+
+def test_supported_series():
+    compat.check_fpdf_version("2.8.0")
+    compat.check_fpdf_version("2.8.9")
+
+
+@pytest.mark.parametrize("version", ["2.7.9", "2.9.0", "3.0.0", "2.80.1"])
+def test_other_versions_rejected(version):
+    with pytest.raises(ImportError, match=r"fpdf2==2\.8\.\*"):
+        compat.check_fpdf_version(version)
@@ -0,0 +1,25 @@
+import os
+
+import pytest
+
+from PDF_generator.config import RenderConfig
+from PDF_generator.simple_invoice import DEMO_INVOICES, create_simple_invoice
+
+DATA = DEMO_INVOICES[0][1]
+
+
+def test_create_writes_into_config_dir(tmp_path):
+    config = RenderConfig(output_dir=str(tmp_path), verbose=False)
+    create_simple_invoice("a.pdf", DATA, config=config)
+    assert (tmp_path / "a.pdf").read_bytes().startswith(b"%PDF-")
+    assert os.listdir(tmp_path) == ["a.pdf"]
+
+
+def test_failed_render_keeps_existing_file(tmp_path):
+    config = RenderConfig(output_dir=str(tmp_path), verbose=False)
+    (tmp_path / "a.pdf").write_bytes(b"%PDF-regi")
+    with pytest.raises(Exception):
+        create_simple_invoice("a.pdf", dict(DATA, items=None), config=config)
+    # Nem maradt csonka vagy ideiglenes fájl
+    assert (tmp_path / "a.pdf").read_bytes() == b"%PDF-regi"
+    assert os.listdir(tmp_path) == ["a.pdf"]
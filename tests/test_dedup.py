@@ -0,0 +1,143 @@
+import copy
+
+import pytest
+
+from PDF_generator import dedup
+from PDF_generator.synthetic import make_invoice
+
+
+def invoice(number="#1001", supplier="Borcele Bank", total="$ 220.00", customer="Lisa Kim"):
+    return {"invoice_no": number, "bank_name": supplier, "total_amount": total, "customer_name": customer,
+            "date": "05/01/2024", "items": [["Logo design", "100", "2", "$200.00"], ["Fee", "20", "1", "$20.00"]]}
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("$ 1,234.5", "1234.50"),
+    ("$1234.50", "1234.50"),
+    ("1 234,50 Ft", "1234.50"),
+    ("1.234,50", "1234.50"),
+    ("123 450 Ft", "123450.00"),
+    ("123 450 Ft", "123450.00"),
+    ("1 999 000,00 Ft", "1999000.00"),
+    ("-$ 5.00", "-5.00"),
+    ("ingyen", "ingyen"),
+    ("ÁFA mentes", "afa mentes"),
+])
+def test_normalize_amount(text, expected):
+    assert dedup.normalize_amount(text) == expected
+
+
+def test_normalize_text_and_number():
+    assert dedup.normalize_text("  Példa  KFT. ") == "pelda kft"
+    assert dedup.normalize_text("$ 1,200.00") == "1200"
+    assert dedup.normalize_number("#0012") == "12"
+    assert dedup.normalize_number("N/A") == "n a"
+
+
+def test_formatting_is_exact_match():
+    index = dedup.DuplicateIndex()
+    doc = index.add(invoice(), "a")
+    reformatted = invoice(number="0001001", supplier="  BORCELE  bank", total="$220")
+    matches = index.query(reformatted)
+    assert [(m.id, m.kind) for m in matches] == [(doc, "exact")]
+
+
+def test_hungarian_totals_are_distinct_keys():
+    # Azonos számlaszám és szállító, eltérő forint végösszeg: nem üzleti kulcs egyezés
+    first = invoice(total="1 234,50 Ft", customer="Kovács Éva")
+    other = invoice(total="1 999 000,00 Ft", customer="Tóth Ödön")
+    assert dedup.fingerprint(first).key != dedup.fingerprint(other).key
+    index = dedup.DuplicateIndex()
+    index.add(first, "a")
+    assert all(m.kind != "key" for m in index.query(other))
+
+
+def test_resend_is_key_match():
+    index = dedup.DuplicateIndex()
+    index.add(invoice(total="123 450 Ft"), "a")
+    resent = invoice(total="123 450,00 Ft", customer="Valaki Más")
+    resent["date"] = "06/01/2024"
+    assert [m.kind for m in index.query(resent)] == ["key"]
+
+
+def test_near_duplicate_and_distinct():
+    index = dedup.DuplicateIndex()
+    base = make_invoice("general", 1, 0)
+    index.add(base, "base")
+    edited = copy.deepcopy(base)
+    edited["inv_number"] = "999999"
+    edited["items"][0][1] += " x"
+    matches = index.query(edited, threshold=0.5)
+    assert matches and matches[0].kind == "near" and matches[0].label == "base"
+    assert index.query(make_invoice("general", 2, 5)) == []
+
+
+def test_query_and_add_ids():
+    index = dedup.DuplicateIndex()
+    assert index.query_and_add(invoice(), "a") == (0, [])
+    doc_id, matches = index.query_and_add(invoice(), "b")
+    assert doc_id == 1 and matches[0].label == "a"
+    assert len(index) == 2
+
+
+def test_save_and_load(tmp_path):
+    index = dedup.DuplicateIndex()
+    for i in range(50):
+        index.add(make_invoice("modern", 3, i), f"m{i}")
+    path = tmp_path / "dedup.idx"
+    index.save(path)
+    loaded = dedup.DuplicateIndex.load(path)
+    assert len(loaded) == 50 and loaded.labels == index.labels
+    probe = make_invoice("modern", 3, 17)
+    assert loaded.query(probe)[0] == index.query(probe)[0]
+    # A betöltéskor (NumPy-jal) számolt sáv kulcsok egyeznek a beszúráskoriakkal
+    edited = copy.deepcopy(probe)
+    edited["invoice_id"] = "#1"
+    edited["items"][0][0] += " x"
+    assert loaded.query(edited, threshold=0.3) == index.query(edited, threshold=0.3) != []
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "old.idx"
+    path.write_bytes(b"PDFGEN-DEDUP 1\n{}\n")
+    with pytest.raises(ValueError, match="Nem duplikátum index"):
+        dedup.DuplicateIndex.load(path)
+
+
+def test_invalid_parameters():
+    with pytest.raises(ValueError):
+        dedup.DuplicateIndex(num_perm=24)
+    with pytest.raises(ValueError):
+        dedup.DuplicateIndex(num_perm=32, bands=5)
+
+
+def test_hash_runs_merge_and_lookup():
+    runs = dedup._HashRuns(buffer=4)
+    for doc_id in range(100):
+        runs.add(doc_id % 7, doc_id)
+    assert len(runs) == 100 and len(runs._runs) <= 5
+    assert sorted(runs.get(3)) == list(range(3, 100, 7))
+    assert runs.get(8) == []
+
+
+def test_vector_minhash_matches_scalar(monkeypatch):
+    shingles = {f"tetel {i}" for i in range(300)}
+    vector = dedup.minhash(shingles)
+    monkeypatch.setattr(dedup, "_VECTOR_SHINGLES", 10**9)
+    assert dedup.minhash(shingles) == vector
+
+
+def test_large_index_uses_runs(monkeypatch):
+    monkeypatch.setattr(dedup, "RUN_BUFFER", 16)
+    index = dedup.DuplicateIndex()
+    for i in range(200):
+        index.add(make_invoice("modern", 3, i), f"m{i}")
+    assert index._by_content._runs
+    probe = make_invoice("modern", 3, 123)
+    assert index.query(probe)[0][1:3] == ("m123", "exact")
+
+
+def test_rows_normalize_like_text():
+    rows = [" ".join(map(str, row)) for i in range(30) for row in make_invoice("general", 2, i)["items"]]
+    rows += ["Ábc-dé_f  1,234.00 $", "", "_a_", "1 999 000,00 Ft", "€ 5 – 6 日本 🧾", "a\x1fb\tc"]
+    assert dedup._normalize_rows(rows) == [dedup.normalize_text(row) for row in rows]
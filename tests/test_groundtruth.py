@@ -0,0 +1,51 @@
+import pytest
+
+from PDF_generator.groundtruth import COLUMNS, recording, sidecar_path, write_sidecar
+from PDF_generator.synthetic import make_invoice
+from PDF_generator.templates import resolve_renderer
+
+MM = 72 / 25.4
+
+
+def ascii_text(text):
+    # A fontból hiányzó (ki nem rajzolt) nem ASCII karakterek ne számítsanak
+    return "".join(c for c in text if c.isascii() and c.isalnum())
+
+
+def rows(record):
+    fields = record["fields"]
+    return [dict(zip(COLUMNS, values)) for values in zip(*(fields[name] for name in COLUMNS))]
+
+
+@pytest.mark.parametrize("template", ["simple", "modern", "general"])
+def test_boxes_contain_their_text(template):
+    pymupdf = pytest.importorskip("pymupdf")
+    data = make_invoice(template, 3, 1)
+    with recording(template, "x.pdf") as truth:
+        pdf = resolve_renderer(template)(data)
+    record = truth.as_dict()
+    assert record["unit"] == "mm" and record["label"] == "x.pdf"
+    boxes = rows(record)
+    # Minden tételcella rögzítve van, sor és oszlop indexszel
+    cells = {(box["row"], box["col"]) for box in boxes if box["key"] == "items" and box["text"]}
+    assert cells == {(r, c) for r, item in enumerate(data["items"]) for c, value in enumerate(item) if value}
+    with pymupdf.open(stream=pdf, filetype="pdf") as doc:
+        assert [round(doc[0].rect.width / MM, 2), round(doc[0].rect.height / MM, 2)] == record["page_size"]
+        for box in boxes:
+            if not box["text"]:
+                continue
+            rect = pymupdf.Rect(box["x"], box["y"], box["x"] + box["w"], box["y"] + box["h"]) * MM
+            # Kis tűrés a kerekítés és a kinyerő sormagassága miatt
+            found = doc[box["page"] - 1].get_textbox(rect + (-1, -1, 1, 1))
+            assert ascii_text(box["text"]) in ascii_text(found), box
+
+
+def test_no_recording_outside_block(tmp_path):
+    data = make_invoice("simple", 3, 2)
+    with recording("simple") as truth:
+        resolve_renderer("simple")(data)
+    count = len(truth)
+    resolve_renderer("simple")(data)
+    assert len(truth) == count > 0
+    path = write_sidecar(str(tmp_path / "a.pdf"), truth.as_dict())
+    assert path == sidecar_path(str(tmp_path / "a.pdf")) and path.endswith("a.json")
@@ -0,0 +1,46 @@
+import pytest
+
+from PDF_generator.layout import PlanBuilder, render_plan
+from PDF_generator.simple_invoice import DEMO_INVOICES, SimpleInvoice, compile_simple_plan
+
+DATA = DEMO_INVOICES[0][1]
+
+
+def small_plan():
+    b = PlanBuilder("proba")
+    b.set_xy(20, 30)
+    b.font("B", 12)
+    b.cell(40, 10, "INVOICE")
+    b.font("B", 12)
+    b.field(40, 10, "no", ln=True)
+    b.multi_field(80, 5, "notes")
+    b.cell(40, 10, "Total")
+    return b.compile(SimpleInvoice)
+
+
+def test_static_cells_go_to_background():
+    plan = small_plan()
+    assert plan.fields == ("no", "notes")
+    scratch = SimpleInvoice()
+    (text,) = [op for op in plan.background if op[0] == "text"]
+    assert text[3] == "INVOICE" and text[1] == pytest.approx(20 + scratch.c_margin)
+    # A redundáns fontváltás kiszűrve; a multi_cell utáni cella helye adatfüggő: a tervben marad
+    assert [op for op in plan.ops if op[0] == "font"] == [("font", "B", 12)]
+    assert ("text", pytest.approx(scratch.c_margin), pytest.approx(5 + 0.3 * 12 / scratch.k), "Total") in plan.ops
+    assert any(op[:2] == ("field", "no") for op in plan.ops)
+
+
+def test_plan_is_compiled_once():
+    assert compile_simple_plan() is compile_simple_plan()
+    assert set(compile_simple_plan().fields) <= set(DATA) | {"items"}
+
+
+def test_render_plan_draws_fields():
+    pymupdf = pytest.importorskip("pymupdf")
+    pdf = SimpleInvoice()
+    pdf.add_page()
+    render_plan(pdf, small_plan(), {"no": "#42", "notes": "Fizetés 8 napon belül"})
+    with pymupdf.open(stream=bytes(pdf.output()), filetype="pdf") as doc:
+        text = doc[0].get_text()
+    # A háttér réteget a render_plan nem rajzolja
+    assert "#42" in text and "Fizetés 8 napon belül" in text and "Total" in text and "INVOICE" not in text
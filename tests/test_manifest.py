@@ -0,0 +1,56 @@
+import os
+
+from PDF_generator.cache import cache_key
+from PDF_generator.config import RenderConfig
+from PDF_generator.manifest import MANIFEST_NAME, Manifest, Plan, build
+from PDF_generator.synthetic import make_invoice
+
+
+def jobs(count):
+    for i in range(count):
+        yield "simple", make_invoice("simple", 1, i), f"s{i}.pdf"
+
+
+def test_plan_skips_unchanged(tmp_path):
+    manifest = Manifest(str(tmp_path / "manifest.jsonl"))
+    for template, data, filename in jobs(6):
+        (tmp_path / filename).write_bytes(b"%PDF-")
+        fingerprint = cache_key(template, data) if filename != "s2.pdf" else "regi"
+        manifest.record(filename, template, fingerprint, 5)
+    (tmp_path / "s4.pdf").write_bytes(b"%PDF-1.4")          # a méret eltér
+    manifest.close()
+
+    plan = Plan(jobs(8), Manifest(manifest.path), str(tmp_path))
+    assert [filename for _, _, filename in plan] == ["s2.pdf", "s4.pdf", "s6.pdf", "s7.pdf"]
+    assert (plan.todo, plan.skipped) == (4, 4)
+    assert plan.pop(2) == cache_key("simple", make_invoice("simple", 1, 6))
+
+    forced = Plan(jobs(3), Manifest(manifest.path), str(tmp_path), force=True)
+    assert len(list(forced)) == 3
+
+
+def test_plan_is_lazy(tmp_path):
+    consumed = []
+
+    def source():
+        for job in jobs(1000):
+            consumed.append(job[2])
+            yield job
+
+    entries = iter(Plan(source(), Manifest(str(tmp_path / "m.jsonl")), str(tmp_path)))
+    assert next(entries)[2] == "s0.pdf"
+    assert consumed == ["s0.pdf"]
+
+
+def test_build_into_config_dir(tmp_path):
+    config = RenderConfig(output_dir=str(tmp_path / "ki"), verbose=False)
+    # Két azonos nevű job: a lenyomatok a sorszámhoz tartoznak, nem a fájlnévhez
+    job_list = list(jobs(3)) + [("simple", make_invoice("simple", 1, 9), "s0.pdf")]
+    report = build(job_list, workers=1, chunksize=4, config=config)
+    assert not report.failed and len(report.results) == 4
+    manifest = Manifest(os.path.join(config.output_dir, MANIFEST_NAME))
+    assert manifest.get("s0.pdf")[1] == cache_key("simple", make_invoice("simple", 1, 9))
+    assert manifest.get("s1.pdf")[2] == os.path.getsize(os.path.join(config.output_dir, "s1.pdf"))
+
+    again = build(jobs(3), workers=1, config=config)
+    assert (len(again.results), again.skipped) == (1, 2)
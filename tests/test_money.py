@@ -0,0 +1,109 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from PDF_generator import money
+from PDF_generator.synthetic import SyntheticConfig, make_invoice
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLEAN = SyntheticConfig(corrupt_share=0.0)
+
+
+@pytest.mark.parametrize("text, cents", [
+    ("$ 1,234.50", 123450),
+    ("$400", 40000),
+    ("220.00", 22000),
+    ("-$ 5.00", -500),
+    ("$ -5.00", -500),
+    ("1,234", 123400),
+    ("1.234", 123400),          # egyetlen elválasztó három jeggyel: ezres
+    ("12.345", 1234500),
+    ("1 234,50 Ft", 123450),
+    ("1.234,50", 123450),
+    ("2 500 000 Ft", 250000000),
+    ("999,00 Ft", 99900),
+    ("123 450 Ft", 12345000),
+    ("1 999 000,00 Ft", 199900000),
+    ("12,5", 1250),
+    ("EUR 10", 1000),
+])
+def test_parse_money(text, cents):
+    assert money.parse_money(text) == cents
+
+
+@pytest.mark.parametrize("text", ["", "ingyen", "N/A", "$$$", "1.000,00,0", "1,23,45", "1.234.5", None])
+def test_parse_money_rejects(text):
+    assert money.parse_money(text) is None
+
+
+def test_parse_money_numbers():
+    assert money.parse_money(12.5) == 1250
+    assert money.parse_money(3) == 300
+
+
+@pytest.mark.parametrize("fmt", [money.USD, money.USD_COMPACT, money.USD_LOCALE, money.HUF_DECIMAL])
+@pytest.mark.parametrize("cents", [0, 5, 99, 100, 123456, 100000000, -4250])
+def test_format_round_trip(fmt, cents):
+    assert money.parse_money(money.format_money(cents, fmt)) == cents
+
+
+def test_format_huf_rounds_to_forint():
+    assert money.format_money(123450, money.HUF) == "1 235 Ft"
+    assert money.format_money(123449, money.HUF) == "1 234 Ft"
+    assert money.format_money(-50, money.HUF) == "-1 Ft"
+
+
+def test_parse_percent_and_rate():
+    assert money.parse_percent("10%") == 1000
+    assert money.parse_percent("27,5 %") == 2750
+    assert money.parse_percent("ingyen") is None
+    assert money.apply_rate(12345, 2000) == 2469       # 24.69
+    assert money.apply_rate(5, 1000) == 1               # 0.5 cent felfelé
+
+
+def test_parse_money_array_matches_scalar():
+    values = ["$ 1.00", "$12", "-$ 3.50", "1 234,50 Ft", "ingyen", None, "", "$ 99999999999999.99", "7"]
+    expected = [money.MISSING if money.parse_money(v) is None else money.parse_money(v) for v in values]
+    assert money.parse_money_array(values).tolist() == expected
+
+
+def test_synthetic_does_not_need_numpy():
+    # A money modul a NumPy-t csak a kötegelt részben importálja
+    code = ("import sys; sys.modules['numpy'] = None\n"
+            "from PDF_generator.synthetic import make_invoice\n"
+            "from PDF_generator.money import parse_money\n"
+            "assert parse_money(make_invoice('general', 1, 0)['total_gross']) is not None")
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT_DIR, check=True)
+
+
+@pytest.mark.parametrize("template", ["simple", "modern", "general"])
+def test_check_clean_batch(template):
+    invoices = [make_invoice(template, 7, i, CLEAN) for i in range(200)]
+    report = money.check(template, invoices)
+    assert len(report) == 200
+    assert report.inconsistent.tolist() == []
+
+
+@pytest.mark.parametrize("template", ["simple", "modern", "general"])
+def test_inject_is_detected(template):
+    invoices = [make_invoice(template, 3, i, CLEAN) for i in range(300)]
+    injected = money.inject(template, invoices, share=0.2, seed=5)
+    assert injected
+    report = money.check(template, invoices)
+    assert set(report.inconsistent.tolist()) == {index for index, _ in injected}
+    for index, kind in injected:
+        assert report.issues(index)
+
+
+def test_recompute_makes_consistent():
+    data = make_invoice("modern", 1, 0, CLEAN)
+    data["grand_total"] = "$ 1.00"
+    assert money.check("modern", [data]).issues(0) == ["total"]
+    assert money.check("modern", [money.recompute("modern", data)]).inconsistent.tolist() == []
+
+
+def test_unknown_template():
+    with pytest.raises(ValueError, match="Ismeretlen sablon"):
+        money.check("nincs", [])
@@ -0,0 +1,37 @@
+import pytest
+
+from PDF_generator.output import output_profile, write_pdf
+from PDF_generator.synthetic import make_invoice
+from PDF_generator.templates import template_module
+
+BUILDERS = {"simple": "build_simple_invoice", "modern": "build_modern_invoice", "general": "build_complex_invoice"}
+
+
+def render(template, profile):
+    build = getattr(template_module(template), BUILDERS[template])
+    with output_profile(profile):
+        return write_pdf(build(make_invoice(template, 4, 0)))
+
+
+@pytest.mark.parametrize("template", sorted(BUILDERS))
+def test_profile_sizes_are_ordered(template):
+    sizes = {profile: len(render(template, profile)) for profile in ("small", "default", "fast")}
+    assert sizes["small"] < sizes["default"] < sizes["fast"]
+
+
+def test_fast_keeps_font_streams():
+    # A fast csak az oldal tartalmat hagyja tömörítetlenül: a font streamek azonosak
+    pymupdf = pytest.importorskip("pymupdf")
+
+    def streams(pdf):
+        with pymupdf.open(stream=pdf, filetype="pdf") as doc:
+            return {doc.xref_stream_raw(xref) for xref in range(1, doc.xref_length())
+                    if doc.xref_get_key(xref, "Length1")[0] != "null"}
+
+    assert streams(render("simple", "fast")) == streams(render("simple", "default"))
+
+
+def test_unknown_profile():
+    with pytest.raises(ValueError, match="Ismeretlen kimeneti profil"):
+        with output_profile("nincs"):
+            pass
@@ -0,0 +1,39 @@
+import asyncio
+
+from PDF_generator import standin
+from PDF_generator.pipeline import HttpSubmitter, run_pipeline
+from PDF_generator.simple_invoice import DEMO_INVOICES
+
+DATA = DEMO_INVOICES[0][1]
+
+
+def test_non_latin1_filename_round_trips():
+    filenames = ["számla_ő.pdf", "請求書.pdf", "plain.pdf"]
+
+    async def main():
+        async with standin.serve() as server:
+            return await run_pipeline([("simple", DATA, name) for name in filenames], HttpSubmitter(server.url),
+                                      workers=1, concurrency=2)
+
+    report = asyncio.run(main())
+    assert not report.failed
+    assert sorted(r.response["filename"] for r in report.results) == sorted(filenames)
+
+
+def test_failing_callback_does_not_hang():
+    class Submitter:
+        async def submit(self, item):
+            return {"ok": item.index}
+
+    def on_result(result):
+        if result.index % 2 == 0:
+            raise RuntimeError("napló hiba")
+
+    jobs = [("simple", DATA, f"{i}.pdf") for i in range(6)]
+    report = asyncio.run(asyncio.wait_for(
+        run_pipeline(jobs, Submitter(), workers=1, concurrency=1, max_queued=1, on_result=on_result), 120))
+    assert len(report.results) == 6
+    # A feltöltés sikeres volt: az ok marad, a callback hibája külön látszik
+    assert not report.failed
+    assert sorted(r.index for r in report.callback_failed) == [0, 2, 4]
+    assert all(r.callback_error == "RuntimeError: napló hiba" for r in report.callback_failed)
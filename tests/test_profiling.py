@@ -0,0 +1,55 @@
+import json
+
+from PDF_generator.profiling import (PHASES, JsonlSink, MemorySink, current, percentile_summary, phase,
+                                     profile)
+from PDF_generator.simple_invoice import DEMO_INVOICES, render_simple_invoice
+
+DATA = DEMO_INVOICES[0][1]
+
+
+def test_percentiles_nearest_rank():
+    assert percentile_summary(range(1, 101)) == {"p50": 50, "p95": 95, "p99": 99}
+    assert percentile_summary([3.0, 1.0, 2.0]) == {"p50": 2.0, "p95": 3.0, "p99": 3.0}
+    assert percentile_summary([7], (0, 100)) == {"p0": 7, "p100": 7}
+
+
+def test_profile_records_every_phase():
+    sink = MemorySink()
+    for _ in range(3):
+        with profile("simple", "demo", sink=sink):
+            render_simple_invoice(DATA)
+    assert current() is None and len(sink.records) == 3
+    record = sink.records[0]
+    assert set(record["phases"]) == set(PHASES)
+    assert sum(stats["wall"] for stats in record["phases"].values()) <= record["wall"]
+    summary = sink.summary()
+    assert list(summary) == [*PHASES, "total"]
+    assert set(summary["total"]["wall"]) == {"p50", "p95", "p99"}
+
+
+def test_phases_accumulate_and_memory_peak():
+    sink = MemorySink()
+    with profile("x", sink=sink, memory=True):
+        for _ in range(2):
+            with phase("table"):
+                bytearray(200_000)
+    record = sink.records[0]
+    assert list(record["phases"]) == ["table"]
+    assert record["peak"] == record["phases"]["table"]["peak"] >= 200_000
+
+
+def test_phase_without_profile_is_noop():
+    with phase("table"):
+        pass
+    assert current() is None
+
+
+def test_jsonl_sink(tmp_path):
+    path = tmp_path / "profil.jsonl"
+    sink = JsonlSink(str(path))
+    with profile("simple", "a.pdf", sink=sink):
+        render_simple_invoice(DATA)
+    sink.close()
+    (line,) = path.read_text(encoding="utf-8").splitlines()
+    record = json.loads(line)
+    assert record["label"] == "a.pdf" and set(record["phases"]) == set(PHASES)
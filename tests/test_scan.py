@@ -0,0 +1,33 @@
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("pymupdf")
+
+from PDF_generator.scan import preset, scan_documents  # noqa: E402
+from PDF_generator.simple_invoice import DEMO_INVOICES, render_simple_invoice  # noqa: E402
+
+CONFIG = preset("heavy", dpi=40)
+
+
+@pytest.fixture(scope="module")
+def documents():
+    return [(f"{i}.pdf", render_simple_invoice(data)) for i, (_, data) in enumerate(DEMO_INVOICES[:2])]
+
+
+def scan(directory, documents, seed, batch_pages=4):
+    report = scan_documents(documents, str(directory), CONFIG, fmt="png", seed=seed, batch_pages=batch_pages)
+    assert report.documents == len(documents)
+    return {path.name: path.read_bytes() for path in sorted(directory.iterdir())}
+
+
+def test_same_seed_same_pixels(tmp_path, documents):
+    first = scan(tmp_path / "a", documents, seed=7)
+    # A kötegméret nem változtat az eredményen
+    assert scan(tmp_path / "b", documents, seed=7, batch_pages=1) == first
+    other = scan(tmp_path / "c", documents, seed=8)
+    assert other.keys() == first.keys() and other != first
+
+
+def test_unknown_format(tmp_path, documents):
+    with pytest.raises(ValueError, match="Ismeretlen formátum"):
+        scan_documents(documents, str(tmp_path), fmt="bmp")
@@ -0,0 +1,57 @@
+import re
+
+import pytest
+
+from PDF_generator.money import HUF_DECIMAL, format_money
+from PDF_generator.table import BROUGHT_FORWARD, CARRIED_FORWARD, _Carry
+
+
+def carried(*values, col=0):
+    carry = _Carry(col)
+    for value in values:
+        carry.add([value])
+    return carry.formatted()
+
+
+def test_carry_usd_keeps_prefix():
+    assert carried("$ 220.00", "$ 0.50") == "$ 220.50"
+    assert carried("$220.00", "$1,000.00") == "$1220.00"
+    assert carried("$1,234.50", "$ 1.00") == "$1,235.50"
+
+
+def test_carry_hungarian_amounts():
+    assert carried("1 234,50 Ft", "1 999 000,00 Ft") == "2 000 234,50 Ft"
+    assert carried("123 450 Ft", "1 000 Ft") == "124 450 Ft"
+    assert carried("1.234,50", "10,00") == "1.244,50"
+
+
+def test_carry_skips_text_values():
+    assert carried("ingyen", "N/A", "$ 5.00", "", "1.000,00,0") == "$ 5.00"
+    assert carried("ingyen") == "$ 0.00"
+
+
+def test_carry_without_column():
+    carry = _Carry(None)
+    carry.add(["$ 1.00"])
+    assert not carry
+    assert _Carry(3).add(["$ 1.00"]) is None
+
+
+def test_huf_invoice_carries_subtotal():
+    pymupdf = pytest.importorskip("pymupdf")
+    from PDF_generator.general_invoice import render_complex_invoice
+    from PDF_generator.synthetic import make_invoice
+
+    data = make_invoice("general", 1, 0)
+    amount = format_money(123450, HUF_DECIMAL)
+    data["items"] = [[str(i), "Tétel", "1.00", "db", amount, amount] for i in range(80)]
+    with pymupdf.open(stream=render_complex_invoice(data), filetype="pdf") as doc:
+        text = "\n".join(page.get_text() for page in doc)
+    lines = re.findall(rf"({CARRIED_FORWARD}|{BROUGHT_FORWARD})\n(.+)", text)
+    assert lines
+    for _, value in lines:
+        assert value.endswith(" Ft") and value != "0,00 Ft"
+    # Az első oldal áthozott összege: a rajta lévő sorok száma x 1 234,50 Ft
+    first = lines[0][1].replace("\xa0", " ")
+    cents = int(first[:-3].replace(" ", "").replace(",", ""))
+    assert cents % 123450 == 0 and cents > 0
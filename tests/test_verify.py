@@ -0,0 +1,38 @@
+import pytest
+
+pytest.importorskip("pymupdf")
+
+from PDF_generator.simple_invoice import DEMO_INVOICES, render_simple_invoice  # noqa: E402
+from PDF_generator.verify import expected_fields, verify_pdf  # noqa: E402
+
+DATA = DEMO_INVOICES[0][1]
+# Az Arial fontban nincs CJK glif: az fpdf kihagyja a kimenetből
+MISSING = "漢"
+
+
+def test_clean_invoice_verifies():
+    result = verify_pdf(render_simple_invoice(DATA), DATA)
+    assert result.ok and not result.glyphs
+    assert result.fields == len(list(expected_fields(DATA)))
+
+
+def test_missing_glyph_is_not_a_mismatch():
+    data = dict(DATA, issued_to_name=f"Richard {MISSING}Sanchez")
+    result = verify_pdf(render_simple_invoice(data), data)
+    assert result.ok
+    (error,) = result.glyphs
+    assert (error.key, error.missing) == ("issued_to_name", MISSING)
+
+
+def test_changed_field_is_a_mismatch():
+    pdf = render_simple_invoice(DATA)
+    data = dict(DATA, invoice_no="99999", items=[list(row) for row in DATA["items"]])
+    data["items"][1][0] = "Nem ez a tétel"
+    result = verify_pdf(pdf, data, index=3, filename="x.pdf")
+    assert not result.ok and not result.glyphs
+    assert {(e.key, e.row, e.col) for e in result.mismatches} == {("invoice_no", None, None), ("items", 1, 0)}
+
+
+def test_unreadable_pdf_is_an_error():
+    result = verify_pdf(b"nem pdf", DATA)
+    assert not result.ok and result.error